@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Set
+
+
+class Suscripcion:
+    """
+    una conexion abierta (stream SSE) de un supervisor. la cola es acotada:
+    si el cliente no consume y se llena, queda marcada como desbordada y el
+    stream se pone al dia leyendo de Mongo
+    """
+
+    def __init__(self, supervisor_email: str, loop: asyncio.AbstractEventLoop, max_pendientes: int) -> None:
+        self.supervisor_email = supervisor_email
+        self.cola: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pendientes)
+        self.desbordada = False
+        self._loop = loop
+
+    def _entregar(self, notificacion: Dict[str, Any]) -> None:
+        # corre en el event loop de la conexion
+        try:
+            self.cola.put_nowait(notificacion)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+
+class BusNotificaciones:
+    """
+    pub/sub en proceso: el despachador publica lo que acaba de guardar en
+    NOTIFICACIONES y cada stream abierto recibe solo lo de su supervisor.
+    publicar se llama desde el hilo del despachador; la entrega pasa al
+    event loop de cada suscripcion (call_soon_threadsafe)
+    """
+
+    def __init__(self, max_pendientes: int = 100) -> None:
+        self.max_pendientes = max_pendientes
+        self._suscripciones: Dict[str, Set[Suscripcion]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.publicadas = 0
+
+    def suscribir(self, supervisor_email: str) -> Suscripcion:
+        """se llama desde el event loop que va a consumir la suscripcion"""
+        suscripcion = Suscripcion(supervisor_email, asyncio.get_running_loop(), self.max_pendientes)
+        with self._lock:
+            self._suscripciones[supervisor_email].add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            abiertas = self._suscripciones.get(suscripcion.supervisor_email)
+            if abiertas is None:
+                return
+            abiertas.discard(suscripcion)
+            if not abiertas:
+                del self._suscripciones[suscripcion.supervisor_email]
+
+    def publicar(self, notificaciones: List[Dict[str, Any]]) -> None:
+        for notificacion in notificaciones:
+            with self._lock:
+                destino = list(self._suscripciones.get(notificacion["supervisor_email"], ()))
+            for suscripcion in destino:
+                try:
+                    suscripcion._loop.call_soon_threadsafe(suscripcion._entregar, notificacion)
+                except RuntimeError:
+                    # loop cerrado (apagado): la conexion ya no existe
+                    self.desuscribir(suscripcion)
+            self.publicadas += 1
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "supervisores_conectados": len(self._suscripciones),
+                "conexiones": sum(len(s) for s in self._suscripciones.values()),
+                "publicadas": self.publicadas,
+            }
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class CacheLRU:
+    """
+    cache en memoria acotado: desaloja el menos usado (LRU) al superar max_items
+    y descarta entradas vencidas (TTL). thread-safe (la API lo usa desde el
+    event loop y desde el threadpool)
+    """
+
+    def __init__(
+        self,
+        max_items: int = 1024,
+        ttl_segundos: Optional[float] = 300.0,
+        reloj: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_items < 1:
+            raise ValueError("max_items debe ser positivo")
+        self.max_items = max_items
+        self.ttl_segundos = ttl_segundos
+        self._reloj = reloj
+        self._datos: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.vencidos = 0
+
+    def _vencido(self, guardado_en: float) -> bool:
+        return self.ttl_segundos is not None and self._reloj() - guardado_en > self.ttl_segundos
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            valor, guardado_en = entrada
+            if self._vencido(guardado_en):
+                del self._datos[clave]
+                self.vencidos += 1
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = (valor, self._reloj())
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "items": len(self._datos),
+                "max_items": self.max_items,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+                "desalojos": self.desalojos,
+                "vencidos": self.vencidos,
+            }
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._datos
+
+    def __iter__(self) -> Iterator[Any]:
+        """itera los valores residentes (snapshot, no cuenta como acceso)"""
+        with self._lock:
+            valores = [valor for valor, _ in self._datos.values()]
+        return iter(valores)
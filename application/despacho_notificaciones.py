@@ -0,0 +1,162 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo.errors import PyMongoError
+
+from infrastructure.repositorio_notificaciones_mongo import RepositorioNotificacionesMongo, documentos_desde_intento
+from infrastructure.repositorio_outbox_mongo import RepositorioOutboxMongo
+
+logger = logging.getLogger(__name__)
+
+# pendientes en el outbox a partir de las cuales el despacho no da abasto (se avisa en el log y en /metricas)
+UMBRAL_PENDIENTES = int(os.getenv("NOTIFICACIONES_OUTBOX_UMBRAL", "10000"))
+
+
+class DespachadorNotificaciones:
+    """
+    entrega en segundo plano lo encolado en el outbox: toma lotes, los expande
+    a una notificacion por supervisor (un insert_many por lote) y reintenta con
+    backoff si Mongo falla. el request que cambia el ticket solo paga el encolado
+    """
+
+    def __init__(
+        self,
+        outbox: RepositorioOutboxMongo,
+        notificaciones: RepositorioNotificacionesMongo,
+        publicar: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        tamano_lote: int = 200,
+        intervalo_segundos: float = 1.0,
+        plazo_segundos: float = 60.0,
+        max_intentos: int = 10,
+        espera_maxima_segundos: float = 300.0,
+        umbral_pendientes: int = UMBRAL_PENDIENTES,
+    ) -> None:
+        self._outbox = outbox
+        self._notificaciones = notificaciones
+        # avisa lo recien guardado a los streams abiertos (bus en proceso)
+        self._publicar = publicar
+        self.tamano_lote = tamano_lote
+        self.intervalo_segundos = intervalo_segundos
+        self.plazo_segundos = plazo_segundos
+        self.max_intentos = max_intentos
+        self.espera_maxima_segundos = espera_maxima_segundos
+        self.umbral_pendientes = umbral_pendientes
+        self._saturado = False
+
+        self._aviso = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.entregadas = 0
+        self.lotes = 0
+        self.reintentos = 0
+        self.fallidas = 0
+        self.ultimo_error: Optional[str] = None
+
+    # ==================== CICLO DE VIDA ====================
+
+    def iniciar(self) -> None:
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, name="despacho-notificaciones", daemon=True)
+            self._hilo.start()
+
+    def avisar(self) -> None:
+        """hay trabajo nuevo: despierta al worker (y lo arranca si hacia falta)"""
+        self.iniciar()
+        self._aviso.set()
+
+    def detener(self, drenar: bool = True, timeout: float = 10.0) -> None:
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        self._detener.set()
+        self._aviso.set()
+        if hilo is not None:
+            hilo.join(timeout)
+        if drenar:
+            # lo que quede y se pueda entregar ya; el resto espera al proximo arranque
+            try:
+                while self.procesar_lote():
+                    pass
+            except PyMongoError as e:
+                logger.warning("no se pudo drenar el outbox de notificaciones: %s", e)
+
+    # ==================== ENTREGA ====================
+
+    def procesar_lote(self) -> int:
+        """entrega un lote; retorna cuantas entradas del outbox tomo"""
+        lote = self._outbox.tomar_lote(self.tamano_lote, self.plazo_segundos)
+        if not lote:
+            return 0
+
+        documentos = [d for intento in lote for d in documentos_desde_intento(intento)]
+        try:
+            nuevas = self._notificaciones.insertar_idempotente(documentos)
+        except PyMongoError as e:
+            self.ultimo_error = str(e)
+            self.reintentos += len(lote)
+            self.fallidas += self._outbox.reprogramar(
+                lote, str(e), self.max_intentos, self.espera_maxima_segundos
+            )
+            logger.warning("entrega de notificaciones fallida, se reintenta: %s", e)
+            return len(lote)
+
+        self._outbox.completar([intento["_id"] for intento in lote])
+        self.lotes += 1
+        self.entregadas += len(nuevas)
+        if self._publicar is not None and nuevas:
+            self._publicar(nuevas)
+        return len(lote)
+
+    def _ciclo(self) -> None:
+        while not self._detener.is_set():
+            try:
+                tomadas = self.procesar_lote()
+            except PyMongoError as e:
+                # ni siquiera se pudo leer el outbox: esperar y volver a probar
+                self.ultimo_error = str(e)
+                logger.warning("outbox de notificaciones no disponible: %s", e)
+                tomadas = 0
+            if tomadas >= self.tamano_lote:
+                # lote lleno: hay atraso, ver si ya paso el umbral
+                self._vigilar_pendientes()
+            else:
+                # vacio (o casi): se puso al dia; dormir hasta el proximo aviso o el intervalo
+                self._saturado = False
+                self._aviso.wait(self.intervalo_segundos)
+                self._aviso.clear()
+
+    def _vigilar_pendientes(self) -> None:
+        try:
+            pendientes = self._outbox.contar_pendientes()
+        except PyMongoError:
+            return
+        saturado = pendientes >= self.umbral_pendientes
+        if saturado and not self._saturado:
+            logger.warning(
+                "outbox de notificaciones con %d pendientes (umbral %d): el despacho no da abasto",
+                pendientes, self.umbral_pendientes,
+            )
+        self._saturado = saturado
+
+    def estadisticas(self) -> Dict[str, Any]:
+        try:
+            pendientes: Optional[int] = self._outbox.contar_pendientes()
+        except PyMongoError:
+            pendientes = None
+        return {
+            "activo": self._hilo is not None and self._hilo.is_alive(),
+            "pendientes": pendientes,
+            "umbral_pendientes": self.umbral_pendientes,
+            "saturado": pendientes is not None and pendientes >= self.umbral_pendientes,
+            "entregadas": self.entregadas,
+            "lotes": self.lotes,
+            "reintentos": self.reintentos,
+            "fallidas": self.fallidas,
+            "ultimo_error": self.ultimo_error,
+        }
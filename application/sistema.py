@@ -1,21 +1,81 @@
 from __future__ import annotations
 
-from datetime import datetime
-from uuid import uuid4
-from typing import List, Optional
-
-from infrastructure.repositorio_usuarios_mongo import RepositorioUsuariosMongo
-from infrastructure.repositorio_incidentes_mongo import RepositorioIncidentesMongo
-from infrastructure.repositorio_solicitudes_mongo import RepositorioSolicitudesMongo
-from infrastructure.repositorio_notificaciones_mongo import RepositorioNotificacionesMongo
+import asyncio
+import heapq
+import os
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+
+from infrastructure.codec_mongo import (
+    CLASE_POR_TIPO_USUARIO,
+    decodificar_requerimiento,
+    decodificar_usuario,
+    emails_involucrados,
+)
+from infrastructure.repositorio_usuarios_mongo import RepositorioUsuariosMongo, RepositorioUsuariosMongoAsync
+from infrastructure.repositorio_incidentes_mongo import RepositorioIncidentesMongo, RepositorioIncidentesMongoAsync
+from infrastructure.repositorio_solicitudes_mongo import RepositorioSolicitudesMongo, RepositorioSolicitudesMongoAsync
+from infrastructure.secuencias_mongo import SecuenciaMongo
+from infrastructure.repositorio_notificaciones_mongo import (
+    RepositorioNotificacionesMongo,
+    RepositorioNotificacionesMongoAsync,
+)
+from infrastructure.repositorio_supervisiones_mongo import (
+    RepositorioSupervisionesMongo,
+    RepositorioSupervisionesMongoAsync,
+)
+from infrastructure.repositorio_outbox_mongo import (
+    RepositorioOutboxMongo,
+    RepositorioOutboxMongoAsync,
+    documento_intento,
+)
 
 from domain.usuarios import Usuario, Solicitante, Operador, Tecnico, Supervisor
 from domain.requerimientos import Requerimiento, Incidente, Solicitud
-from domain.servicios import Servicio
+from domain.servicios import CATALOGO_SERVICIOS, Servicio
 from domain.urgencias import Urgencia
 from domain.eventos import EventoFactory  # VOY A UTILIZAR PATRON !!! 
 from domain.registros import Notificacion, Comentario  #uso patron
 from domain.enums import TipoSolicitud
+from application.cache import CacheLRU
+from application.verificacion_passwords import PoolVerificacion
+from application.supervision import GrafoSupervision
+from application.despacho_notificaciones import DespachadorNotificaciones
+from application.bus_notificaciones import BusNotificaciones
+
+
+# al refrescar el grafo se relee este margen hacia atras: cubre escrituras de otros
+# workers con el reloj algo atrasado (reaplicar una relacion no tiene efecto)
+MARGEN_REFRESCO_SUPERVISIONES = timedelta(seconds=30)
+
+
+# notificaciones que conserva en memoria cada Supervisor (observer en dominio)
+NOTIFICACIONES_EN_MEMORIA = 100
+
+# listar_requerimientos devuelve siempre una pagina: nunca hidrata todo el historial
+PAGINA_REQUERIMIENTOS = 50
+PAGINA_REQUERIMIENTOS_MAXIMA = 500
+
+
+def memoria_proceso() -> Dict[str, Optional[int]]:
+    """rss actual (linux, /proc) y pico del proceso, en bytes"""
+    actual = pico = None
+    try:
+        with open("/proc/self/statm") as statm:
+            actual = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # linux: KB
+    except ImportError:
+        pass
+    return {"rss_bytes": actual, "rss_pico_bytes": pico}
 
 
 class SistemaAyuda:
@@ -25,23 +85,68 @@ class SistemaAyuda:
     
     """
 
-    def __init__(self) -> None:
+    def __init__(self, cache_usuarios_max: int = 1024, cache_usuarios_ttl: Optional[float] = 300.0,
+                 cache_requerimientos_max: int = 2048, cache_requerimientos_ttl: Optional[float] = 300.0,
+                 db: Optional[Database] = None, db_async: Optional[AsyncDatabase] = None) -> None:
+        # cache de identidades por email (acotado, con TTL)
+        self.usuarios = CacheLRU(cache_usuarios_max, cache_usuarios_ttl)
+        # supervisores vivos en este proceso (observer en dominio), acotado igual que usuarios:
+        # las relaciones estan en grafo_supervision y la historia en NOTIFICACIONES, desalojar
+        # uno solo pierde sus ultimas notificaciones en memoria
+        self._supervisores = CacheLRU(cache_usuarios_max, cache_usuarios_ttl)
+        # indice inverso empleado -> supervisores (a quien notificar), copia de "supervisiones"
+        self.grafo_supervision = GrafoSupervision()
+        self._supervisiones_hasta: Optional[datetime] = None
+        # requerimientos en uso, por id (acotado, con TTL: lo que no esta se hidrata desde Mongo)
+        self.requerimientos = CacheLRU(cache_requerimientos_max, cache_requerimientos_ttl)
         # listas
-        self.usuarios: List[Usuario] = []
-        self.requerimientos: List[Requerimiento] = []
         self.servicios: List[Servicio] = []
         self._inicializar_servicios()
 
-        #  repositorios en mongo
-        self.repositorio_usuarios = RepositorioUsuariosMongo()
-        self.repositorio_incidentes = RepositorioIncidentesMongo()
-        self.repositorio_solicitudes = RepositorioSolicitudesMongo()
-        self.repositorio_notificaciones = RepositorioNotificacionesMongo()
+        #  repositorios en mongo (sin db: la de ConexionMongo)
+        self.repositorio_usuarios = RepositorioUsuariosMongo(db)
+        self.repositorio_incidentes = RepositorioIncidentesMongo(db)
+        self.repositorio_solicitudes = RepositorioSolicitudesMongo(db)
+        self.repositorio_notificaciones = RepositorioNotificacionesMongo(db)
+        self.repositorio_supervisiones = RepositorioSupervisionesMongo(db)
+        self.repositorio_outbox = RepositorioOutboxMongo(db)
+
+        #  repositorios async (los usan los routers de la API)
+        self.repositorio_usuarios_async = RepositorioUsuariosMongoAsync(db_async)
+        self.repositorio_incidentes_async = RepositorioIncidentesMongoAsync(db_async)
+        self.repositorio_solicitudes_async = RepositorioSolicitudesMongoAsync(db_async)
+        self.repositorio_notificaciones_async = RepositorioNotificacionesMongoAsync(db_async)
+        self.repositorio_supervisiones_async = RepositorioSupervisionesMongoAsync(db_async)
+        self.repositorio_outbox_async = RepositorioOutboxMongoAsync(db_async)
+
+        #  notificaciones: se encolan en el outbox y las entrega un worker en segundo plano;
+        #  lo entregado se publica a los streams SSE abiertos en este proceso
+        self.bus_notificaciones = BusNotificaciones()
+        self.despachador_notificaciones = DespachadorNotificaciones(
+            self.repositorio_outbox, self.repositorio_notificaciones, self.bus_notificaciones.publicar
+        )
+
+        #  ids persistentes (compartidos entre workers); incidentes y solicitudes comparten numeracion
+        self._ids_requerimientos = SecuenciaMongo("requerimientos", db=db)
+        self._ids_usuarios = SecuenciaMongo("usuarios", db=db)
+
+        #  login: bcrypt en pool acotado (no bloquea el event loop)
+        self.pool_verificacion = PoolVerificacion()
 
     def _inicializar_servicios(self) -> None:
-        self.servicios.append(Servicio("Telefonía Celular", "Servicio de telefonía móvil"))
-        self.servicios.append(Servicio("Internet Banda Ancha", "Servicio de internet de alta velocidad"))
-        self.servicios.append(Servicio("Televisión", "Servicio de televisión por cable"))
+        # una instancia por servicio del catalogo, compartida por todos los requerimientos
+        self.servicios.extend(Servicio(nombre, descripcion) for nombre, descripcion in CATALOGO_SERVICIOS)
+        self._servicios_por_nombre: Dict[str, Servicio] = {s.nombre: s for s in self.servicios}
+
+    def buscar_servicio(self, nombre: Optional[str]) -> Optional[Servicio]:
+        return self._servicios_por_nombre.get(nombre)
+
+    def sincronizar_secuencias(self) -> None:
+        """alinea las secuencias con los ids ya guardados (datos previos a las secuencias)"""
+        self._ids_requerimientos.sembrar(
+            max(self.repositorio_incidentes.ultimo_id(), self.repositorio_solicitudes.ultimo_id())
+        )
+        self._ids_usuarios.sembrar(self.repositorio_usuarios.ultimo_id())
 
     # ==================== GESTIÓN DE USUARIOS ====================
 
@@ -49,23 +154,35 @@ class SistemaAyuda:
         if self._email_existe(email):
             raise ValueError(f"El email {email} ya está registrado")
 
-        usuario: Optional[Usuario] = None
-
-        if tipo_usuario == "solicitante":
-            usuario = Solicitante(nombre, email, password)
-        elif tipo_usuario == "operador":
-            usuario = Operador(nombre, email, password)
-        elif tipo_usuario == "tecnico":
-            usuario = Tecnico(nombre, email, password)
-        elif tipo_usuario == "supervisor":
-            usuario = Supervisor(nombre, email, password)
-        else:
+        usuario = self._construir_usuario(tipo_usuario, nombre, email, password, self._ids_usuarios.siguiente())
+        if usuario is None:
             raise ValueError(f"Tipo de usuario inválido: {tipo_usuario}")
 
-        self.repositorio_usuarios.guardar(tipo_usuario, usuario, password)
-        self.usuarios.append(usuario)
+        self.repositorio_usuarios.guardar(tipo_usuario, usuario)
+        self._recordar_usuario(usuario)
         return usuario
 
+    async def registrar_usuario_async(self, tipo_usuario: str, nombre: str, email: str, password: str) -> Usuario:
+        if await self.repositorio_usuarios_async.buscar_por_email_interno(email) is not None:
+            raise ValueError(f"El email {email} ya está registrado")
+
+        usuario_id = await self._ids_usuarios.siguiente_async()
+        # bcrypt es CPU: fuera del event loop
+        usuario = await asyncio.to_thread(self._construir_usuario, tipo_usuario, nombre, email, password, usuario_id)
+        if usuario is None:
+            raise ValueError(f"Tipo de usuario inválido: {tipo_usuario}")
+
+        await self.repositorio_usuarios_async.guardar(tipo_usuario, usuario)
+        self._recordar_usuario(usuario)
+        return usuario
+
+    def _construir_usuario(self, tipo_usuario: str, nombre: str, email: str, password: Optional[str],
+                           usuario_id: Optional[int] = None, password_hash: Optional[str] = None) -> Optional[Usuario]:
+        clase = CLASE_POR_TIPO_USUARIO.get(tipo_usuario)
+        if clase is None:
+            return None
+        return clase(nombre, email, password, usuario_id, password_hash)
+
     def autenticar(self, email: str, password: str) -> Optional[Usuario]:
         usuario = self._buscar_usuario_por_email(email)
         if usuario and usuario.verificar_password(password):
@@ -73,39 +190,116 @@ class SistemaAyuda:
             return usuario
         return None
 
+    async def autenticar_async(self, email: str, password: str) -> Optional[Usuario]:
+        """igual que autenticar, con bcrypt en el pool (puede lanzar PoolSaturadoError)"""
+        usuario = await self._buscar_usuario_por_email_async(email)
+        if usuario and await self.pool_verificacion.verificar(usuario, password):
+            usuario.actualizar_ultimo_acceso()
+            return usuario
+        return None
+
     def _email_existe(self, email: str) -> bool:
         doc = self.repositorio_usuarios.buscar_por_email_interno(email)
         return doc is not None
 
     def _buscar_usuario_por_email(self, email: str) -> Optional[Usuario]:
-        usuario_mem = next((u for u in self.usuarios if u.email == email), None)
+        usuario_mem = self._usuario_en_memoria(email)
         if usuario_mem:
             return usuario_mem
 
         doc = self.repositorio_usuarios.buscar_por_email_interno(email)
+        return self._usuario_desde_doc(doc)
+
+    async def _buscar_usuario_por_email_async(self, email: str) -> Optional[Usuario]:
+        usuario_mem = self._usuario_en_memoria(email)
+        if usuario_mem:
+            return usuario_mem
+
+        doc = await self.repositorio_usuarios_async.buscar_por_email_interno(email)
+        if not doc:
+            return None
+        if doc.get("password_hash"):
+            return self._usuario_desde_doc(doc)
+        # documento viejo con password plano: hay que hashear (CPU), fuera del event loop
+        return await asyncio.to_thread(self._usuario_desde_doc, doc)
+
+    async def _buscar_usuarios_por_email_async(self, emails: Iterable[str]) -> Dict[str, Usuario]:
+        """varios usuarios: primero el cache, los que falten con una sola consulta"""
+        encontrados: Dict[str, Usuario] = {}
+        faltantes: List[str] = []
+        for email in set(emails):
+            usuario = self._usuario_en_memoria(email)
+            if usuario:
+                encontrados[email] = usuario
+            else:
+                faltantes.append(email)
+        if not faltantes:
+            return encontrados
+
+        docs = await self.repositorio_usuarios_async.buscar_por_emails_interno(faltantes)
+        con_hash = [doc for doc in docs if doc.get("password_hash")]
+        viejos = [doc for doc in docs if not doc.get("password_hash")]
+        usuarios = [self._usuario_desde_doc(doc) for doc in con_hash]
+        if viejos:
+            usuarios += await asyncio.to_thread(lambda: [self._usuario_desde_doc(doc) for doc in viejos])
+        encontrados.update({u.email: u for u in usuarios if u is not None})
+        return encontrados
+
+    def _usuario_desde_doc(self, doc) -> Optional[Usuario]:
         if not doc:
             return None
 
-        tipo_usuario = doc.get("tipo_usuario")
-        nombre = doc.get("nombre")
-        email_doc = doc.get("email")
-        password_doc = doc.get("password")
-
-        usuario: Optional[Usuario] = None
-        if tipo_usuario == "solicitante":
-            usuario = Solicitante(nombre, email_doc, password_doc)
-        elif tipo_usuario == "operador":
-            usuario = Operador(nombre, email_doc, password_doc)
-        elif tipo_usuario == "tecnico":
-            usuario = Tecnico(nombre, email_doc, password_doc)
-        elif tipo_usuario == "supervisor":
-            usuario = Supervisor(nombre, email_doc, password_doc)
-        else:
+        usuario = decodificar_usuario(doc)
+        if usuario is None:
             return None
 
-        self.usuarios.append(usuario)
+        self.usuarios.guardar(usuario.email, usuario)
+        return usuario
+
+    def _usuario_en_memoria(self, email: str) -> Optional[Usuario]:
+        usuario = self.usuarios.obtener(email)
+        if usuario is None:
+            usuario = self._supervisores.obtener(email)
         return usuario
 
+    def _recordar_usuario(self, usuario: Usuario) -> None:
+        # escritura: se invalida lo que hubiera y se guarda la version nueva
+        self.usuarios.invalidar(usuario.email)
+        self.usuarios.guardar(usuario.email, usuario)
+        if isinstance(usuario, Supervisor):
+            self._supervisores.guardar(usuario.email, usuario)
+
+    def _buscar_usuarios_por_email(self, emails: Iterable[str]) -> Dict[str, Usuario]:
+        encontrados: Dict[str, Usuario] = {}
+        faltantes: List[str] = []
+        for email in set(emails):
+            usuario = self._usuario_en_memoria(email)
+            if usuario:
+                encontrados[email] = usuario
+            else:
+                faltantes.append(email)
+        if faltantes:
+            for doc in self.repositorio_usuarios.buscar_por_emails_interno(faltantes):
+                usuario = self._usuario_desde_doc(doc)
+                if usuario is not None:
+                    encontrados[usuario.email] = usuario
+        return encontrados
+
+    # ==================== WORKING SET DE REQUERIMIENTOS ====================
+
+    def _recordar_requerimiento(self, requerimiento: Requerimiento) -> None:
+        self.requerimientos.guardar(requerimiento.id, requerimiento)
+
+    def olvidar_requerimiento(self, requerimiento_id: int) -> None:
+        """los routers escriben directo en Mongo: la copia en memoria quedo vieja"""
+        self.requerimientos.invalidar(requerimiento_id)
+
+    def _hidratar_requerimientos(self, docs: List[Dict[str, Any]]) -> List[Requerimiento]:
+        """documentos -> dominio; los usuarios involucrados se traen con una sola consulta"""
+        usuarios = self._buscar_usuarios_por_email(emails_involucrados(docs))
+        requerimientos = [decodificar_requerimiento(doc, usuarios, self._servicios_por_nombre) for doc in docs]
+        return [r for r in requerimientos if r is not None]
+
     # ==================== GESTIÓN DE REQUERIMIENTOS ====================
 
     def crear_incidente(
@@ -118,8 +312,8 @@ class SistemaAyuda:
         if not isinstance(solicitante, Solicitante):
             raise ValueError("Solo los solicitantes pueden crear requerimientos")
 
-        incidente = Incidente(descripcion, solicitante, urgencia, servicio)
-        self.requerimientos.append(incidente)
+        incidente = Incidente(descripcion, solicitante, urgencia, servicio, self._ids_requerimientos.siguiente())
+        self._recordar_requerimiento(incidente)
 
         evento = EventoFactory.crear_evento_creacion(incidente, solicitante)
         incidente.agregar_evento(evento)
@@ -127,6 +321,48 @@ class SistemaAyuda:
         self.repositorio_incidentes.guardar(incidente)
         return incidente
 
+    async def crear_incidente_async(
+        self,
+        solicitante: Solicitante,
+        descripcion: str,
+        urgencia: Urgencia,
+        servicio: Optional[Servicio] = None
+    ) -> Incidente:
+        if not isinstance(solicitante, Solicitante):
+            raise ValueError("Solo los solicitantes pueden crear requerimientos")
+
+        incidente_id = await self._ids_requerimientos.siguiente_async()
+        incidente = Incidente(descripcion, solicitante, urgencia, servicio, incidente_id)
+        self._recordar_requerimiento(incidente)
+
+        evento = EventoFactory.crear_evento_creacion(incidente, solicitante)
+        incidente.agregar_evento(evento)
+
+        await self.repositorio_incidentes_async.guardar(incidente)
+        return incidente
+
+    async def crear_incidentes_lote_async(
+        self, pedidos: List[Tuple[Solicitante, str, Urgencia, Optional[Servicio]]]
+    ) -> List[Tuple[Incidente, Optional[str]]]:
+        """alta masiva: ids en bloque y un solo bulk_write. retorna (incidente, error) por pedido"""
+        if any(not isinstance(pedido[0], Solicitante) for pedido in pedidos):
+            raise ValueError("Solo los solicitantes pueden crear requerimientos")
+
+        ids = await self._ids_requerimientos.reservar_async(len(pedidos)) if pedidos else []
+        incidentes = []
+        for (solicitante, descripcion, urgencia, servicio), incidente_id in zip(pedidos, ids):
+            incidente = Incidente(descripcion, solicitante, urgencia, servicio, incidente_id)
+            incidente.agregar_evento(EventoFactory.crear_evento_creacion(incidente, solicitante))
+            incidentes.append(incidente)
+        return await self._guardar_lote_async(self.repositorio_incidentes_async, incidentes)
+
+    async def _guardar_lote_async(self, repositorio, requerimientos: List[Requerimiento]) -> List[Tuple[Any, Optional[str]]]:
+        errores = await repositorio.guardar_lote(requerimientos)
+        for i, requerimiento in enumerate(requerimientos):
+            if i not in errores:
+                self._recordar_requerimiento(requerimiento)
+        return [(r, errores.get(i)) for i, r in enumerate(requerimientos)]
+
     def crear_solicitud(
         self,
         solicitante: Solicitante,
@@ -137,8 +373,8 @@ class SistemaAyuda:
         if not isinstance(solicitante, Solicitante):
             raise ValueError("Solo los solicitantes pueden crear requerimientos")
 
-        solicitud = Solicitud(descripcion, solicitante, tipo_solicitud, servicio)
-        self.requerimientos.append(solicitud)
+        solicitud = Solicitud(descripcion, solicitante, tipo_solicitud, servicio, self._ids_requerimientos.siguiente())
+        self._recordar_requerimiento(solicitud)
 
         evento = EventoFactory.crear_evento_creacion(solicitud, solicitante)
         solicitud.agregar_evento(evento)
@@ -146,6 +382,41 @@ class SistemaAyuda:
         self.repositorio_solicitudes.guardar(solicitud)
         return solicitud
 
+    async def crear_solicitud_async(
+        self,
+        solicitante: Solicitante,
+        descripcion: str,
+        tipo_solicitud: TipoSolicitud,
+        servicio: Servicio
+    ) -> Solicitud:
+        if not isinstance(solicitante, Solicitante):
+            raise ValueError("Solo los solicitantes pueden crear requerimientos")
+
+        solicitud_id = await self._ids_requerimientos.siguiente_async()
+        solicitud = Solicitud(descripcion, solicitante, tipo_solicitud, servicio, solicitud_id)
+        self._recordar_requerimiento(solicitud)
+
+        evento = EventoFactory.crear_evento_creacion(solicitud, solicitante)
+        solicitud.agregar_evento(evento)
+
+        await self.repositorio_solicitudes_async.guardar(solicitud)
+        return solicitud
+
+    async def crear_solicitudes_lote_async(
+        self, pedidos: List[Tuple[Solicitante, str, TipoSolicitud, Servicio]]
+    ) -> List[Tuple[Solicitud, Optional[str]]]:
+        """alta masiva: ids en bloque y un solo bulk_write. retorna (solicitud, error) por pedido"""
+        if any(not isinstance(pedido[0], Solicitante) for pedido in pedidos):
+            raise ValueError("Solo los solicitantes pueden crear requerimientos")
+
+        ids = await self._ids_requerimientos.reservar_async(len(pedidos)) if pedidos else []
+        solicitudes = []
+        for (solicitante, descripcion, tipo_solicitud, servicio), solicitud_id in zip(pedidos, ids):
+            solicitud = Solicitud(descripcion, solicitante, tipo_solicitud, servicio, solicitud_id)
+            solicitud.agregar_evento(EventoFactory.crear_evento_creacion(solicitud, solicitante))
+            solicitudes.append(solicitud)
+        return await self._guardar_lote_async(self.repositorio_solicitudes_async, solicitudes)
+
     def asignar_tecnico(self, requerimiento: Requerimiento, tecnico: Tecnico, operador: Operador) -> None:
         if not isinstance(operador, Operador):
             raise ValueError("Solo los operadores pueden asignar técnicos")
@@ -164,7 +435,8 @@ class SistemaAyuda:
 
         self._notificar_supervisores(
             operador,
-            f"Operador {operador.nombre} asignó req #{requerimiento.id} a {tecnico.nombre}"
+            f"Operador {operador.nombre} asignó req #{requerimiento.id} a {tecnico.nombre}",
+            requerimiento.id,
         )
 
     def derivar_requerimiento(self, requerimiento: Requerimiento, tecnico_origen: Tecnico, tecnico_destino: Tecnico) -> None:
@@ -185,7 +457,8 @@ class SistemaAyuda:
 
         self._notificar_supervisores(
             tecnico_origen,
-            f"Técnico {tecnico_origen.nombre} derivó req #{requerimiento.id} a {tecnico_destino.nombre}"
+            f"Técnico {tecnico_origen.nombre} derivó req #{requerimiento.id} a {tecnico_destino.nombre}",
+            requerimiento.id,
         )
 
     def resolver_requerimiento(self, requerimiento: Requerimiento, tecnico: Tecnico, solucion: str) -> None:
@@ -206,7 +479,7 @@ class SistemaAyuda:
         elif isinstance(requerimiento, Solicitud):
             self.repositorio_solicitudes.actualizar(requerimiento)
 
-        self._notificar_supervisores(tecnico, f"Técnico {tecnico.nombre} resolvió req #{requerimiento.id}")
+        self._notificar_supervisores(tecnico, f"Técnico {tecnico.nombre} resolvió req #{requerimiento.id}", requerimiento.id)
 
     def reabrir_requerimiento(self, requerimiento: Requerimiento, usuario: Usuario, motivo: str) -> None:
         if not isinstance(usuario, (Operador, Tecnico)):
@@ -224,7 +497,11 @@ class SistemaAyuda:
         elif isinstance(requerimiento, Solicitud):
             self.repositorio_solicitudes.actualizar(requerimiento)
 
-        self._notificar_supervisores(usuario, f"{usuario.__class__.__name__} {usuario.nombre} reabrió req #{requerimiento.id}")
+        self._notificar_supervisores(
+            usuario,
+            f"{usuario.__class__.__name__} {usuario.nombre} reabrió req #{requerimiento.id}",
+            requerimiento.id,
+        )
 
     def agregar_comentario(self, requerimiento: Requerimiento, usuario: Usuario, texto: str) -> Comentario:
         comentario = requerimiento.agregar_comentario(texto, usuario)
@@ -238,14 +515,59 @@ class SistemaAyuda:
 
     # ==================== CONSULTAS ====================
 
-    def listar_requerimientos(self, usuario: Usuario) -> List[Requerimiento]:
+    @staticmethod
+    def _filtro_por_rol(usuario: Usuario) -> Optional[Dict[str, Any]]:
+        """solicitante: los suyos; operador/supervisor: todos; tecnico: los asignados"""
         if isinstance(usuario, Solicitante):
-            return [r for r in self.requerimientos if r.solicitante == usuario]
+            return {"solicitante_email": usuario.email}
         if isinstance(usuario, (Operador, Supervisor)):
-            return self.requerimientos
+            return {}
         if isinstance(usuario, Tecnico):
-            return [r for r in self.requerimientos if r.tecnico_asignado == usuario]
-        return []
+            return {"tecnico_asignado_email": usuario.email}
+        return None
+
+    def listar_requerimientos(self, usuario: Usuario, limite: int = PAGINA_REQUERIMIENTOS,
+                              despues_de: Optional[int] = None) -> List[Requerimiento]:
+        """
+        una pagina, por id: para la siguiente se pasa el ultimo id como `despues_de`
+        los ids salen de Mongo (incidentes y solicitudes); los residentes se sirven
+        de memoria y el resto se hidrata con una consulta por coleccion
+        """
+        filtro = self._filtro_por_rol(usuario)
+        if filtro is None:
+            return []
+        limite = max(1, min(limite, PAGINA_REQUERIMIENTOS_MAXIMA))
+        repositorios = (self.repositorio_incidentes, self.repositorio_solicitudes)
+        por_coleccion = [
+            [(requerimiento_id, repositorio) for requerimiento_id in repositorio.listar_ids(filtro, limite, despues_de)]
+            for repositorio in repositorios
+        ]
+        ids = list(islice(heapq.merge(*por_coleccion, key=lambda par: par[0]), limite))
+
+        encontrados: Dict[int, Requerimiento] = {}
+        faltantes: Dict[Any, List[int]] = {}
+        for requerimiento_id, repositorio in ids:
+            requerimiento = self.requerimientos.obtener(requerimiento_id)
+            if requerimiento is not None:
+                encontrados[requerimiento_id] = requerimiento
+            else:
+                faltantes.setdefault(repositorio, []).append(requerimiento_id)
+        for repositorio, faltan in faltantes.items():
+            for requerimiento in self._hidratar_requerimientos(repositorio.buscar_por_ids(faltan)):
+                self._recordar_requerimiento(requerimiento)
+                encontrados[requerimiento.id] = requerimiento
+        return [encontrados[i] for i, _ in ids if i in encontrados]
+
+    async def listar_requerimientos_por_rol_async(
+        self, usuario: Usuario, limite: int, despues_de: Optional[int] = None, resumen: bool = False
+    ) -> List[dict]:
+        """mismo criterio que listar_requerimientos, resuelto por Mongo sobre ambas colecciones"""
+        filtro = self._filtro_por_rol(usuario)
+        if filtro is None:
+            return []
+        return await self.repositorio_incidentes_async.listar_union(
+            self.repositorio_solicitudes_async, filtro, limite, despues_de, resumen
+        )
 
     def listar_servicios(self) -> List[Servicio]:
         return [s for s in self.servicios if s.activo]
@@ -258,38 +580,117 @@ class SistemaAyuda:
     def marcar_notificacion_leida(self, supervisor_email: str, notificacion_id: str) -> bool:
         return self.repositorio_notificaciones.marcar_leida(supervisor_email, notificacion_id)
 
+    async def listar_notificaciones_async(self, supervisor_email: str, solo_no_leidas: bool = False,
+                                          limite: Optional[int] = None):
+        return await self.repositorio_notificaciones_async.listar_por_supervisor(
+            supervisor_email, solo_no_leidas, limite
+        )
+
+    async def notificaciones_desde_async(self, supervisor_email: str, despues_de: ObjectId, limite: int = 500,
+                                         solo_no_leidas: bool = False, hasta: Optional[ObjectId] = None):
+        return await self.repositorio_notificaciones_async.listar_desde(
+            supervisor_email, despues_de, limite, solo_no_leidas, hasta
+        )
+
+    async def marcar_notificaciones_leidas_async(self, supervisor_email: str, ids: Optional[List[str]] = None,
+                                                 hasta: Optional[datetime] = None) -> int:
+        return await self.repositorio_notificaciones_async.marcar_leidas(supervisor_email, ids, hasta)
+
+    def contar_notificaciones_no_leidas(self, supervisor_email: str) -> int:
+        return self.repositorio_notificaciones.contar_no_leidas(supervisor_email)
+
+    async def contar_notificaciones_no_leidas_async(self, supervisor_email: str) -> int:
+        return await self.repositorio_notificaciones_async.contar_no_leidas(supervisor_email)
+
+    async def marcar_notificacion_leida_async(self, supervisor_email: str, notificacion_id: str) -> bool:
+        return await self.repositorio_notificaciones_async.marcar_leida(supervisor_email, notificacion_id)
+
     # ==================== OBSERVER PATTERN ==================== !!!!1 el que avisa
 
-    def _notificar_supervisores(self, empleado: Usuario, mensaje: str) -> None:
-        supervisores = [u for u in self.usuarios if isinstance(u, Supervisor)]
-
-        for supervisor in supervisores:
-            #  compara por email
-            supervisa = any(s.email == empleado.email for s in supervisor.supervisados)
-            if supervisa:
-                # memoria
-                notificacion = Notificacion(mensaje, empleado)
-                supervisor.recibir_notificacion(notificacion)
-
-                # Mongo  "verpendi"
-                self.repositorio_notificaciones.crear({
-                    "id": str(uuid4()),
-                    "supervisor_email": supervisor.email,
-                    "texto": mensaje,
-                    "autor_email": empleado.email,
-                    "autor_nombre": empleado.nombre,
-                    "fecha": datetime.now().isoformat(),
-                    "tipo_evento": "evento",
-                    "requerimiento_id": None,
-                    "leida": False
-                })
+    def _avisar_en_memoria(self, supervisor_emails: List[str], empleado: Usuario, mensaje: str) -> None:
+        # observer en dominio: solo los supervisores que viven en este proceso
+        for email in supervisor_emails:
+            supervisor = self._supervisores.obtener(email)
+            if supervisor:
+                supervisor.recibir_notificacion(Notificacion(mensaje, empleado))
+                # la historia completa esta en NOTIFICACIONES; en memoria solo las ultimas
+                del supervisor.notificaciones[:-NOTIFICACIONES_EN_MEMORIA]
+
+    def _notificar_supervisores(self, empleado: Usuario, mensaje: str, requerimiento_id: Optional[int] = None) -> None:
+        # solo los supervisores del empleado (indice inverso)
+        supervisor_emails = self.grafo_supervision.supervisores_de(empleado.email)
+        if not supervisor_emails:
+            return
+        self._avisar_en_memoria(supervisor_emails, empleado, mensaje)
+        # un solo insert chico al outbox; el fan-out a NOTIFICACIONES lo hace el despachador
+        self.repositorio_outbox.encolar(
+            documento_intento(supervisor_emails, mensaje, empleado, "evento", requerimiento_id)
+        )
+        self.despachador_notificaciones.avisar()
+
+    async def notificar_supervisores_async(
+        self, empleado: Usuario, mensaje: str, requerimiento_id: Optional[int] = None
+    ) -> None:
+        supervisor_emails = self.grafo_supervision.supervisores_de(empleado.email)
+        if not supervisor_emails:
+            return
+        self._avisar_en_memoria(supervisor_emails, empleado, mensaje)
+        await self.repositorio_outbox_async.encolar(
+            documento_intento(supervisor_emails, mensaje, empleado, "evento", requerimiento_id)
+        )
+        self.despachador_notificaciones.avisar()
 
-    def asignar_supervisor(self, supervisor: Supervisor, empleado: Usuario) -> None:
+    def _vincular_supervisor(self, supervisor: Supervisor, empleado: Usuario) -> None:
         if not isinstance(supervisor, Supervisor):
             raise ValueError("El primer argumento debe ser un Supervisor")
         if not isinstance(empleado, (Operador, Tecnico)):
             raise ValueError("Solo se puede supervisar Operadores y Técnicos")
         supervisor.agregar_supervisado(empleado)
+        self.grafo_supervision.agregar(supervisor.email, empleado.email)
+
+        # la entrada vieja (si la hay) se reemplaza por la instancia que se acaba de modificar
+        self._recordar_usuario(supervisor)
+        self._recordar_usuario(empleado)
+
+    def asignar_supervisor(self, supervisor: Supervisor, empleado: Usuario) -> None:
+        self._vincular_supervisor(supervisor, empleado)
+        self.repositorio_supervisiones.guardar(supervisor.email, empleado.email)
+
+    async def asignar_supervisor_async(self, supervisor: Supervisor, empleado: Usuario) -> None:
+        self._vincular_supervisor(supervisor, empleado)
+        await self.repositorio_supervisiones_async.guardar(supervisor.email, empleado.email)
+
+    def _aplicar_supervisiones(self, docs: List[dict]) -> int:
+        for doc in docs:
+            self.grafo_supervision.agregar(doc["supervisor_email"], doc["empleado_email"])
+            if self._supervisiones_hasta is None or doc["actualizado"] > self._supervisiones_hasta:
+                self._supervisiones_hasta = doc["actualizado"]
+        return len(docs)
+
+    def cargar_supervisiones(self) -> int:
+        """grafo completo desde Mongo (al arrancar)"""
+        return self._aplicar_supervisiones(self.repositorio_supervisiones.listar_desde(None))
+
+    async def refrescar_supervisiones_async(self) -> int:
+        """solo las relaciones nuevas/modificadas desde la ultima lectura (las de otros workers)"""
+        desde = None
+        if self._supervisiones_hasta is not None:
+            desde = self._supervisiones_hasta - MARGEN_REFRESCO_SUPERVISIONES
+        return self._aplicar_supervisiones(await self.repositorio_supervisiones_async.listar_desde(desde))
+
+    # ==================== METRICAS ====================
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            "memoria": memoria_proceso(),
+            "cache_usuarios": self.usuarios.estadisticas(),
+            "cache_requerimientos": self.requerimientos.estadisticas(),
+            "cache_supervisores": self._supervisores.estadisticas(),
+            "relaciones_supervision": len(self.grafo_supervision),
+            "verificacion_passwords": self.pool_verificacion.metricas(),
+            "despacho_notificaciones": self.despachador_notificaciones.estadisticas(),
+            "streams_notificaciones": self.bus_notificaciones.estadisticas(),
+        }
         
         
         
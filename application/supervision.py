@@ -0,0 +1,27 @@
+import threading
+from typing import Dict, List, Set
+
+
+class GrafoSupervision:
+    """
+    relaciones supervisor -> empleados, indexadas por empleado (empleado -> supervisores)
+    para que notificar cueste O(destinatarios) y no O(supervisores x supervisados).
+    thread-safe (se usa desde el event loop y desde el threadpool)
+    """
+
+    def __init__(self) -> None:
+        self._supervisores_de: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, supervisor_email: str, empleado_email: str) -> None:
+        with self._lock:
+            self._supervisores_de.setdefault(empleado_email, set()).add(supervisor_email)
+
+    def supervisores_de(self, empleado_email: str) -> List[str]:
+        with self._lock:
+            return sorted(self._supervisores_de.get(empleado_email, ()))
+
+    def __len__(self) -> int:
+        """cantidad de relaciones"""
+        with self._lock:
+            return sum(len(emails) for emails in self._supervisores_de.values())
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from domain.usuarios import Usuario
+
+
+class PoolSaturadoError(Exception):
+    """hay demasiadas verificaciones pendientes; el cliente debe reintentar"""
+
+
+class PoolVerificacion:
+    """
+    verifica passwords (bcrypt checkpw) en un pool acotado de threads
+    bcrypt libera el GIL, asi que escala con los nucleos sin bloquear el event loop.
+    si la cola supera max_pendientes se rechaza en vez de acumular latencia
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pendientes: int = 64) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pendientes = 0
+        self._en_curso = 0
+        self.verificaciones = 0
+        self.rechazadas = 0
+
+    def _verificar(self, usuario: Usuario, password: str) -> bool:
+        with self._lock:
+            self._en_curso += 1
+        try:
+            return usuario.verificar_password(password)
+        finally:
+            with self._lock:
+                self._en_curso -= 1
+
+    async def verificar(self, usuario: Usuario, password: str) -> bool:
+        with self._lock:
+            if self._pendientes >= self.max_pendientes:
+                self.rechazadas += 1
+                raise PoolSaturadoError("Demasiados inicios de sesión en curso, reintente en unos segundos")
+            self._pendientes += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._verificar, usuario, password)
+        finally:
+            with self._lock:
+                self._pendientes -= 1
+                self.verificaciones += 1
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pendientes": self.max_pendientes,
+                "en_curso": self._en_curso,
+                "en_cola": self._pendientes - self._en_curso,
+                "verificaciones": self.verificaciones,
+                "rechazadas": self.rechazadas,
+            }
+
+    def cerrar(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
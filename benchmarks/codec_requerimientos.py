@@ -0,0 +1,76 @@
+"""
+throughput del codec de requerimientos (documentos por segundo): alta completa,
+solo escalares (lo que arma cada actualizar) y decodificacion de vuelta a dominio
+
+    python -m benchmarks.codec_requerimientos
+    python -m benchmarks.codec_requerimientos --tickets 20000 --eventos 12 --comentarios 6
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.memoria_requerimientos import armar_tickets
+from infrastructure.codec_mongo import (
+    codificar_escalares,
+    codificar_requerimiento,
+    decodificar_requerimiento,
+)
+from infrastructure.repositorio_requerimientos_mongo import COLA_EVENTOS
+
+
+def _por_segundo(funcion: Callable[[], None], cantidad: int, repeticiones: int) -> int:
+    # la mejor de varias corridas: descarta ruido del scheduler y del GC
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return int(cantidad / mejor)
+
+
+def medir(cantidad: int, eventos: int, comentarios: int, repeticiones: int = 5) -> Dict[str, int]:
+    tickets = armar_tickets(cantidad, eventos, comentarios)
+    documentos = [codificar_requerimiento(t, COLA_EVENTOS) for t in tickets]
+
+    usuarios = {}
+    for ticket in tickets:
+        for registro in ticket.eventos + ticket.comentarios:
+            usuarios[registro.autor.email] = registro.autor
+        usuarios[ticket.solicitante.email] = ticket.solicitante
+    servicios = {t.servicio.nombre: t.servicio for t in tickets if t.servicio is not None}
+
+    def decodificar() -> List:
+        return [decodificar_requerimiento(d, usuarios, servicios) for d in documentos]
+
+    decodificados = decodificar()
+    assert all(r is not None for r in decodificados), "hay documentos que no vuelven a dominio"
+
+    return {
+        "tickets": cantidad,
+        "alta_por_segundo": _por_segundo(
+            lambda: [codificar_requerimiento(t, COLA_EVENTOS) for t in tickets], cantidad, repeticiones
+        ),
+        "escalares_por_segundo": _por_segundo(
+            lambda: [codificar_escalares(t) for t in tickets], cantidad, repeticiones
+        ),
+        "decodificar_por_segundo": _por_segundo(decodificar, cantidad, repeticiones),
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--eventos", type=int, default=8)
+    parser.add_argument("--comentarios", type=int, default=4)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for clave, valor in medir(args.tickets, args.eventos, args.comentarios, args.repeticiones).items():
+        print(f"{clave:>24}: {valor}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
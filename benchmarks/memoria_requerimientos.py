@@ -0,0 +1,97 @@
+"""
+memoria por requerimiento en el dominio (tracemalloc), con historial realista:
+cada ticket con sus eventos y comentarios, usuarios y servicios compartidos
+
+    python -m benchmarks.memoria_requerimientos
+    python -m benchmarks.memoria_requerimientos --tickets 20000 --eventos 12 --comentarios 6
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from typing import List
+
+from domain.enums import TipoSolicitud
+from domain.eventos import EventoFactory
+from domain.requerimientos import Incidente, Requerimiento, Solicitud
+from domain.servicios import CATALOGO_SERVICIOS, Servicio
+from domain.urgencias import URGENCIAS
+from domain.usuarios import Operador, Solicitante, Tecnico
+
+# con hash ya calculado: el benchmark no mide bcrypt
+_HASH = "$2b$12$" + "x" * 53
+
+
+def _usuarios(cantidad: int, clase, dominio: str) -> list:
+    return [clase(f"{clase.__name__} {i}", f"{clase.__name__.lower()}{i}@{dominio}", None, i + 1, _HASH)
+            for i in range(cantidad)]
+
+
+def armar_tickets(cantidad: int, eventos: int, comentarios: int) -> List[Requerimiento]:
+    solicitantes = _usuarios(200, Solicitante, "gmail.com")
+    operadores = _usuarios(10, Operador, "comunicarlos.com.ar")
+    tecnicos = _usuarios(30, Tecnico, "comunicarlos.com.ar")
+    servicios = [Servicio(nombre, descripcion) for nombre, descripcion in CATALOGO_SERVICIOS]
+    urgencias = list(URGENCIAS.values())
+
+    tickets: List[Requerimiento] = []
+    for i in range(cantidad):
+        solicitante = solicitantes[i % len(solicitantes)]
+        servicio = servicios[i % len(servicios)]
+        if i % 4:
+            ticket: Requerimiento = Incidente(f"Problema #{i} con {servicio.nombre}", solicitante,
+                                              urgencias[i % len(urgencias)], servicio, i + 1)
+        else:
+            ticket = Solicitud(f"Alta de {servicio.nombre} #{i}", solicitante, TipoSolicitud.ALTA_SERVICIO,
+                               servicio, i + 1)
+        ticket.agregar_evento(EventoFactory.crear_evento_creacion(ticket, solicitante))
+        for j in range(eventos - 1):
+            tecnico = tecnicos[(i + j) % len(tecnicos)]
+            ticket.asignar_tecnico(tecnico)
+            ticket.agregar_evento(EventoFactory.crear_evento_asignacion(ticket, tecnico, operadores[j % len(operadores)]))
+        for j in range(comentarios):
+            autor = solicitante if j % 2 == 0 else ticket.tecnico_asignado or solicitante
+            ticket.agregar_comentario(f"Comentario {j} sobre el ticket #{ticket.id}", autor)
+        ticket.marcar_persistido()
+        tickets.append(ticket)
+    return tickets
+
+
+def medir(cantidad: int, eventos: int, comentarios: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    antes, _ = tracemalloc.get_traced_memory()
+    tickets = armar_tickets(cantidad, eventos, comentarios)
+    gc.collect()
+    despues, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    muestra = tickets[-1]
+    return {
+        "tickets": len(tickets),
+        "eventos_por_ticket": eventos,
+        "comentarios_por_ticket": comentarios,
+        "bytes_por_ticket": (despues - antes) // len(tickets),
+        "bytes_pico_por_ticket": (pico - antes) // len(tickets),
+        "instancia_ticket": sys.getsizeof(muestra),
+        "instancia_evento": sys.getsizeof(muestra.eventos[0]),
+        "instancia_comentario": sys.getsizeof(muestra.comentarios[0]) if muestra.comentarios else None,
+        "con_dict": any(hasattr(o, "__dict__") for o in (muestra, muestra.eventos[0], muestra.solicitante)),
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--eventos", type=int, default=8)
+    parser.add_argument("--comentarios", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    for clave, valor in medir(args.tickets, args.eventos, args.comentarios).items():
+        print(f"{clave:>24}: {valor}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -14,6 +14,8 @@ class Evento(Registro):
     atributo
         tipo: Tipo de evento (enum)
     """
+
+    __slots__ = ("tipo",)
     
     def __init__(self, texto: str, autor: 'Usuario', tipo: TipoEvento) -> None:
         super().__init__(texto, autor)
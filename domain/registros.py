@@ -15,6 +15,9 @@ class Registro(ABC):
         autor: Usuario que creó el registro
         fecha: Timestamp de creación automático
     """
+
+    # sin __dict__ por instancia: hay un registro por comentario/evento de cada ticket
+    __slots__ = ("texto", "autor", "fecha")
     
     def __init__(self, texto: str, autor: 'Usuario') -> None:
         self.texto: str = texto
@@ -32,7 +35,8 @@ class Comentario(Registro):
     
     LO DEJO IGUAL PARA FUTURO !!!!!!!!!!
     """
-    pass
+
+    __slots__ = ()
 
 
 class Notificacion(Registro):
@@ -42,6 +46,8 @@ class Notificacion(Registro):
     Atributos:
         leida: Indica si la notificación fue vista
     """
+
+    __slots__ = ("leida",)
     
     def __init__(self, texto: str, autor: 'Usuario') -> None:
         super().__init__(texto, autor)
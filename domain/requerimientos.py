@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Set, Tuple, TYPE_CHECKING
 
 from domain.enums import EstadoRequerimiento, TipoSolicitud
 from domain.registros import Comentario
@@ -11,18 +11,29 @@ from domain.servicios import Servicio
 if TYPE_CHECKING:
     from domain.usuarios import Usuario, Solicitante, Tecnico, Operador
 
+# las solicitudes no tienen urgencia: todas comparten esta prioridad
+PRIORIDAD_SOLICITUD = 5
+
 
 class Requerimiento(ABC):
     """
     clase base abstracta 
     
     """
-    
+
+    __slots__ = (
+        "id", "descripcion", "solicitante", "estado", "tecnico_asignado", "fecha_creacion",
+        "fecha_resolucion", "comentarios", "eventos",
+        "_campos_modificados", "_comentarios_persistidos", "_eventos_persistidos",
+    )
     _contador_id: int = 0
     
-    def __init__(self, descripcion: str, solicitante: 'Solicitante') -> None:
-        Requerimiento._contador_id += 1
-        self.id: int = Requerimiento._contador_id
+    def __init__(self, descripcion: str, solicitante: 'Solicitante', id: Optional[int] = None) -> None:
+        if id is None:
+            # sin id persistente (demo/tests): contador local
+            Requerimiento._contador_id += 1
+            id = Requerimiento._contador_id
+        self.id: int = id
         self.descripcion: str = descripcion
         self.solicitante: 'Solicitante' = solicitante
         self.estado: EstadoRequerimiento = EstadoRequerimiento.ABIERTO
@@ -31,6 +42,11 @@ class Requerimiento(ABC):
         self.fecha_resolucion: Optional[datetime] = None
         self.comentarios: List[Comentario] = []
         self.eventos: List[Evento] = []
+
+        # seguimiento de cambios (lo que falta persistir desde el ultimo guardado)
+        self._campos_modificados: Set[str] = set()
+        self._comentarios_persistidos: int = 0
+        self._eventos_persistidos: int = 0
     
     def agregar_comentario(self, texto: str, autor: 'Usuario') -> Comentario:
         """agrega un comentario """
@@ -46,21 +62,51 @@ class Requerimiento(ABC):
         """asigna un técnico al requerimiento"""
         self.tecnico_asignado = tecnico
         self.estado = EstadoRequerimiento.EN_PROCESO
+        self._marcar_modificado("tecnico_asignado", "estado")
     
     def resolver(self, solucion: str) -> None:
         """marca el requerimiento como resuelto"""
         self.estado = EstadoRequerimiento.RESUELTO
         self.fecha_resolucion = datetime.now()
+        self._marcar_modificado("estado", "fecha_resolucion")
     
     def reabrir(self) -> None:
         """reabre un requerimiento resuelto"""
         if self.estado == EstadoRequerimiento.RESUELTO:
             self.estado = EstadoRequerimiento.REABIERTO
             self.fecha_resolucion = None
+            self._marcar_modificado("estado", "fecha_resolucion")
     
     def derivar(self, nuevo_tecnico: 'Tecnico') -> None:
         """deriva el requerimiento a otro tec"""
         self.tecnico_asignado = nuevo_tecnico
+        self._marcar_modificado("tecnico_asignado")
+
+    # ==================== SEGUIMIENTO DE CAMBIOS ====================
+
+    def _marcar_modificado(self, *campos: str) -> None:
+        self._campos_modificados.update(campos)
+
+    def cambios_pendientes(self) -> Tuple[Set[str], List[Comentario], List[Evento]]:
+        """campos modificados + comentarios y eventos nuevos desde el ultimo guardado"""
+        return (
+            set(self._campos_modificados),
+            self.comentarios[self._comentarios_persistidos:],
+            self.eventos[self._eventos_persistidos:],
+        )
+
+    def tiene_cambios(self) -> bool:
+        return (
+            bool(self._campos_modificados)
+            or len(self.comentarios) > self._comentarios_persistidos
+            or len(self.eventos) > self._eventos_persistidos
+        )
+
+    def marcar_persistido(self) -> None:
+        """el repositorio lo llama despues de guardar/actualizar"""
+        self._campos_modificados.clear()
+        self._comentarios_persistidos = len(self.comentarios)
+        self._eventos_persistidos = len(self.eventos)
     
     @abstractmethod
     def calcular_prioridad(self) -> int:
@@ -79,9 +125,12 @@ class Incidente(Requerimiento):
    
          estrategia de urgencia (crítica/importante/menor)
     """
+
+    __slots__ = ("urgencia", "servicio")
     
-    def __init__(self, descripcion: str, solicitante: 'Solicitante', urgencia: Urgencia, servicio: Optional[Servicio] = None) -> None:
-        super().__init__(descripcion, solicitante)
+    def __init__(self, descripcion: str, solicitante: 'Solicitante', urgencia: Urgencia, servicio: Optional[Servicio] = None,
+                 id: Optional[int] = None) -> None:
+        super().__init__(descripcion, solicitante, id)
         self.urgencia: Urgencia = urgencia
         self.servicio: Optional[Servicio] = servicio
     
@@ -92,6 +141,7 @@ class Incidente(Requerimiento):
     def cambiar_urgencia(self, nueva_urgencia: Urgencia) -> None:
         """cambia la estrategia de urgencia en runtime"""
         self.urgencia = nueva_urgencia
+        self._marcar_modificado("urgencia")
 
 
 class Solicitud(Requerimiento):
@@ -101,12 +151,15 @@ class Solicitud(Requerimiento):
     
    
     """
+
+    __slots__ = ("tipo_solicitud", "servicio")
     
-    def __init__(self, descripcion: str, solicitante: 'Solicitante', tipo_solicitud: TipoSolicitud, servicio: Servicio) -> None:
-        super().__init__(descripcion, solicitante)
+    def __init__(self, descripcion: str, solicitante: 'Solicitante', tipo_solicitud: TipoSolicitud, servicio: Servicio,
+                 id: Optional[int] = None) -> None:
+        super().__init__(descripcion, solicitante, id)
         self.tipo_solicitud: TipoSolicitud = tipo_solicitud
         self.servicio: Servicio = servicio
     
     def calcular_prioridad(self) -> int:
         """las solicitudes tienen prioridad fija"""
-        return 5
\ No newline at end of file
+        return PRIORIDAD_SOLICITUD
\ No newline at end of file
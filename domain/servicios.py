@@ -1,4 +1,16 @@
 
+from typing import Tuple
+
+
+# catalogo de la cooperativa: el sistema crea una instancia por servicio y todos
+# los requerimientos la comparten (flyweight)
+CATALOGO_SERVICIOS: Tuple[Tuple[str, str], ...] = (
+    ("Telefonía Celular", "Servicio de telefonía móvil"),
+    ("Internet Banda Ancha", "Servicio de internet de alta velocidad"),
+    ("Televisión", "Servicio de televisión por cable"),
+)
+
+
 class Servicio:
   
     #representa un servicio ofrecido por la cooperativa
@@ -6,6 +18,7 @@ class Servicio:
     
    
     
+    __slots__ = ("id", "nombre", "descripcion", "activo")
     _contador_id: int = 0
     
     def __init__(self, nombre: str, descripcion: str) -> None:
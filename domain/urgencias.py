@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Optional
 
 
 class Urgencia(ABC):  #me llaman en la clase requrimeintos
     """
     interfaz para el patrón Strategy de urgencias
     define el contrato para calcular prioridad
+
+    las estrategias no tienen estado: flyweight, una sola instancia por clase
+    (UrgenciaCritica() siempre devuelve la misma)
     """
+
+    __slots__ = ()
+    _instancias: Dict[type, "Urgencia"] = {}
+
+    def __new__(cls) -> "Urgencia":
+        instancia = Urgencia._instancias.get(cls)
+        if instancia is None:
+            instancia = super().__new__(cls)
+            Urgencia._instancias[cls] = instancia
+        return instancia
     
     @abstractmethod
     def calcular_prioridad(self) -> int:
@@ -23,6 +37,8 @@ class UrgenciaCritica(Urgencia):
     si la urgencia es crítica - máxima prioridad
     para problemas graves que requieren atencion  inmediata
     """
+
+    __slots__ = ()
     
     def calcular_prioridad(self) -> int:
         """retorna prioridad max"""
@@ -38,6 +54,8 @@ class UrgenciaImportante(Urgencia):
     urgencia importante - prioridad media
     para problemas que afectan el servicio
     """
+
+    __slots__ = ()
     
     def calcular_prioridad(self) -> int:
         """retorna prioridad media"""
@@ -53,6 +71,8 @@ class UrgenciaMenor(Urgencia):
     urgencia menor - baja prioridad
      para problemas menores que no afectan tanto el servicio
     """
+
+    __slots__ = ()
     
     def calcular_prioridad(self) -> int:
         """retorna prioridad baja"""
@@ -60,4 +80,19 @@ class UrgenciaMenor(Urgencia):
     
     def get_nombre(self) -> str:
         """retorna nombre de la urgencia"""
-        return "Menor"
\ No newline at end of file
+        return "Menor"
+
+
+# claves que recibe la API -> estrategia compartida
+URGENCIAS: Dict[str, Urgencia] = {
+    "critica": UrgenciaCritica(),
+    "importante": UrgenciaImportante(),
+    "menor": UrgenciaMenor(),
+}
+
+_POR_NOMBRE: Dict[str, Urgencia] = {u.get_nombre(): u for u in URGENCIAS.values()}
+
+
+def urgencia_por_nombre(nombre: Optional[str]) -> Optional[Urgencia]:
+    """estrategia a partir del nombre guardado en Mongo ("Crítica", ...)"""
+    return _POR_NOMBRE.get(nombre)
@@ -9,15 +9,22 @@ class Usuario(ABC):
     """
     clase base abstracta para todos los usuarios 
     """
+
+    __slots__ = ("id", "nombre", "email", "password_hash", "fecha_creacion", "ultimo_acceso")
     
     _contador_id: int = 0
     
-    def __init__(self, nombre: str, email: str, password: str) -> None:
-        Usuario._contador_id += 1
-        self.id: int = Usuario._contador_id
+    def __init__(self, nombre: str, email: str, password: Optional[str], id: Optional[int] = None,
+                 password_hash: Optional[str] = None) -> None:
+        if id is None:
+            # sin id persistente (demo/tests): contador local
+            Usuario._contador_id += 1
+            id = Usuario._contador_id
+        self.id: int = id
         self.nombre: str = nombre
         self.email: str = email
-        self.password_hash: str = self._hashear_password(password)
+        # si ya viene el hash (usuario guardado) no se vuelve a correr bcrypt
+        self.password_hash: str = password_hash if password_hash is not None else self._hashear_password(password)
         self.fecha_creacion: datetime = datetime.now()
         self.ultimo_acceso: Optional[datetime] = None
     
@@ -44,6 +51,15 @@ class Usuario(ABC):
         """det etermina si el usuario puede asignar técnicos """
         pass
     
+    def __eq__(self, otro: object) -> bool:
+        # identidad por email (unico): dos instancias del mismo usuario son iguales
+        if not isinstance(otro, Usuario):
+            return NotImplemented
+        return self.email == otro.email
+
+    def __hash__(self) -> int:
+        return hash(self.email)
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}: {self.nombre} ({self.email})"
 
@@ -53,6 +69,8 @@ class Solicitante(Usuario):
     Usuario que crea requerimientos y ve solo los suyos
     puede usar cualq email
     """
+
+    __slots__ = ()
     
     def puede_crear_requerimiento(self) -> bool:
         return True
@@ -67,11 +85,14 @@ class Operador(Usuario):
     Ve todos los requerimientos del sistema
     Email debe ser @comunicarlos.com.ar
     """
+
+    __slots__ = ()
     
-    def __init__(self, nombre: str, email: str, password: str) -> None:
+    def __init__(self, nombre: str, email: str, password: Optional[str], id: Optional[int] = None,
+                 password_hash: Optional[str] = None) -> None:
         if not email.endswith("@comunicarlos.com.ar"):
             raise ValueError("Email de operador debe ser @comunicarlos.com.ar")
-        super().__init__(nombre, email, password)
+        super().__init__(nombre, email, password, id, password_hash)
     
     def puede_crear_requerimiento(self) -> bool:
         return False
@@ -86,11 +107,14 @@ class Tecnico(Usuario):
     Puede derivar tickets a otros técnicos
     email debe ser @comunicarlos.com.ar
     """
+
+    __slots__ = ()
     
-    def __init__(self, nombre: str, email: str, password: str) -> None:
+    def __init__(self, nombre: str, email: str, password: Optional[str], id: Optional[int] = None,
+                 password_hash: Optional[str] = None) -> None:
         if not email.endswith("@comunicarlos.com.ar"):
             raise ValueError("Email de técnico debe ser @comunicarlos.com.ar")
-        super().__init__(nombre, email, password)
+        super().__init__(nombre, email, password, id, password_hash)
     
     def puede_crear_requerimiento(self) -> bool:
         return False
@@ -109,11 +133,14 @@ class Supervisor(Usuario):
         supervisados: Lista de usuarios supervisados
         notificaciones: Lista de notificaciones recibidas
     """
+
+    __slots__ = ("supervisados", "notificaciones")
     
-    def __init__(self, nombre: str, email: str, password: str) -> None:
+    def __init__(self, nombre: str, email: str, password: Optional[str], id: Optional[int] = None,
+                 password_hash: Optional[str] = None) -> None:
         if not email.endswith("@comunicarlos.com.ar"):
             raise ValueError("Email de supervisor debe ser @comunicarlos.com.ar")
-        super().__init__(nombre, email, password)
+        super().__init__(nombre, email, password, id, password_hash)
         self.supervisados: List[Usuario] = []
         self.notificaciones: List[Notificacion] = []
     
@@ -0,0 +1,86 @@
+"""
+mueve las notificaciones viejas (leidas o no) de NOTIFICACIONES a
+NOTIFICACIONES_archivo, por lotes. pensado para correr periodicamente:
+
+    python -m infrastructure.archivar_notificaciones            # NOTIFICACIONES_ARCHIVO_DIAS (180)
+    python -m infrastructure.archivar_notificaciones --dias 90
+"""
+
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from infrastructure.conexion_mongo import ConexionMongo
+from infrastructure.repositorio_notificaciones_mongo import COLECCION_CONTADORES
+
+COLECCION_ARCHIVO = "NOTIFICACIONES_archivo"
+ARCHIVO_DIAS = int(os.getenv("NOTIFICACIONES_ARCHIVO_DIAS", "180"))
+
+_CLAVE_DUPLICADA = 11000
+
+
+def _corte(antes_de: datetime) -> ObjectId:
+    """
+    `fecha` se guarda naive en hora local (datetime.now()): un corte naive se
+    toma en hora local igual que ellas; el _id lleva la hora en UTC
+    """
+    if antes_de.tzinfo is None:
+        antes_de = antes_de.astimezone()
+    return ObjectId.from_datetime(antes_de.astimezone(timezone.utc))
+
+
+def archivar_notificaciones(db: Database, antes_de: datetime, tamano_lote: int = 1000) -> int:
+    """
+    archiva las creadas antes de `antes_de`; retorna cuantas movio. el corte es
+    por _id (se genera al insertar, usa el indice primario); si se corta a mitad
+    de un lote, la proxima corrida lo rehace sin duplicar en el archivo
+    """
+    coleccion, archivo = db["NOTIFICACIONES"], db[COLECCION_ARCHIVO]
+    corte = _corte(antes_de)
+    movidas = 0
+    while True:
+        lote = list(coleccion.find({"_id": {"$lt": corte}}).sort("_id", 1).limit(tamano_lote))
+        if not lote:
+            return movidas
+        try:
+            archivo.insert_many(lote, ordered=False)
+        except BulkWriteError as e:
+            # ya archivadas en una corrida cortada
+            if any(error.get("code") != _CLAVE_DUPLICADA for error in e.details.get("writeErrors", [])):
+                raise
+
+        # las no leidas que se van dejan de contar para el badge. se descuenta lo
+        # que efectivamente borra cada delete (leida: False): si una se marco
+        # leida despues del find, marcar_leida ya la desconto
+        no_leidas: Dict[str, List[ObjectId]] = defaultdict(list)
+        for d in lote:
+            if not d.get("leida"):
+                no_leidas[d["supervisor_email"]].append(d["_id"])
+        descuentos = []
+        for email, ids in no_leidas.items():
+            borradas = coleccion.delete_many({"_id": {"$in": ids}, "leida": False}).deleted_count
+            if borradas:
+                descuentos.append(UpdateOne({"_id": email}, {"$inc": {"no_leidas": -borradas}}))
+        if descuentos:
+            db[COLECCION_CONTADORES].bulk_write(descuentos, ordered=False)
+        coleccion.delete_many({"_id": {"$in": [d["_id"] for d in lote]}})
+        movidas += len(lote)
+
+
+def main(argv: List[str]) -> int:
+    dias = int(argv[argv.index("--dias") + 1]) if "--dias" in argv else ARCHIVO_DIAS
+    antes_de = datetime.now(timezone.utc) - timedelta(days=dias)
+    movidas = archivar_notificaciones(ConexionMongo().obtener_base_datos(), antes_de)
+    print(f"notificaciones archivadas: {movidas}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
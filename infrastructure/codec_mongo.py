@@ -0,0 +1,286 @@
+"""
+codec dominio <-> documentos de Mongo (requerimientos, comentarios, eventos,
+notificaciones y usuarios). un solo lugar con la forma de cada documento: lo
+usan los repositorios, los routers y la hidratacion del sistema
+
+los codificadores arman cada documento con un literal (sin dicts intermedios
+ni merges por tipo) y las conversiones de enums salen de tablas precalculadas
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Type
+
+from domain.enums import EstadoRequerimiento, TipoEvento, TipoSolicitud
+from domain.eventos import Evento
+from domain.registros import Comentario, Notificacion
+from domain.requerimientos import Incidente, Requerimiento, Solicitud
+from domain.servicios import Servicio
+from domain.urgencias import urgencia_por_nombre
+from domain.usuarios import Operador, Solicitante, Supervisor, Tecnico, Usuario
+
+Documento = Dict[str, Any]
+
+# los eventos se guardan con str(TipoEvento.X) ("TipoEvento.ASIGNACION")
+_TEXTO_TIPO_EVENTO: Dict[TipoEvento, str] = {tipo: str(tipo) for tipo in TipoEvento}
+_TIPO_EVENTO_POR_TEXTO: Dict[str, TipoEvento] = {
+    **{texto: tipo for tipo, texto in _TEXTO_TIPO_EVENTO.items()},
+    # documentos viejos o cargados a mano: solo el nombre o el valor
+    **{tipo.name: tipo for tipo in TipoEvento},
+    **{tipo.value: tipo for tipo in TipoEvento},
+}
+_ESTADO_POR_VALOR: Dict[str, EstadoRequerimiento] = {estado.value: estado for estado in EstadoRequerimiento}
+_TIPO_SOLICITUD_POR_VALOR: Dict[str, TipoSolicitud] = {tipo.value: tipo for tipo in TipoSolicitud}
+
+CLASE_POR_TIPO_USUARIO: Dict[str, Type[Usuario]] = {
+    "solicitante": Solicitante,
+    "operador": Operador,
+    "tecnico": Tecnico,
+    "supervisor": Supervisor,
+}
+TIPO_POR_CLASE_USUARIO: Dict[type, str] = {clase: tipo for tipo, clase in CLASE_POR_TIPO_USUARIO.items()}
+
+
+def _fecha(valor: Any) -> Optional[datetime]:
+    # comentarios/eventos guardan la fecha como texto ISO; el resto como datetime
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    return datetime.fromisoformat(valor)
+
+
+# ==================== COMENTARIOS Y EVENTOS ====================
+
+def codificar_comentario(comentario: Comentario) -> Documento:
+    autor = comentario.autor
+    return {
+        "texto": comentario.texto,
+        "autor_email": autor.email,
+        "autor_nombre": autor.nombre,
+        "fecha": comentario.fecha.isoformat(),
+    }
+
+
+def codificar_evento(evento: Evento) -> Documento:
+    autor = evento.autor
+    return {
+        "texto": evento.texto,
+        "autor_email": autor.email,
+        "autor_nombre": autor.nombre,
+        "fecha": evento.fecha.isoformat(),
+        "tipo": _TEXTO_TIPO_EVENTO[evento.tipo],
+    }
+
+
+def comentario_nuevo(texto: str, autor: Usuario) -> Documento:
+    """documento de un comentario que se agrega ahora (sin pasar por el dominio)"""
+    return {
+        "texto": texto,
+        "autor_email": autor.email,
+        "autor_nombre": autor.nombre,
+        "fecha": datetime.now().isoformat(),
+    }
+
+
+def evento_nuevo(texto: str, autor: Usuario, tipo: TipoEvento) -> Documento:
+    return {
+        "texto": texto,
+        "autor_email": autor.email,
+        "autor_nombre": autor.nombre,
+        "fecha": datetime.now().isoformat(),
+        "tipo": _TEXTO_TIPO_EVENTO[tipo],
+    }
+
+
+def decodificar_comentario(doc: Mapping[str, Any], usuarios: Mapping[str, Usuario]) -> Optional[Comentario]:
+    """None si el autor ya no existe"""
+    autor = usuarios.get(doc.get("autor_email"))
+    if autor is None:
+        return None
+    comentario = Comentario(doc["texto"], autor)
+    comentario.fecha = _fecha(doc.get("fecha")) or comentario.fecha
+    return comentario
+
+
+def decodificar_evento(doc: Mapping[str, Any], usuarios: Mapping[str, Usuario]) -> Optional[Evento]:
+    autor = usuarios.get(doc.get("autor_email"))
+    tipo = _TIPO_EVENTO_POR_TEXTO.get(doc.get("tipo"))
+    if autor is None or tipo is None:
+        return None
+    evento = Evento(doc["texto"], autor, tipo)
+    evento.fecha = _fecha(doc.get("fecha")) or evento.fecha
+    return evento
+
+
+# ==================== REQUERIMIENTOS ====================
+
+def _escalares_incidente(incidente: Incidente) -> Documento:
+    tecnico = incidente.tecnico_asignado
+    servicio = incidente.servicio
+    return {
+        "descripcion": incidente.descripcion,
+        "urgencia": incidente.urgencia.get_nombre(),
+        "servicio": servicio.nombre if servicio is not None else None,
+        "solicitante_email": incidente.solicitante.email,
+        "prioridad": incidente.calcular_prioridad(),
+        "estado": incidente.estado.value,
+        "tecnico_asignado_email": tecnico.email if tecnico is not None else None,
+        "fecha_resolucion": incidente.fecha_resolucion,
+    }
+
+
+def _escalares_solicitud(solicitud: Solicitud) -> Documento:
+    tecnico = solicitud.tecnico_asignado
+    return {
+        "descripcion": solicitud.descripcion,
+        "tipo_solicitud": solicitud.tipo_solicitud.value,
+        "servicio": solicitud.servicio.nombre,
+        "solicitante_email": solicitud.solicitante.email,
+        "prioridad": solicitud.calcular_prioridad(),
+        "estado": solicitud.estado.value,
+        "tecnico_asignado_email": tecnico.email if tecnico is not None else None,
+        "fecha_resolucion": solicitud.fecha_resolucion,
+    }
+
+
+_ESCALARES: Dict[type, Callable[[Any], Documento]] = {
+    Incidente: _escalares_incidente,
+    Solicitud: _escalares_solicitud,
+}
+
+
+def codificar_escalares(requerimiento: Requerimiento) -> Documento:
+    """campos simples del documento (sin los arrays de historial)"""
+    return _ESCALARES[type(requerimiento)](requerimiento)
+
+
+def codificar_eventos(requerimiento: Requerimiento) -> List[Documento]:
+    return [codificar_evento(e) for e in requerimiento.eventos]
+
+
+def codificar_requerimiento(requerimiento: Requerimiento, cola_eventos: int,
+                            eventos: Optional[List[Documento]] = None) -> Documento:
+    """
+    documento completo del alta; embebe solo los ultimos `cola_eventos` eventos.
+    `eventos`: el historial ya codificado (el mismo que va al log), para no
+    codificarlo dos veces
+    """
+    documento = {"id": requerimiento.id, "fecha_creacion": requerimiento.fecha_creacion}
+    documento.update(codificar_escalares(requerimiento))
+    comentarios = requerimiento.comentarios
+    total_eventos = len(requerimiento.eventos)
+    if eventos is None:
+        eventos = [codificar_evento(e) for e in requerimiento.eventos[-cola_eventos:]]
+    documento["comentarios"] = [codificar_comentario(c) for c in comentarios]
+    documento["comentarios_total"] = len(comentarios)
+    documento["eventos"] = eventos[-cola_eventos:]
+    documento["eventos_total"] = total_eventos
+    documento["eventos_en_log"] = True
+    return documento
+
+
+def estado_implicito(doc: Mapping[str, Any]) -> str:
+    """estado de un documento anterior a que se guardara `estado` (sale de lo que si tiene)"""
+    if doc.get("fecha_resolucion"):
+        return EstadoRequerimiento.RESUELTO.value
+    if doc.get("tecnico_asignado_email"):
+        return EstadoRequerimiento.EN_PROCESO.value
+    return EstadoRequerimiento.ABIERTO.value
+
+
+def decodificar_requerimiento(
+    doc: Mapping[str, Any], usuarios: Mapping[str, Usuario], servicios: Mapping[str, Servicio]
+) -> Optional[Requerimiento]:
+    """
+    documento -> Incidente/Solicitud con la cola de eventos embebida (el
+    historial completo esta en eventos_requerimientos). None si falta el
+    solicitante, la urgencia o el servicio. queda marcado como persistido
+    """
+    solicitante = usuarios.get(doc.get("solicitante_email"))
+    if not isinstance(solicitante, Solicitante):
+        return None
+    servicio = servicios.get(doc.get("servicio"))
+    requerimiento: Requerimiento
+    if "tipo_solicitud" in doc:
+        if servicio is None:
+            return None
+        tipo = _TIPO_SOLICITUD_POR_VALOR[doc["tipo_solicitud"]]
+        requerimiento = Solicitud(doc["descripcion"], solicitante, tipo, servicio, doc["id"])
+    else:
+        urgencia = urgencia_por_nombre(doc.get("urgencia"))
+        if urgencia is None:
+            return None
+        requerimiento = Incidente(doc["descripcion"], solicitante, urgencia, servicio, doc["id"])
+
+    requerimiento.estado = _ESTADO_POR_VALOR[doc.get("estado") or estado_implicito(doc)]
+    requerimiento.tecnico_asignado = usuarios.get(doc.get("tecnico_asignado_email"))
+    requerimiento.fecha_creacion = doc.get("fecha_creacion") or requerimiento.fecha_creacion
+    requerimiento.fecha_resolucion = doc.get("fecha_resolucion")
+    comentarios = [decodificar_comentario(c, usuarios) for c in doc.get("comentarios") or ()]
+    requerimiento.comentarios = [c for c in comentarios if c is not None]
+    eventos = [decodificar_evento(e, usuarios) for e in doc.get("eventos") or ()]
+    requerimiento.eventos = [e for e in eventos if e is not None]
+    requerimiento.marcar_persistido()
+    return requerimiento
+
+
+def emails_involucrados(docs: List[Mapping[str, Any]]) -> set:
+    """usuarios que hacen falta para decodificar los documentos (una sola consulta)"""
+    emails = set()
+    for doc in docs:
+        emails.add(doc.get("solicitante_email"))
+        emails.add(doc.get("tecnico_asignado_email"))
+        emails.update(r.get("autor_email") for r in doc.get("comentarios") or ())
+        emails.update(r.get("autor_email") for r in doc.get("eventos") or ())
+    emails.discard(None)
+    return emails
+
+
+# ==================== NOTIFICACIONES ====================
+
+def codificar_notificacion(notificacion: Notificacion, id: str, supervisor_email: str,
+                           tipo_evento: str = "notificacion", requerimiento_id: Optional[int] = None) -> Documento:
+    autor = notificacion.autor
+    return {
+        "id": id,
+        "supervisor_email": supervisor_email,
+        "texto": notificacion.texto,
+        "autor_email": autor.email,
+        "autor_nombre": autor.nombre,
+        "fecha": notificacion.fecha,
+        "tipo_evento": tipo_evento,
+        "requerimiento_id": requerimiento_id,
+        "leida": notificacion.leida,
+    }
+
+
+def decodificar_notificacion(doc: Mapping[str, Any], usuarios: Mapping[str, Usuario]) -> Optional[Notificacion]:
+    autor = usuarios.get(doc.get("autor_email"))
+    if autor is None:
+        return None
+    notificacion = Notificacion(doc["texto"], autor)
+    notificacion.fecha = _fecha(doc.get("fecha")) or notificacion.fecha
+    notificacion.leida = bool(doc.get("leida"))
+    return notificacion
+
+
+# ==================== USUARIOS ====================
+
+def codificar_usuario(usuario: Usuario, tipo_usuario: Optional[str] = None) -> Documento:
+    """campos guardados del usuario (solo el hash bcrypt, nunca el password)"""
+    return {
+        "id": usuario.id,
+        "tipo_usuario": tipo_usuario or TIPO_POR_CLASE_USUARIO[type(usuario)],
+        "nombre": usuario.nombre,
+        "email": usuario.email,
+        "password_hash": usuario.password_hash,
+    }
+
+
+def decodificar_usuario(doc: Mapping[str, Any]) -> Optional[Usuario]:
+    """
+    con password_hash se hidrata sin bcrypt; "password" plano solo queda en
+    documentos previos a la migracion (python -m infrastructure.migracion_passwords)
+    """
+    clase = CLASE_POR_TIPO_USUARIO.get(doc.get("tipo_usuario"))
+    if clase is None:
+        return None
+    return clase(doc.get("nombre"), doc.get("email"), doc.get("password"), doc.get("id"), doc.get("password_hash"))
@@ -1,16 +1,180 @@
-from pymongo import MongoClient
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 
 
-class ConexionMongo:
+class ConfiguracionMongo:
+    """
+    parametros de conexion a Mongo
+    se leen de variables de entorno (con valores por defecto para desarrollo)
+    """
+
     def __init__(
         self,
         uri: str = "mongodb://localhost:27017",
-        nombre_base: str = "mesa_ayuda"
+        nombre_base: str = "mesa_ayuda",
+        min_pool: int = 0,
+        max_pool: int = 100,
+        connect_timeout_ms: int = 5000,
+        socket_timeout_ms: Optional[int] = None,
+        server_selection_timeout_ms: int = 5000,
+        app_name: str = "mesa-ayuda-api",
     ) -> None:
-        self._cliente = MongoClient(uri)
-        self._base_datos = self._cliente[nombre_base]
+        self.uri = uri
+        self.nombre_base = nombre_base
+        self.min_pool = min_pool
+        self.max_pool = max_pool
+        self.connect_timeout_ms = connect_timeout_ms
+        self.socket_timeout_ms = socket_timeout_ms
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self.app_name = app_name
+
+    @classmethod
+    def desde_entorno(cls) -> "ConfiguracionMongo":
+        socket_timeout = os.getenv("MONGO_SOCKET_TIMEOUT_MS")
+        return cls(
+            uri=os.getenv("MONGO_URI", "mongodb://localhost:27017"),
+            nombre_base=os.getenv("MONGO_DB", "mesa_ayuda"),
+            min_pool=int(os.getenv("MONGO_MIN_POOL", "0")),
+            max_pool=int(os.getenv("MONGO_MAX_POOL", "100")),
+            connect_timeout_ms=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+            socket_timeout_ms=int(socket_timeout) if socket_timeout else None,
+            server_selection_timeout_ms=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+            app_name=os.getenv("MONGO_APP_NAME", "mesa-ayuda-api"),
+        )
+
+    def opciones_cliente(self, clientes: int = 1) -> Dict[str, Any]:
+        """
+        kwargs para MongoClient; min_pool/max_pool son el presupuesto del
+        proceso y se reparten entre los `clientes` que lo comparten
+        """
+        return {
+            "minPoolSize": self.min_pool // clientes,
+            "maxPoolSize": max(1, self.max_pool // clientes),
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "appname": self.app_name,
+        }
+
+
+class ConexionMongo:
+    """
+    administrador de conexion UNICO por proceso
+    todos los repositorios comparten el mismo MongoClient (y su pool)
+    los repositorios async comparten un AsyncMongoClient con la misma configuracion
+
+    pymongo no comparte sockets entre el cliente sync y el async: si el proceso usa
+    los dos (la API) lo declara con usar_cliente_async() y cada pool se dimensiona a
+    la mitad de MONGO_MIN_POOL/MONGO_MAX_POOL, asi el proceso no abre mas de
+    MONGO_MAX_POOL conexiones por servidor. los que solo usan el sync (main.py, las
+    migraciones) le dan todo el presupuesto al MongoClient
+    """
+
+    _configuracion: Optional[ConfiguracionMongo] = None
+    _cliente: Optional[MongoClient] = None
+    _cliente_async: Optional[AsyncMongoClient] = None
+    # MongoClient + AsyncMongoClient se reparten el pool (ver usar_cliente_async)
+    _clientes: int = 1
+    _lock = threading.Lock()
+
+    def __init__(self, configuracion: Optional[ConfiguracionMongo] = None) -> None:
+        if configuracion is not None:
+            ConexionMongo.configurar(configuracion)
+        cliente = ConexionMongo.obtener_cliente()
+        self._base_datos = cliente[ConexionMongo.obtener_configuracion().nombre_base]
 
     def obtener_base_datos(self) -> Database:
         return self._base_datos
-    
\ No newline at end of file
+
+    def obtener_base_datos_async(self) -> AsyncDatabase:
+        cliente = ConexionMongo.obtener_cliente_async()
+        return cliente[ConexionMongo.obtener_configuracion().nombre_base]
+
+    # ==================== CLIENTE COMPARTIDO ====================
+
+    @classmethod
+    def configurar(cls, configuracion: ConfiguracionMongo) -> None:
+        """fija la configuracion (solo antes de crear el cliente)"""
+        with cls._lock:
+            if cls._cliente is not None or cls._cliente_async is not None:
+                raise RuntimeError("El cliente de Mongo ya fue creado, no se puede reconfigurar")
+            cls._configuracion = configuracion
+
+    @classmethod
+    def usar_cliente_async(cls) -> None:
+        """
+        el proceso usa tambien el AsyncMongoClient: cada cliente toma la mitad
+        del pool. se llama antes de crear los clientes
+        """
+        with cls._lock:
+            if cls._cliente is not None or cls._cliente_async is not None:
+                raise RuntimeError("El cliente de Mongo ya fue creado, no se puede repartir el pool")
+            cls._clientes = 2
+
+    @classmethod
+    def obtener_configuracion(cls) -> ConfiguracionMongo:
+        if cls._configuracion is None:
+            with cls._lock:
+                if cls._configuracion is None:
+                    cls._configuracion = ConfiguracionMongo.desde_entorno()
+        return cls._configuracion
+
+    @classmethod
+    def obtener_cliente(cls) -> MongoClient:
+        if cls._cliente is None:
+            configuracion = cls.obtener_configuracion()
+            with cls._lock:
+                if cls._cliente is None:
+                    cls._cliente = MongoClient(
+                        configuracion.uri, **configuracion.opciones_cliente(cls._clientes)
+                    )
+        return cls._cliente
+
+    @classmethod
+    def obtener_cliente_async(cls) -> AsyncMongoClient:
+        """cliente asyncio (PyMongo Async); queda atado al event loop donde se usa por primera vez"""
+        if cls._cliente_async is None:
+            configuracion = cls.obtener_configuracion()
+            with cls._lock:
+                if cls._cliente_async is None:
+                    cls._cliente_async = AsyncMongoClient(
+                        configuracion.uri, **configuracion.opciones_cliente(cls._clientes)
+                    )
+        return cls._cliente_async
+
+    @classmethod
+    def calentar(cls) -> None:
+        """
+        abre conexiones al arrancar (ping + minPoolSize) para no
+        pagar el handshake en los primeros requests
+        """
+        cls.obtener_cliente().admin.command("ping")
+
+    @classmethod
+    async def calentar_async(cls) -> None:
+        await cls.obtener_cliente_async().admin.command("ping")
+
+    @classmethod
+    def cerrar(cls) -> None:
+        """
+        cierra el cliente sync; el proximo obtener_cliente() crea otro. los repositorios
+        (y SistemaAyuda) guardan la Database del cliente cerrado: despues de cerrar hay
+        que volver a construirlos
+        """
+        with cls._lock:
+            if cls._cliente is not None:
+                cls._cliente.close()
+                cls._cliente = None
+
+    @classmethod
+    async def cerrar_async(cls) -> None:
+        """igual que cerrar(), para el cliente async"""
+        cliente = cls._cliente_async
+        cls._cliente_async = None
+        if cliente is not None:
+            await cliente.close()
@@ -0,0 +1,199 @@
+"""
+indices de Mongo declarados por coleccion (versionados)
+
+se aplican al arrancar la API y tambien por consola:
+
+    python -m infrastructure.indices_mongo             # crea lo que falte
+    python -m infrastructure.indices_mongo --verificar # solo reporta deriva
+"""
+
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+# subir la version cada vez que cambia la declaracion
+VERSION_INDICES = 10
+
+# dias que se conservan las notificaciones leidas (TTL); cambiarlo ajusta el indice al arrancar
+RETENCION_LEIDAS_DIAS = int(os.getenv("NOTIFICACIONES_RETENCION_LEIDAS_DIAS", "30"))
+
+INDICES: Dict[str, List[IndexModel]] = {
+    "incidentes": [
+        IndexModel([("id", ASCENDING)], name="id_unico", unique=True),
+        # cubre la vista resumen de los listados (PROYECCION_RESUMEN, orden/cursor por id)
+        IndexModel(
+            [("id", ASCENDING), ("estado", ASCENDING), ("prioridad", ASCENDING), ("urgencia", ASCENDING),
+             ("servicio", ASCENDING), ("solicitante_email", ASCENDING), ("tecnico_asignado_email", ASCENDING),
+             ("comentarios_total", ASCENDING), ("eventos_total", ASCENDING)],
+            name="resumen",
+        ),
+        IndexModel([("fecha_creacion", ASCENDING)], name="fecha_creacion"),  # export ?since=
+        # /requerimientos por rol: filtro por email + orden/cursor por id
+        IndexModel([("solicitante_email", ASCENDING), ("id", ASCENDING)], name="solicitante_id"),
+        IndexModel([("tecnico_asignado_email", ASCENDING), ("id", ASCENDING)], name="tecnico_id"),
+    ],
+    "solicitudes": [
+        IndexModel([("id", ASCENDING)], name="id_unico", unique=True),
+        # cubre la vista resumen de los listados (PROYECCION_RESUMEN, orden/cursor por id)
+        IndexModel(
+            [("id", ASCENDING), ("estado", ASCENDING), ("prioridad", ASCENDING), ("tipo_solicitud", ASCENDING),
+             ("servicio", ASCENDING), ("solicitante_email", ASCENDING), ("tecnico_asignado_email", ASCENDING),
+             ("comentarios_total", ASCENDING), ("eventos_total", ASCENDING)],
+            name="resumen",
+        ),
+        IndexModel([("fecha_creacion", ASCENDING)], name="fecha_creacion"),
+        IndexModel([("solicitante_email", ASCENDING), ("id", ASCENDING)], name="solicitante_id"),
+        IndexModel([("tecnico_asignado_email", ASCENDING), ("id", ASCENDING)], name="tecnico_id"),
+    ],
+    "usuarios": [
+        IndexModel([("email", ASCENDING)], name="email_unico", unique=True),
+    ],
+    "NOTIFICACIONES": [
+        IndexModel([("id", ASCENDING)], name="id_unico", unique=True),
+        # listar_por_supervisor: filtro (supervisor_email[, leida]) + sort fecha desc
+        IndexModel(
+            [("supervisor_email", ASCENDING), ("leida", ASCENDING), ("fecha", DESCENDING)],
+            name="supervisor_leida_fecha",
+        ),
+        IndexModel([("supervisor_email", ASCENDING), ("fecha", DESCENDING)], name="supervisor_fecha"),
+        # stream SSE: reanudar desde Last-Event-ID (_id > ultimo)
+        IndexModel([("supervisor_email", ASCENDING), ("_id", ASCENDING)], name="supervisor_id"),
+        # retencion: las leidas se borran solas (solo las leidas tienen leida_en)
+        IndexModel([("leida_en", ASCENDING)], name="leida_en_ttl",
+                   expireAfterSeconds=RETENCION_LEIDAS_DIAS * 24 * 3600),
+    ],
+    "supervisiones": [
+        # una relacion por par; cada extremo tiene su indice
+        IndexModel([("supervisor_email", ASCENDING), ("empleado_email", ASCENDING)],
+                   name="supervisor_empleado", unique=True),
+        IndexModel([("empleado_email", ASCENDING), ("supervisor_email", ASCENDING)], name="empleado_supervisor"),
+        IndexModel([("actualizado", ASCENDING)], name="actualizado"),  # refresco incremental
+    ],
+    "outbox_notificaciones": [
+        # tomar_lote: pendientes vencidas por fecha de proximo intento / tomadas con plazo vencido
+        IndexModel([("estado", ASCENDING), ("proximo_intento", ASCENDING)], name="estado_proximo_intento"),
+        IndexModel([("estado", ASCENDING), ("vence", ASCENDING)], name="estado_vence"),
+        IndexModel([("token", ASCENDING)], name="token", sparse=True),
+    ],
+    "eventos_requerimientos": [
+        # historial de un requerimiento en orden (_id desempata eventos del mismo instante);
+        # coleccion primero: en datos previos a la secuencia compartida el mismo id
+        # puede ser un incidente y una solicitud
+        IndexModel(
+            [("coleccion", ASCENDING), ("requerimiento_id", ASCENDING), ("fecha", ASCENDING), ("_id", ASCENDING)],
+            name="coleccion_requerimiento_fecha",
+        ),
+    ],
+}
+
+# reemplazados por otra declaracion: se borran al aplicar (si no quedarian como deriva)
+INDICES_RETIRADOS: Dict[str, List[str]] = {
+    "eventos_requerimientos": ["requerimiento_fecha"],
+}
+
+_OPCIONES_COMPARADAS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _firma(especificacion: Dict[str, Any]) -> Dict[str, Any]:
+    """clave + opciones relevantes de un indice, para comparar declarado vs real"""
+    clave = especificacion["key"]
+    pares = clave.items() if isinstance(clave, dict) else clave
+    firma: Dict[str, Any] = {"key": [(campo, int(orden) if isinstance(orden, (int, float)) else orden)
+                                     for campo, orden in pares]}
+    for opcion in _OPCIONES_COMPARADAS:
+        if especificacion.get(opcion):
+            firma[opcion] = especificacion[opcion]
+    return firma
+
+
+def detectar_deriva(db: Database) -> List[str]:
+    """diferencias entre los indices declarados y los que existen en la base"""
+    deriva: List[str] = []
+    for nombre_coleccion, modelos in INDICES.items():
+        existentes = db[nombre_coleccion].index_information()
+        existentes.pop("_id_", None)
+
+        for modelo in modelos:
+            declarado = modelo.document
+            nombre = declarado["name"]
+            real = existentes.pop(nombre, None)
+            if real is None:
+                deriva.append(f"{nombre_coleccion}.{nombre}: falta")
+            elif _firma(real) != _firma(declarado):
+                deriva.append(f"{nombre_coleccion}.{nombre}: difiere ({_firma(real)} != {_firma(declarado)})")
+
+        for nombre in existentes:
+            deriva.append(f"{nombre_coleccion}.{nombre}: no declarado")
+    return deriva
+
+
+def _ajustar_ttl(db: Database, nombre_coleccion: str, modelos: List[IndexModel]) -> None:
+    """un TTL que cambio de plazo se modifica en el lugar (create_indexes daria conflicto)"""
+    existentes = db[nombre_coleccion].index_information()
+    for modelo in modelos:
+        declarado = modelo.document
+        real = existentes.get(declarado["name"])
+        if (real is not None and "expireAfterSeconds" in declarado
+                and real.get("expireAfterSeconds") != declarado["expireAfterSeconds"]):
+            db.command({
+                "collMod": nombre_coleccion,
+                "index": {"name": declarado["name"], "expireAfterSeconds": declarado["expireAfterSeconds"]},
+            })
+
+
+def asegurar_indices(db: Database) -> List[str]:
+    """
+    crea los indices declarados (idempotente) y registra la version aplicada
+    retorna la deriva que quede (indices no declarados o en conflicto)
+    """
+    errores: List[str] = []
+    for nombre_coleccion, nombres in INDICES_RETIRADOS.items():
+        existentes = db[nombre_coleccion].index_information()
+        for nombre in nombres:
+            if nombre in existentes:
+                db[nombre_coleccion].drop_index(nombre)
+    for nombre_coleccion, modelos in INDICES.items():
+        try:
+            _ajustar_ttl(db, nombre_coleccion, modelos)
+            db[nombre_coleccion].create_indexes(modelos)
+        except OperationFailure as e:
+            # mismo nombre con otra definicion, o datos que violan un unique
+            errores.append(f"{nombre_coleccion}: {e}")
+
+    db["esquema"].update_one(
+        {"_id": "indices"},
+        {"$set": {"version": VERSION_INDICES, "fecha": datetime.now()}},
+        upsert=True,
+    )
+    return errores + detectar_deriva(db)
+
+
+def version_aplicada(db: Database) -> int:
+    doc = db["esquema"].find_one({"_id": "indices"})
+    return doc["version"] if doc else 0
+
+
+def main(argv: List[str]) -> int:
+    db = ConexionMongo().obtener_base_datos()
+    if "--verificar" in argv:
+        deriva = detectar_deriva(db)
+        print(f"version aplicada: {version_aplicada(db)} / declarada: {VERSION_INDICES}")
+    else:
+        deriva = asegurar_indices(db)
+        print(f"indices v{VERSION_INDICES} aplicados")
+
+    for linea in deriva:
+        print(f"  - {linea}")
+    return 1 if deriva else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,62 @@
+"""
+migracion unica: mueve el historial de eventos embebido en incidentes y
+solicitudes a la coleccion eventos_requerimientos, y deja en cada documento
+solo los ultimos COLA_EVENTOS + el contador eventos_total
+
+    python -m infrastructure.migracion_eventos
+
+correrla antes de levantar la version que escribe en el log: un documento viejo
+que recibe eventos nuevos antes de migrar pierde lo que excede la cola
+"""
+
+import sys
+from typing import List
+
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+from infrastructure.repositorio_eventos_mongo import NOMBRE_COLECCION, documento_evento, filtro_requerimiento
+from infrastructure.repositorio_requerimientos_mongo import COLA_EVENTOS
+
+
+COLECCIONES = ("incidentes", "solicitudes")
+
+
+def migrar_eventos(db: Database) -> int:
+    """separa los eventos de los documentos pendientes; idempotente. retorna cuantos migro"""
+    log = db[NOMBRE_COLECCION]
+    migrados = 0
+    for nombre in COLECCIONES:
+        coleccion = db[nombre]
+        pendientes = coleccion.find({"eventos_en_log": {"$ne": True}}, {"_id": 1, "id": 1, "eventos": 1})
+        for doc in pendientes:
+            eventos = doc.get("eventos") or []
+            # un corte a mitad de camino deja copias marcadas: se rehacen
+            filtro = filtro_requerimiento(doc["id"], nombre)
+            log.delete_many({**filtro, "migrado": True})
+            if eventos:
+                log.insert_many(
+                    [{**documento_evento(doc["id"], nombre, e), "migrado": True} for e in eventos],
+                    ordered=False,
+                )
+            total = log.count_documents(filtro)
+            coleccion.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {
+                    "eventos": eventos[-COLA_EVENTOS:],
+                    "eventos_total": total,
+                    "eventos_en_log": True,
+                }},
+            )
+            migrados += 1
+    return migrados
+
+
+def main(argv: List[str]) -> int:
+    migrados = migrar_eventos(ConexionMongo().obtener_base_datos())
+    print(f"requerimientos migrados: {migrados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""
+migracion unica: en NOTIFICACIONES convierte `fecha` guardada como texto ISO
+(version anterior) a datetime, y completa `leida_en` en las ya leidas para que
+entren en la retencion (indice TTL)
+
+    python -m infrastructure.migracion_notificaciones
+"""
+
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+def migrar_notificaciones(db: Database, tamano_lote: int = 1000) -> int:
+    """corrige los documentos pendientes; idempotente. retorna cuantos migro"""
+    coleccion = db["NOTIFICACIONES"]
+    pendientes = coleccion.find(
+        {"$or": [
+            {"fecha": {"$type": "string"}},
+            {"leida": True, "leida_en": {"$exists": False}},
+        ]},
+        {"_id": 1, "fecha": 1, "leida": 1, "leida_en": 1},
+    )
+
+    migrados = 0
+    lote: List[UpdateOne] = []
+    for doc in pendientes:
+        fecha = doc.get("fecha")
+        if isinstance(fecha, str):
+            fecha = datetime.fromisoformat(fecha)
+        campos: Dict[str, Any] = {"fecha": fecha}
+        if doc.get("leida") and "leida_en" not in doc:
+            # no se sabe cuando se leyo: la retencion corre desde la creacion
+            campos["leida_en"] = fecha
+        lote.append(UpdateOne({"_id": doc["_id"]}, {"$set": campos}))
+        if len(lote) >= tamano_lote:
+            migrados += coleccion.bulk_write(lote, ordered=False).modified_count
+            lote = []
+    if lote:
+        migrados += coleccion.bulk_write(lote, ordered=False).modified_count
+    return migrados
+
+
+def main(argv: List[str]) -> int:
+    migrados = migrar_notificaciones(ConexionMongo().obtener_base_datos())
+    print(f"notificaciones migradas: {migrados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""
+migracion unica: reemplaza el campo `password` (texto plano) de la coleccion
+usuarios por `password_hash` (bcrypt)
+
+    python -m infrastructure.migracion_passwords
+"""
+
+import sys
+from typing import List
+
+import bcrypt
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+def migrar_passwords(db: Database, tamano_lote: int = 100) -> int:
+    """hashea los passwords planos pendientes; idempotente. retorna cuantos migro"""
+    coleccion = db["usuarios"]
+    pendientes = coleccion.find(
+        {"password": {"$exists": True}, "password_hash": {"$exists": False}},
+        {"_id": 1, "password": 1},
+    )
+
+    migrados = 0
+    lote: List[UpdateOne] = []
+    for doc in pendientes:
+        password_hash = bcrypt.hashpw(str(doc["password"]).encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        lote.append(UpdateOne(
+            {"_id": doc["_id"], "password_hash": {"$exists": False}},
+            {"$set": {"password_hash": password_hash}, "$unset": {"password": ""}},
+        ))
+        if len(lote) >= tamano_lote:
+            migrados += coleccion.bulk_write(lote, ordered=False).modified_count
+            lote = []
+    if lote:
+        migrados += coleccion.bulk_write(lote, ordered=False).modified_count
+
+    # documentos que ya tenian hash y conservaban el plano
+    coleccion.update_many(
+        {"password": {"$exists": True}, "password_hash": {"$exists": True}},
+        {"$unset": {"password": ""}},
+    )
+    return migrados
+
+
+def main(argv: List[str]) -> int:
+    migrados = migrar_passwords(ConexionMongo().obtener_base_datos())
+    print(f"usuarios migrados: {migrados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
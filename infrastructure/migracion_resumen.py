@@ -0,0 +1,69 @@
+"""
+migracion unica: completa en incidentes y solicitudes los campos que usa la
+vista resumen de los listados (prioridad, estado, comentarios_total, eventos_total)
+
+    python -m infrastructure.migracion_resumen
+"""
+
+import sys
+from typing import List
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from domain.requerimientos import PRIORIDAD_SOLICITUD
+from domain.urgencias import urgencia_por_nombre
+from infrastructure.codec_mongo import estado_implicito
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+
+def migrar_resumen(db: Database, tamano_lote: int = 500) -> int:
+    """completa los documentos que no tienen los campos; idempotente. retorna cuantos migro"""
+    migrados = 0
+    for nombre in ("incidentes", "solicitudes"):
+        coleccion = db[nombre]
+        pendientes = coleccion.find(
+            {"$or": [
+                {"prioridad": {"$exists": False}},
+                {"estado": {"$exists": False}},
+                {"comentarios_total": {"$exists": False}},
+                {"eventos_total": {"$exists": False}},
+            ]},
+            {"_id": 1, "urgencia": 1, "estado": 1, "tecnico_asignado_email": 1, "fecha_resolucion": 1,
+             "comentarios": 1, "eventos": 1, "eventos_total": 1},
+        )
+
+        lote: List[UpdateOne] = []
+        for doc in pendientes:
+            if nombre == "incidentes":
+                # la prioridad la calcula la estrategia de urgencia del dominio
+                urgencia = urgencia_por_nombre(doc.get("urgencia"))
+                prioridad = urgencia.calcular_prioridad() if urgencia is not None else None
+            else:
+                prioridad = PRIORIDAD_SOLICITUD
+            campos = {
+                "prioridad": prioridad,
+                # los documentos originales no guardaban el estado
+                "estado": doc.get("estado") or estado_implicito(doc),
+                "comentarios_total": len(doc.get("comentarios") or []),
+                # si ya paso por migracion_eventos el total viene del log
+                "eventos_total": doc.get("eventos_total", len(doc.get("eventos") or [])),
+            }
+            lote.append(UpdateOne({"_id": doc["_id"]}, {"$set": campos}))
+            if len(lote) >= tamano_lote:
+                migrados += coleccion.bulk_write(lote, ordered=False).modified_count
+                lote = []
+        if lote:
+            migrados += coleccion.bulk_write(lote, ordered=False).modified_count
+    return migrados
+
+
+def main(argv: List[str]) -> int:
+    migrados = migrar_resumen(ConexionMongo().obtener_base_datos())
+    print(f"requerimientos completados: {migrados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""
+recalcula los contadores de notificaciones no leidas de cada supervisor a
+partir de NOTIFICACIONES (corrige desvios: caidas entre el insert y el $inc,
+datos previos a los contadores). se puede correr periodicamente:
+
+    python -m infrastructure.reconciliar_contadores
+"""
+
+import sys
+from typing import Dict, List
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+from infrastructure.repositorio_notificaciones_mongo import COLECCION_CONTADORES
+
+
+def reconciliar_contadores(db: Database) -> int:
+    """corrige los contadores desviados; retorna cuantos corrigio"""
+    contadores = db[COLECCION_CONTADORES]
+    # primero la foto de los contadores y despues el conteo real: si entre medio
+    # llega una notificacion el contador ya no coincide con la foto y no se pisa
+    # (queda para la proxima corrida)
+    foto: Dict[str, int] = {c["_id"]: c.get("no_leidas", 0) for c in contadores.find({}, {"no_leidas": 1})}
+    reales: Dict[str, int] = {
+        d["_id"]: d["cantidad"]
+        for d in db["NOTIFICACIONES"].aggregate([
+            {"$match": {"leida": False}},
+            {"$group": {"_id": "$supervisor_email", "cantidad": {"$sum": 1}}},
+        ])
+    }
+
+    correcciones: List[UpdateOne] = []
+    for email, valor in foto.items():
+        real = reales.pop(email, 0)
+        if valor != real:
+            correcciones.append(UpdateOne({"_id": email, "no_leidas": valor}, {"$set": {"no_leidas": real}}))
+    for email, real in reales.items():
+        # supervisores sin contador todavia
+        correcciones.append(UpdateOne({"_id": email}, {"$setOnInsert": {"no_leidas": real}}, upsert=True))
+
+    if not correcciones:
+        return 0
+    res = contadores.bulk_write(correcciones, ordered=False)
+    return res.modified_count + res.upserted_count
+
+
+def main(argv: List[str]) -> int:
+    corregidos = reconciliar_contadores(ConexionMongo().obtener_base_datos())
+    print(f"contadores corregidos: {corregidos}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+NOMBRE_COLECCION = "eventos_requerimientos"
+
+
+def documento_evento(requerimiento_id: int, coleccion: str, evento: Dict[str, Any]) -> Dict[str, Any]:
+    """copia del evento para el log (fecha nativa, asi ordena por el indice)"""
+    documento = {k: v for k, v in evento.items() if k != "_id"}
+    fecha = documento.get("fecha")
+    if isinstance(fecha, str):
+        documento["fecha"] = datetime.fromisoformat(fecha)
+    documento["requerimiento_id"] = requerimiento_id
+    documento["coleccion"] = coleccion
+    return documento
+
+
+def filtro_requerimiento(requerimiento_id: int, coleccion: str) -> Dict[str, Any]:
+    # los ids nuevos salen de una secuencia compartida, pero los creados antes (contador
+    # del proceso, que arrancaba de cero en cada reinicio) pueden repetirse entre
+    # incidentes y solicitudes: el id solo no identifica al requerimiento
+    return {"coleccion": coleccion, "requerimiento_id": requerimiento_id}
+
+
+def cursor_evento(documento: Dict[str, Any]) -> str:
+    return f"{documento['fecha'].isoformat()}|{documento['_id']}"
+
+
+def leer_cursor_evento(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        fecha, _, oid = cursor.partition("|")
+        return datetime.fromisoformat(fecha), ObjectId(oid)
+    except (ValueError, InvalidId):
+        raise ValueError("Cursor de eventos inválido")
+
+
+_PROYECCION_PAGINA = {"requerimiento_id": 0, "coleccion": 0, "migrado": 0}
+
+
+class RepositorioEventosMongo:
+    """
+    historial completo de eventos de los requerimientos (append-only)
+    el documento del requerimiento solo guarda los ultimos; el resto vive aca
+    """
+
+    def __init__(self, db: Optional[Database] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
+        self._col = db[NOMBRE_COLECCION]
+
+    def registrar(self, requerimiento_id: int, coleccion: str, eventos: Iterable[Dict[str, Any]]) -> None:
+        documentos = [documento_evento(requerimiento_id, coleccion, e) for e in eventos]
+        if documentos:
+            self._col.insert_many(documentos, ordered=False)
+
+    def listar(self, requerimiento_id: int, coleccion: str) -> List[Dict[str, Any]]:
+        cursor = self._col.find(filtro_requerimiento(requerimiento_id, coleccion), {"_id": 0})
+        return list(cursor.sort([("fecha", 1), ("_id", 1)]))
+
+
+class RepositorioEventosMongoAsync:
+    def __init__(self, db: Optional[AsyncDatabase] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos_async()
+        self._col = db[NOMBRE_COLECCION]
+
+    async def registrar(self, requerimiento_id: int, coleccion: str, eventos: Iterable[Dict[str, Any]]) -> None:
+        documentos = [documento_evento(requerimiento_id, coleccion, e) for e in eventos]
+        if documentos:
+            await self._col.insert_many(documentos, ordered=False)
+
+    async def registrar_lote(self, coleccion: str, eventos_por_requerimiento: Dict[int, List[Dict[str, Any]]]) -> None:
+        """eventos de varios requerimientos en un solo insert_many"""
+        documentos = [
+            documento_evento(requerimiento_id, coleccion, e)
+            for requerimiento_id, eventos in eventos_por_requerimiento.items()
+            for e in eventos
+        ]
+        if documentos:
+            await self._col.insert_many(documentos, ordered=False)
+
+    async def listar(self, requerimiento_id: int, coleccion: str, limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        cursor = self._col.find(filtro_requerimiento(requerimiento_id, coleccion), {"_id": 0})
+        cursor = cursor.sort([("fecha", 1), ("_id", 1)])
+        if limite:
+            cursor = cursor.limit(limite)
+        return await cursor.to_list(None)
+
+    async def listar_pagina(
+        self,
+        requerimiento_id: int,
+        coleccion: str,
+        limite: int,
+        antes_de: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        historial del mas nuevo al mas viejo, keyset sobre (fecha, _id)
+        `antes_de` es el cursor del ultimo evento recibido
+        """
+        filtro = filtro_requerimiento(requerimiento_id, coleccion)
+        if antes_de:
+            fecha, oid = leer_cursor_evento(antes_de)
+            filtro["$or"] = [{"fecha": {"$lt": fecha}}, {"fecha": fecha, "_id": {"$lt": oid}}]
+
+        cursor = self._col.find(filtro, _PROYECCION_PAGINA).sort([("fecha", -1), ("_id", -1)]).limit(limite)
+        documentos = await cursor.to_list(None)
+        for documento in documentos:
+            documento["cursor"] = cursor_evento(documento)
+            del documento["_id"]
+        return documentos
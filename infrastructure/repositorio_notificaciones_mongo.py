@@ -1,45 +1,221 @@
+from collections import Counter
 from typing import Any, Dict, List, Optional
 from datetime import datetime
-from uuid import uuid4
+from uuid import NAMESPACE_URL, uuid4, uuid5
 
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from domain.registros import Notificacion
+from infrastructure.codec_mongo import codificar_notificacion
 from infrastructure.conexion_mongo import ConexionMongo
 
+_CLAVE_DUPLICADA = 11000
+
+# un documento por supervisor: {_id: email, no_leidas: n}
+COLECCION_CONTADORES = "contadores_notificaciones"
+
+
+def _documento_notificacion(supervisor_email: str, mensaje: str, autor, tipo_evento: str,
+                            requerimiento_id: Optional[int]) -> Dict[str, Any]:
+    return codificar_notificacion(
+        Notificacion(mensaje, autor), str(uuid4()), supervisor_email, tipo_evento, requerimiento_id
+    )
+
+
+def documentos_desde_intento(intento: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    una notificacion por supervisor de una entrada del outbox; el id sale de
+    (entrada, supervisor), asi reintentar la entrega no duplica
+    """
+    return [
+        {
+            "id": str(uuid5(NAMESPACE_URL, f"outbox:{intento['_id']}:{email}")),
+            "supervisor_email": email,
+            "texto": intento["texto"],
+            "autor_email": intento["autor_email"],
+            "autor_nombre": intento["autor_nombre"],
+            "fecha": intento["fecha"],
+            "tipo_evento": intento["tipo_evento"],
+            "requerimiento_id": intento["requerimiento_id"],
+            "leida": False,
+        }
+        for email in intento["supervisor_emails"]
+    ]
+
+
+def _filtro_supervisor(supervisor_email: str, solo_no_leidas: bool) -> Dict[str, Any]:
+    filtro: Dict[str, Any] = {"supervisor_email": supervisor_email}
+    if solo_no_leidas:
+        filtro["leida"] = False
+    return filtro
+
+
+def _filtro_desde(supervisor_email: str, despues_de: ObjectId, hasta: Optional[ObjectId],
+                  solo_no_leidas: bool) -> Dict[str, Any]:
+    filtro = _filtro_supervisor(supervisor_email, solo_no_leidas)
+    filtro["_id"] = {"$gt": despues_de}
+    if hasta is not None:
+        filtro["_id"]["$lt"] = hasta
+    return filtro
+
+
+def _filtro_marcar(supervisor_email: str, ids: Optional[List[str]], hasta: Optional[datetime]) -> Dict[str, Any]:
+    filtro: Dict[str, Any] = {"supervisor_email": supervisor_email, "leida": False}
+    if ids is not None:
+        filtro["id"] = {"$in": ids}
+    if hasta is not None:
+        # `fecha` se guarda naive en hora local: un hasta con zona se lleva a la misma referencia
+        if hasta.tzinfo is not None:
+            hasta = hasta.astimezone().replace(tzinfo=None)
+        filtro["fecha"] = {"$lte": hasta}
+    return filtro
+
+
+def _marca_leida() -> Dict[str, Any]:
+    # leida_en: desde cuando corre la retencion (indice TTL)
+    return {"$set": {"leida": True, "leida_en": datetime.now()}}
+
+
+def _incrementos_no_leidas(documentos: List[Dict[str, Any]]) -> List[UpdateOne]:
+    por_supervisor = Counter(d["supervisor_email"] for d in documentos if not d.get("leida"))
+    return [
+        UpdateOne({"_id": email}, {"$inc": {"no_leidas": cantidad}}, upsert=True)
+        for email, cantidad in por_supervisor.items()
+    ]
+
+
+def _no_leidas(contador: Optional[Dict[str, Any]]) -> int:
+    # si el contador se desvio por debajo de cero, hasta la proxima reconciliacion
+    return max(0, contador["no_leidas"]) if contador else 0
+
 
 class RepositorioNotificacionesMongo:
-    def __init__(self) -> None:
-        db = ConexionMongo().obtener_base_datos()
+    def __init__(self, db: Optional[Database] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
         self._col = db["NOTIFICACIONES"]
+        self._contadores = db[COLECCION_CONTADORES]
+
+    def _sumar_no_leidas(self, documentos: List[Dict[str, Any]]) -> None:
+        incrementos = _incrementos_no_leidas(documentos)
+        if incrementos:
+            self._contadores.bulk_write(incrementos, ordered=False)
 
     def crear(self, notificacion: Dict[str, Any]) -> None:
         self._col.insert_one(notificacion)
+        self._sumar_no_leidas([notificacion])
 
     def crear_desde_dominio(self, supervisor_email: str, mensaje: str, autor, tipo_evento: str = "notificacion",
                             requerimiento_id: Optional[int] = None) -> None:
-        doc = {
-            "id": str(uuid4()),
-            "supervisor_email": supervisor_email,
-            "texto": mensaje,
-            "autor_email": autor.email,
-            "autor_nombre": autor.nombre,
-            "fecha": datetime.now(),
-            "tipo_evento": tipo_evento,
-            "requerimiento_id": requerimiento_id,
-            "leida": False
-        }
-        self.crear(doc)
+        self.crear(_documento_notificacion(supervisor_email, mensaje, autor, tipo_evento, requerimiento_id))
+
+    def insertar_idempotente(self, documentos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        insert_many que ignora las ya entregadas (id repetido); retorna las
+        nuevas, con el _id que les asigno el driver
+        """
+        if not documentos:
+            return []
+        try:
+            self._col.insert_many(documentos, ordered=False)
+            nuevas = documentos
+        except BulkWriteError as e:
+            errores = e.details.get("writeErrors", [])
+            if any(error.get("code") != _CLAVE_DUPLICADA for error in errores):
+                raise
+            repetidas = {error["index"] for error in errores}
+            nuevas = [d for i, d in enumerate(documentos) if i not in repetidas]
+        # solo las realmente insertadas suman: reentregar no infla el contador
+        self._sumar_no_leidas(nuevas)
+        return nuevas
 
     def listar_por_supervisor(self, supervisor_email: str, solo_no_leidas: bool = False) -> List[Dict[str, Any]]:
-        filtro: Dict[str, Any] = {"supervisor_email": supervisor_email}
-        if solo_no_leidas:
-            filtro["leida"] = False
+        filtro = _filtro_supervisor(supervisor_email, solo_no_leidas)
         return list(self._col.find(filtro, {"_id": 0}).sort("fecha", -1))
 
+    def listar_desde(self, supervisor_email: str, despues_de: ObjectId, limite: int = 500,
+                     solo_no_leidas: bool = False, hasta: Optional[ObjectId] = None) -> List[Dict[str, Any]]:
+        """las posteriores a un _id (y anteriores a `hasta`), en orden de insercion"""
+        filtro = _filtro_desde(supervisor_email, despues_de, hasta, solo_no_leidas)
+        return list(self._col.find(filtro).sort("_id", 1).limit(limite))
+
     def marcar_leida(self, supervisor_email: str, notificacion_id: str) -> bool:
         res = self._col.update_one(
-            {"id": notificacion_id, "supervisor_email": supervisor_email},
-            {"$set": {"leida": True}}
+            {"id": notificacion_id, "supervisor_email": supervisor_email, "leida": False},
+            _marca_leida()
+        )
+        if res.modified_count == 1:
+            # solo si paso de no leida a leida (marcarla dos veces no descuenta)
+            self._contadores.update_one({"_id": supervisor_email}, {"$inc": {"no_leidas": -1}})
+            return True
+        return self._col.count_documents({"id": notificacion_id, "supervisor_email": supervisor_email}, limit=1) == 1
+
+    def marcar_leidas(self, supervisor_email: str, ids: Optional[List[str]] = None,
+                      hasta: Optional[datetime] = None) -> int:
+        """marca en un solo update_many las no leidas de `ids` o hasta una fecha; retorna cuantas"""
+        res = self._col.update_many(_filtro_marcar(supervisor_email, ids, hasta), _marca_leida())
+        if res.modified_count:
+            self._contadores.update_one({"_id": supervisor_email}, {"$inc": {"no_leidas": -res.modified_count}})
+        return res.modified_count
+
+    def contar_no_leidas(self, supervisor_email: str) -> int:
+        return _no_leidas(self._contadores.find_one({"_id": supervisor_email}))
+
+
+class RepositorioNotificacionesMongoAsync:
+    def __init__(self, db: Optional[AsyncDatabase] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos_async()
+        self._col = db["NOTIFICACIONES"]
+        self._contadores = db[COLECCION_CONTADORES]
+
+    async def crear(self, notificacion: Dict[str, Any]) -> None:
+        await self._col.insert_one(notificacion)
+        incrementos = _incrementos_no_leidas([notificacion])
+        if incrementos:
+            await self._contadores.bulk_write(incrementos, ordered=False)
+
+    async def crear_desde_dominio(self, supervisor_email: str, mensaje: str, autor, tipo_evento: str = "notificacion",
+                                  requerimiento_id: Optional[int] = None) -> None:
+        await self.crear(_documento_notificacion(supervisor_email, mensaje, autor, tipo_evento, requerimiento_id))
+
+    async def listar_por_supervisor(self, supervisor_email: str, solo_no_leidas: bool = False,
+                                    limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """las mas nuevas primero; incluye _id (de ahi sale el cursor para sincronizar)"""
+        filtro = _filtro_supervisor(supervisor_email, solo_no_leidas)
+        cursor = self._col.find(filtro).sort("fecha", -1)
+        if limite is not None:
+            cursor = cursor.limit(limite)
+        return await cursor.to_list(None)
+
+    async def listar_desde(self, supervisor_email: str, despues_de: ObjectId, limite: int = 500,
+                           solo_no_leidas: bool = False, hasta: Optional[ObjectId] = None) -> List[Dict[str, Any]]:
+        """las posteriores a un _id (y anteriores a `hasta`), en orden de insercion"""
+        filtro = _filtro_desde(supervisor_email, despues_de, hasta, solo_no_leidas)
+        cursor = self._col.find(filtro).sort("_id", 1).limit(limite)
+        return await cursor.to_list(None)
+
+    async def marcar_leida(self, supervisor_email: str, notificacion_id: str) -> bool:
+        res = await self._col.update_one(
+            {"id": notificacion_id, "supervisor_email": supervisor_email, "leida": False},
+            _marca_leida()
         )
-        return res.matched_count == 1
-    
-    
-    
\ No newline at end of file
+        if res.modified_count == 1:
+            await self._contadores.update_one({"_id": supervisor_email}, {"$inc": {"no_leidas": -1}})
+            return True
+        filtro = {"id": notificacion_id, "supervisor_email": supervisor_email}
+        return await self._col.count_documents(filtro, limit=1) == 1
+
+    async def marcar_leidas(self, supervisor_email: str, ids: Optional[List[str]] = None,
+                            hasta: Optional[datetime] = None) -> int:
+        res = await self._col.update_many(_filtro_marcar(supervisor_email, ids, hasta), _marca_leida())
+        if res.modified_count:
+            await self._contadores.update_one(
+                {"_id": supervisor_email}, {"$inc": {"no_leidas": -res.modified_count}}
+            )
+        return res.modified_count
+
+    async def contar_no_leidas(self, supervisor_email: str) -> int:
+        return _no_leidas(await self._contadores.find_one({"_id": supervisor_email}))
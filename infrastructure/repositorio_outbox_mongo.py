@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from pymongo import UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+NOMBRE_COLECCION = "outbox_notificaciones"
+
+PENDIENTE = "pendiente"
+PROCESANDO = "procesando"
+FALLIDA = "fallida"
+
+
+def documento_intento(supervisor_emails: List[str], mensaje: str, autor, tipo_evento: str,
+                      requerimiento_id: Optional[int]) -> Dict[str, Any]:
+    """una entrada del outbox = una notificacion para N supervisores"""
+    ahora = datetime.now()
+    return {
+        "supervisor_emails": list(supervisor_emails),
+        "texto": mensaje,
+        "autor_email": autor.email,
+        "autor_nombre": autor.nombre,
+        "tipo_evento": tipo_evento,
+        "requerimiento_id": requerimiento_id,
+        "fecha": ahora,
+        "estado": PENDIENTE,
+        "intentos": 0,
+        "proximo_intento": ahora,
+    }
+
+
+class RepositorioOutboxMongo:
+    """
+    cola persistente de notificaciones por entregar
+    lo que se encola sobrevive a una caida del proceso; varios workers pueden
+    consumir a la vez (cada lote se toma con un token y un plazo)
+    """
+
+    def __init__(self, db: Optional[Database] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
+        self._col = db[NOMBRE_COLECCION]
+
+    def encolar(self, intento: Dict[str, Any]) -> None:
+        self._col.insert_one(intento)
+
+    def tomar_lote(self, cantidad: int, plazo_segundos: float) -> List[Dict[str, Any]]:
+        """
+        reserva hasta `cantidad` entradas vencidas: pendientes, o tomadas por un
+        worker que no termino dentro del plazo (se cayo a mitad de camino)
+        """
+        ahora = datetime.now()
+        disponibles = {"$or": [
+            {"estado": PENDIENTE, "proximo_intento": {"$lte": ahora}},
+            {"estado": PROCESANDO, "vence": {"$lt": ahora}},
+        ]}
+        ids = [d["_id"] for d in self._col.find(disponibles, {"_id": 1}).sort("proximo_intento", 1).limit(cantidad)]
+        if not ids:
+            return []
+
+        token = str(uuid4())
+        self._col.update_many(
+            {"_id": {"$in": ids}, **disponibles},
+            {"$set": {"estado": PROCESANDO, "token": token, "vence": ahora + timedelta(seconds=plazo_segundos)}},
+        )
+        return list(self._col.find({"token": token}))
+
+    def completar(self, ids: List[Any]) -> None:
+        if ids:
+            self._col.delete_many({"_id": {"$in": ids}})
+
+    def reprogramar(self, intentos: List[Dict[str, Any]], error: str, max_intentos: int,
+                    espera_maxima: float) -> int:
+        """backoff exponencial por entrada; pasado max_intentos queda como fallida. retorna las fallidas"""
+        ahora = datetime.now()
+        operaciones = []
+        fallidas = 0
+        for intento in intentos:
+            numero = intento.get("intentos", 0) + 1
+            if numero >= max_intentos:
+                cambios = {"estado": FALLIDA}
+                fallidas += 1
+            else:
+                espera = min(2 ** numero, espera_maxima)
+                cambios = {"estado": PENDIENTE, "proximo_intento": ahora + timedelta(seconds=espera)}
+            operaciones.append(UpdateOne(
+                {"_id": intento["_id"]},
+                {"$set": {**cambios, "intentos": numero, "ultimo_error": error}, "$unset": {"token": "", "vence": ""}},
+            ))
+        if operaciones:
+            self._col.bulk_write(operaciones, ordered=False)
+        return fallidas
+
+    def contar_pendientes(self) -> int:
+        return self._col.count_documents({"estado": {"$in": [PENDIENTE, PROCESANDO]}})
+
+
+class RepositorioOutboxMongoAsync:
+    def __init__(self, db: Optional[AsyncDatabase] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos_async()
+        self._col = db[NOMBRE_COLECCION]
+
+    async def encolar(self, intento: Dict[str, Any]) -> None:
+        await self._col.insert_one(intento)
@@ -0,0 +1,403 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import InsertOne
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from infrastructure.codec_mongo import (
+    codificar_comentario,
+    codificar_escalares,
+    codificar_evento,
+    codificar_eventos,
+    codificar_requerimiento,
+)
+from infrastructure.conexion_mongo import ConexionMongo
+from infrastructure.repositorio_eventos_mongo import RepositorioEventosMongo, RepositorioEventosMongoAsync
+
+
+# eventos que quedan embebidos en el documento (el historial completo va al log)
+COLA_EVENTOS = 20
+
+
+# atributo de dominio -> campos del documento que dependen de el (si no coinciden)
+_CAMPOS_DOCUMENTO = {
+    "tecnico_asignado": ("tecnico_asignado_email",),
+    "urgencia": ("urgencia", "prioridad"),
+}
+
+# vista resumen de los listados: sin los arreglos de historial, solo contadores
+# (cada hijo suma su campo de tipo; todo esta en el indice "resumen" -> consulta cubierta)
+PROYECCION_RESUMEN = {
+    "_id": 0,
+    "id": 1,
+    "estado": 1,
+    "prioridad": 1,
+    "servicio": 1,
+    "solicitante_email": 1,
+    "tecnico_asignado_email": 1,
+    "comentarios_total": 1,
+    "eventos_total": 1,
+}
+
+
+def _update_cambios(
+    campos: Optional[Dict[str, Any]],
+    eventos: Iterable[Dict[str, Any]],
+    comentarios: Iterable[Dict[str, Any]],
+) -> Dict[str, Any]:
+    update: Dict[str, Any] = {}
+    if campos:
+        update["$set"] = dict(campos)
+    push: Dict[str, Any] = {}
+    eventos = list(eventos)
+    comentarios = list(comentarios)
+    if eventos:
+        push["eventos"] = {"$each": eventos, "$slice": -COLA_EVENTOS}
+        update["$inc"] = {"eventos_total": len(eventos)}
+    if comentarios:
+        push["comentarios"] = {"$each": comentarios}
+        update.setdefault("$inc", {})["comentarios_total"] = len(comentarios)
+    if push:
+        update["$push"] = push
+    return update
+
+
+def _pipeline_pagina(
+    filtro: Dict[str, Any],
+    limite: int,
+    despues_de: Optional[int],
+    proyeccion: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    if despues_de is not None:
+        filtro = {**filtro, "id": {"$gt": despues_de}}
+    return [
+        {"$match": filtro},
+        {"$sort": {"id": 1}},
+        {"$limit": limite},
+        {"$project": proyeccion},
+    ]
+
+
+def _proyeccion_detalle(
+    campos: Optional[Iterable[str]],
+    eventos_limite: Optional[int],
+    comentarios_limite: Optional[int],
+) -> Dict[str, Any]:
+    """proyeccion para el detalle: solo los campos pedidos y las ultimas N entradas ($slice)"""
+    proyeccion: Dict[str, Any] = {"_id": 0}
+    campos = set(campos or ())
+    if campos:
+        proyeccion["id"] = 1
+        proyeccion.update({campo: 1 for campo in campos})
+    for arreglo, limite in (("eventos", eventos_limite), ("comentarios", comentarios_limite)):
+        if limite is not None and (not campos or arreglo in campos):
+            proyeccion[arreglo] = {"$slice": -limite}
+    return proyeccion
+
+
+def _rebanada_comentarios(limite: int, antes_de: Optional[int]) -> Tuple[Optional[int], List[int]]:
+    """
+    argumentos del $slice para una pagina de comentarios: los ultimos `limite`,
+    o los `limite` anteriores a la posicion `antes_de`. retorna (inicio, rebanada);
+    sin cursor el inicio depende del total y se calcula con la respuesta
+    """
+    if antes_de is None:
+        return None, [-limite]
+    inicio = max(0, antes_de - limite)
+    return inicio, [inicio, max(antes_de - inicio, 1)]  # $slice exige n > 0
+
+
+def _posicionar_comentarios(
+    comentarios: List[Dict[str, Any]],
+    total: int,
+    inicio: Optional[int],
+    antes_de: Optional[int],
+) -> List[Dict[str, Any]]:
+    """numera cada comentario con su posicion (el cursor) y los deja del mas nuevo al mas viejo"""
+    if inicio is None:
+        inicio = total - len(comentarios)
+    else:
+        # con antes_de == 0 el $slice trajo 1 de mas (n > 0)
+        comentarios = comentarios[:max(antes_de - inicio, 0)]
+    for desplazamiento, comentario in enumerate(comentarios):
+        comentario["posicion"] = inicio + desplazamiento
+    comentarios.reverse()
+    return comentarios
+
+
+class _BaseRepositorioRequerimientos:
+    """
+    comun a incidentes y solicitudes (los documentos los arma codec_mongo)
+    cada hijo define la coleccion y los campos propios del resumen
+    """
+
+    nombre_coleccion: str = ""
+    campos_resumen: Tuple[str, ...] = ()
+
+    def _proyeccion(self, resumen: bool) -> Dict[str, Any]:
+        if not resumen:
+            return {"_id": 0}
+        return {**PROYECCION_RESUMEN, **{campo: 1 for campo in self.campos_resumen}}
+
+    def _cambios_pendientes(self, requerimiento) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        solo lo que cambio desde el ultimo guardado: escalares modificados +
+        comentarios/eventos nuevos (no reescribe el historial)
+        """
+        modificados, comentarios, eventos = requerimiento.cambios_pendientes()
+        campos: Dict[str, Any] = {}
+        if modificados:
+            claves = {clave for campo in modificados for clave in _CAMPOS_DOCUMENTO.get(campo, (campo,))}
+            campos = {k: v for k, v in codificar_escalares(requerimiento).items() if k in claves}
+        return campos, [codificar_evento(e) for e in eventos], [codificar_comentario(c) for c in comentarios]
+
+
+class RepositorioRequerimientosMongo(_BaseRepositorioRequerimientos):
+    """repositorio base sync (pymongo)"""
+
+    def __init__(self, db: Optional[Database] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
+        self.coleccion = db[self.nombre_coleccion]
+        self.log_eventos = RepositorioEventosMongo(db)
+
+    # ==================== CREATE / UPSERT ====================
+
+    def guardar(self, requerimiento) -> None:
+        eventos = codificar_eventos(requerimiento)
+        self.log_eventos.registrar(requerimiento.id, self.nombre_coleccion, eventos)
+        documento = codificar_requerimiento(requerimiento, COLA_EVENTOS, eventos)
+        self.coleccion.update_one({"id": requerimiento.id}, {"$set": documento}, upsert=True)
+        requerimiento.marcar_persistido()
+
+    # ==================== UPDATE ====================
+
+    def actualizar(self, requerimiento) -> None:
+        """persiste solo los cambios pendientes (costo independiente del historial)"""
+        self.registrar_cambios(requerimiento.id, *self._cambios_pendientes(requerimiento))
+        requerimiento.marcar_persistido()
+
+    def agregar_comentario_por_id(self, requerimiento_id: int, comentario_doc: dict) -> None:
+        self.coleccion.update_one(
+            {"id": requerimiento_id},
+            {"$push": {"comentarios": comentario_doc}, "$inc": {"comentarios_total": 1}}
+        )
+
+    def registrar_cambios(
+        self,
+        requerimiento_id: int,
+        campos: Optional[Dict[str, Any]] = None,
+        eventos: Iterable[Dict[str, Any]] = (),
+        comentarios: Iterable[Dict[str, Any]] = (),
+    ) -> None:
+        """
+        $set de campos + $push de eventos/comentarios nuevos en un solo update
+        los eventos van primero al log; el documento solo conserva la cola
+        """
+        eventos = list(eventos)
+        self.log_eventos.registrar(requerimiento_id, self.nombre_coleccion, eventos)
+        update = _update_cambios(campos, eventos, comentarios)
+        if update:
+            self.coleccion.update_one({"id": requerimiento_id}, update)
+
+    # ==================== READ (GET) ====================
+
+    def buscar_por_id(self, requerimiento_id: int):
+        return self.coleccion.find_one({"id": requerimiento_id}, {"_id": 0})
+
+    def listar(self):
+        return list(self.coleccion.find({}, {"_id": 0}).sort("id", 1))
+
+    def listar_ids(self, filtro: Dict[str, Any], limite: Optional[int] = None,
+                   despues_de: Optional[int] = None) -> List[int]:
+        """solo los ids que cumplen el filtro, en orden (el resto puede estar en memoria)"""
+        if despues_de is not None:
+            filtro = {**filtro, "id": {"$gt": despues_de}}
+        cursor = self.coleccion.find(filtro, {"_id": 0, "id": 1}).sort("id", 1)
+        if limite is not None:
+            cursor = cursor.limit(limite)
+        return [doc["id"] for doc in cursor]
+
+    def buscar_por_ids(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        return list(self.coleccion.find({"id": {"$in": list(ids)}}, {"_id": 0}))
+
+    def ultimo_id(self) -> int:
+        doc = self.coleccion.find_one({}, {"_id": 0, "id": 1}, sort=[("id", -1)])
+        return doc["id"] if doc else 0
+
+
+class RepositorioRequerimientosMongoAsync(_BaseRepositorioRequerimientos):
+    """variante asyncio (PyMongo Async) para los routers"""
+
+    def __init__(self, db: Optional[AsyncDatabase] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos_async()
+        self.coleccion = db[self.nombre_coleccion]
+        self.log_eventos = RepositorioEventosMongoAsync(db)
+
+    # ==================== CREATE / UPSERT ====================
+
+    async def guardar(self, requerimiento) -> None:
+        eventos = codificar_eventos(requerimiento)
+        await self.log_eventos.registrar(requerimiento.id, self.nombre_coleccion, eventos)
+        documento = codificar_requerimiento(requerimiento, COLA_EVENTOS, eventos)
+        await self.coleccion.update_one({"id": requerimiento.id}, {"$set": documento}, upsert=True)
+        requerimiento.marcar_persistido()
+
+    async def guardar_lote(self, requerimientos: List[Any]) -> Dict[int, str]:
+        """
+        alta masiva: un bulk_write desordenado (un documento que falla no frena
+        al resto) + un insert_many al log con los eventos de los que se
+        escribieron (los que fallan no dejan eventos huerfanos). retorna {indice: error}
+        """
+        if not requerimientos:
+            return {}
+        eventos = [codificar_eventos(r) for r in requerimientos]
+        operaciones = [
+            InsertOne(codificar_requerimiento(r, COLA_EVENTOS, eventos[indice]))
+            for indice, r in enumerate(requerimientos)
+        ]
+
+        errores: Dict[int, str] = {}
+        try:
+            await self.coleccion.bulk_write(operaciones, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                errores[error["index"]] = error.get("errmsg", "Error de escritura")
+
+        escritos = [indice for indice in range(len(requerimientos)) if indice not in errores]
+        await self.log_eventos.registrar_lote(
+            self.nombre_coleccion, {requerimientos[i].id: eventos[i] for i in escritos}
+        )
+        for indice in escritos:
+            requerimientos[indice].marcar_persistido()
+        return errores
+
+    # ==================== UPDATE ====================
+
+    async def actualizar(self, requerimiento) -> None:
+        """persiste solo los cambios pendientes (costo independiente del historial)"""
+        await self.registrar_cambios(requerimiento.id, *self._cambios_pendientes(requerimiento))
+        requerimiento.marcar_persistido()
+
+    async def agregar_comentario_por_id(self, requerimiento_id: int, comentario_doc: dict) -> None:
+        await self.coleccion.update_one(
+            {"id": requerimiento_id},
+            {"$push": {"comentarios": comentario_doc}, "$inc": {"comentarios_total": 1}}
+        )
+
+    async def registrar_cambios(
+        self,
+        requerimiento_id: int,
+        campos: Optional[Dict[str, Any]] = None,
+        eventos: Iterable[Dict[str, Any]] = (),
+        comentarios: Iterable[Dict[str, Any]] = (),
+    ) -> None:
+        """
+        $set de campos + $push de eventos/comentarios nuevos en un solo update
+        los eventos van primero al log; el documento solo conserva la cola
+        """
+        eventos = list(eventos)
+        await self.log_eventos.registrar(requerimiento_id, self.nombre_coleccion, eventos)
+        update = _update_cambios(campos, eventos, comentarios)
+        if update:
+            await self.coleccion.update_one({"id": requerimiento_id}, update)
+
+    # ==================== READ (GET) ====================
+
+    async def buscar_por_id(
+        self,
+        requerimiento_id: int,
+        campos: Optional[Iterable[str]] = None,
+        eventos_limite: Optional[int] = None,
+        comentarios_limite: Optional[int] = None,
+    ):
+        proyeccion = _proyeccion_detalle(campos, eventos_limite, comentarios_limite)
+        return await self.coleccion.find_one({"id": requerimiento_id}, proyeccion)
+
+    async def existe(self, requerimiento_id: int) -> bool:
+        return await self.coleccion.find_one({"id": requerimiento_id}, {"_id": 1}) is not None
+
+    async def listar_comentarios(
+        self,
+        requerimiento_id: int,
+        limite: int,
+        antes_de: Optional[int] = None,
+    ) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        pagina de comentarios del mas nuevo al mas viejo (None si no existe el requerimiento)
+        los comentarios solo se agregan al final, asi que la posicion sirve de cursor:
+        `antes_de` es la posicion del ultimo comentario recibido
+        """
+        inicio, rebanada = _rebanada_comentarios(limite, antes_de)
+        pipeline = [
+            {"$match": {"id": requerimiento_id}},
+            {"$project": {
+                "_id": 0,
+                "total": {"$size": {"$ifNull": ["$comentarios", []]}},
+                "comentarios": {"$slice": [{"$ifNull": ["$comentarios", []]}, *rebanada]},
+            }},
+        ]
+        cursor = await self.coleccion.aggregate(pipeline)
+        resultado = await cursor.to_list(None)
+        if not resultado:
+            return None
+
+        total, comentarios = resultado[0]["total"], resultado[0]["comentarios"]
+        if antes_de is not None and antes_de > total:
+            # cursor mas alla del final (no salio de una respuesta): se toma desde el ultimo
+            return await self.listar_comentarios(requerimiento_id, limite, total)
+        return total, _posicionar_comentarios(comentarios, total, inicio, antes_de)
+
+    async def listar(self):
+        return await self.coleccion.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+
+    async def listar_pagina(
+        self, limite: int, despues_de: Optional[int] = None, resumen: bool = False
+    ) -> List[Dict[str, Any]]:
+        """paginacion keyset sobre id (usa el indice unico, costo constante por pagina)"""
+        filtro = {"id": {"$gt": despues_de}} if despues_de is not None else {}
+        return await self.coleccion.find(filtro, self._proyeccion(resumen)).sort("id", 1).limit(limite).to_list(None)
+
+    async def contar_estimado(self) -> int:
+        return await self.coleccion.estimated_document_count()
+
+    async def listar_union(
+        self,
+        otra: "RepositorioRequerimientosMongoAsync",
+        filtro: Dict[str, Any],
+        limite: int,
+        despues_de: Optional[int] = None,
+        resumen: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        una pagina de esta coleccion + `otra` con el mismo filtro, ordenada por id
+        cada rama ya viene ordenada y limitada (indice (campo, id)), asi el $sort final
+        trabaja sobre a lo sumo 2 * (limite + 1) documentos
+        el cursor es el id: si el mismo id esta en las dos colecciones (datos previos a
+        la secuencia compartida) y la pagina corta entre ambos, se incluye el segundo
+        (la pagina trae limite + 1) para que `despues_de` no lo saltee
+        """
+        rama = _pipeline_pagina(filtro, limite + 1, despues_de, self._proyeccion(resumen))
+        rama_otra = _pipeline_pagina(filtro, limite + 1, despues_de, otra._proyeccion(resumen))
+        pipeline = rama + [
+            {"$unionWith": {"coll": otra.nombre_coleccion, "pipeline": rama_otra}},
+            {"$sort": {"id": 1}},
+            {"$limit": limite + 1},
+        ]
+        cursor = await self.coleccion.aggregate(pipeline)
+        docs = await cursor.to_list(None)
+        if len(docs) > limite and docs[limite]["id"] != docs[limite - 1]["id"]:
+            docs.pop()
+        return docs
+
+    def exportar(self, desde: Optional[datetime] = None, tamano_lote: int = 500):
+        """cursor async para exportar (lecturas por lotes, sin armar la lista en memoria)"""
+        if desde is not None:
+            if desde.tzinfo is not None:
+                # fecha_creacion se guarda naive en hora local
+                desde = desde.astimezone().replace(tzinfo=None)
+            cursor = self.coleccion.find({"fecha_creacion": {"$gte": desde}}, {"_id": 0}).sort("fecha_creacion", 1)
+        else:
+            cursor = self.coleccion.find({}, {"_id": 0}).sort("id", 1)
+        return cursor.batch_size(tamano_lote)
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+def _upsert_supervision(supervisor_email: str, empleado_email: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    ahora = datetime.now()
+    return (
+        {"supervisor_email": supervisor_email, "empleado_email": empleado_email},
+        # "actualizado" es lo que leen los otros workers para refrescar su grafo
+        {"$set": {"actualizado": ahora}, "$setOnInsert": {"fecha": ahora}},
+    )
+
+
+def _filtro_desde(desde: Optional[datetime]) -> Dict[str, Any]:
+    return {"actualizado": {"$gte": desde}} if desde is not None else {}
+
+
+_PROYECCION = {"_id": 0, "supervisor_email": 1, "empleado_email": 1, "actualizado": 1}
+
+
+class RepositorioSupervisionesMongo:
+    """relaciones supervisor -> empleado (una por par)"""
+
+    def __init__(self, db: Optional[Database] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
+        self._col = db["supervisiones"]
+
+    def guardar(self, supervisor_email: str, empleado_email: str) -> None:
+        filtro, update = _upsert_supervision(supervisor_email, empleado_email)
+        self._col.update_one(filtro, update, upsert=True)
+
+    def listar_desde(self, desde: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """todas (desde=None) o solo las modificadas desde esa fecha"""
+        return list(self._col.find(_filtro_desde(desde), _PROYECCION).sort("actualizado", 1))
+
+
+class RepositorioSupervisionesMongoAsync:
+    def __init__(self, db: Optional[AsyncDatabase] = None) -> None:
+        db = db if db is not None else ConexionMongo().obtener_base_datos_async()
+        self._col = db["supervisiones"]
+
+    async def guardar(self, supervisor_email: str, empleado_email: str) -> None:
+        filtro, update = _upsert_supervision(supervisor_email, empleado_email)
+        await self._col.update_one(filtro, update, upsert=True)
+
+    async def listar_desde(self, desde: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return await self._col.find(_filtro_desde(desde), _PROYECCION).sort("actualizado", 1).to_list(None)
@@ -1,27 +1,75 @@
+from typing import Iterable, List, Optional
+
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+
+from infrastructure.codec_mongo import codificar_usuario
 from infrastructure.conexion_mongo import ConexionMongo
 
 
+# nunca se expone el hash (ni el password plano de documentos viejos) hacia la API
+_PROYECCION_PUBLICA = {"_id": 0, "password": 0, "password_hash": 0}
+
+
+def _update_usuario(tipo_usuario: str, usuario) -> dict:
+    # se guarda solo el hash bcrypt
+    return {"$set": codificar_usuario(usuario, tipo_usuario), "$unset": {"password": ""}}
+
+
 class RepositorioUsuariosMongo:
-    def __init__(self):
-        conexion = ConexionMongo()
-        self.coleccion = conexion.obtener_base_datos()["usuarios"]
-
-    def guardar(self, tipo_usuario: str, usuario, password: str) -> None:
-        documento = {
-            "tipo_usuario": tipo_usuario,
-            "nombre": usuario.nombre,
-            "email": usuario.email,
-            "password": password
-        }
-        self.coleccion.update_one({"email": usuario.email}, {"$set": documento}, upsert=True)
-
-    # ✅ PARA EL SISTEMA (con password)
+    def __init__(self, db: Optional[Database] = None):
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
+        self.coleccion = db["usuarios"]
+
+    def guardar(self, tipo_usuario: str, usuario) -> None:
+        self.coleccion.update_one({"email": usuario.email}, _update_usuario(tipo_usuario, usuario), upsert=True)
+
+    # ✅ PARA EL SISTEMA (con hash)
     def buscar_por_email_interno(self, email: str):
         return self.coleccion.find_one({"email": email}, {"_id": 0})
 
+    def buscar_por_emails_interno(self, emails: Iterable[str]) -> List[dict]:
+        """varios usuarios con un solo $in"""
+        return list(self.coleccion.find({"email": {"$in": list(emails)}}, {"_id": 0}))
+
     # ✅ PARA LA API (sin password)
     def buscar_por_email(self, email: str):
-        return self.coleccion.find_one({"email": email}, {"_id": 0, "password": 0})
+        return self.coleccion.find_one({"email": email}, _PROYECCION_PUBLICA)
 
     def listar(self):
-        return list(self.coleccion.find({}, {"_id": 0, "password": 0}).sort("email", 1))
\ No newline at end of file
+        return list(self.coleccion.find({}, _PROYECCION_PUBLICA).sort("email", 1))
+
+    def ultimo_id(self) -> int:
+        doc = self.coleccion.find_one({"id": {"$exists": True}}, {"_id": 0, "id": 1}, sort=[("id", -1)])
+        return doc["id"] if doc else 0
+
+
+class RepositorioUsuariosMongoAsync:
+    def __init__(self, db: Optional[AsyncDatabase] = None):
+        db = db if db is not None else ConexionMongo().obtener_base_datos_async()
+        self.coleccion = db["usuarios"]
+
+    async def guardar(self, tipo_usuario: str, usuario) -> None:
+        await self.coleccion.update_one({"email": usuario.email}, _update_usuario(tipo_usuario, usuario), upsert=True)
+
+    async def buscar_por_email_interno(self, email: str):
+        return await self.coleccion.find_one({"email": email}, {"_id": 0})
+
+    async def buscar_por_emails_interno(self, emails: Iterable[str]) -> List[dict]:
+        """varios usuarios con un solo $in (altas masivas)"""
+        return await self.coleccion.find({"email": {"$in": list(emails)}}, {"_id": 0}).to_list(None)
+
+    async def buscar_por_email(self, email: str):
+        return await self.coleccion.find_one({"email": email}, _PROYECCION_PUBLICA)
+
+    async def listar(self):
+        return await self.coleccion.find({}, _PROYECCION_PUBLICA).sort("email", 1).to_list(None)
+
+    async def listar_pagina(self, limite: int, despues_de: Optional[str] = None):
+        """paginacion keyset sobre email (indice unico)"""
+        filtro = {"email": {"$gt": despues_de}} if despues_de is not None else {}
+        cursor = self.coleccion.find(filtro, _PROYECCION_PUBLICA).sort("email", 1).limit(limite)
+        return await cursor.to_list(None)
+
+    async def contar_estimado(self) -> int:
+        return await self.coleccion.estimated_document_count()
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from typing import List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.database import Database
+
+from infrastructure.conexion_mongo import ConexionMongo
+
+
+class SecuenciaMongo:
+    """
+    ids persistentes respaldados por la coleccion "contadores"
+
+    cada proceso reserva un BLOQUE de ids con un unico $inc atomico y los va
+    entregando desde memoria: la mayoria de las altas no hacen round trip extra
+    y dos workers nunca reciben el mismo id (los bloques no se superponen).
+    al reiniciar se pierde lo que quedaba del bloque (quedan huecos, no repetidos)
+    """
+
+    def __init__(self, nombre: str, tamano_bloque: int = 50, db: Optional[Database] = None) -> None:
+        if tamano_bloque < 1:
+            raise ValueError("El tamaño de bloque debe ser positivo")
+        self.nombre = nombre
+        self.tamano_bloque = tamano_bloque
+        db = db if db is not None else ConexionMongo().obtener_base_datos()
+        self.coleccion = db["contadores"]
+        self._siguiente = 0
+        self._limite = 0  # exclusivo
+        self._lock = threading.Lock()
+
+    def _reservar_bloque(self, cantidad: int) -> int:
+        """reserva `cantidad` ids en Mongo y retorna el primero"""
+        doc = self.coleccion.find_one_and_update(
+            {"_id": self.nombre},
+            {"$inc": {"valor": cantidad}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["valor"] - cantidad + 1
+
+    def _tomar(self, cantidad: int) -> Optional[int]:
+        """con el lock tomado: `cantidad` ids del bloque en memoria (None si no alcanzan)"""
+        if self._limite - self._siguiente < cantidad:
+            return None
+        inicio = self._siguiente
+        self._siguiente += cantidad
+        return inicio
+
+    def siguiente(self) -> int:
+        with self._lock:
+            valor = self._tomar(1)
+        if valor is not None:
+            return valor
+        # el round trip va fuera del lock: mientras tanto los demas siguen
+        # sacando del bloque en memoria (y el event loop no queda esperando)
+        inicio = self._reservar_bloque(self.tamano_bloque)
+        with self._lock:
+            if self._siguiente >= self._limite:
+                self._siguiente, self._limite = inicio, inicio + self.tamano_bloque
+            # si otro relleno primero, este bloque se descarta (quedan huecos, no repetidos)
+            return self._tomar(1)
+
+    async def siguiente_async(self) -> int:
+        # camino rapido: queda bloque en memoria, no hay I/O
+        with self._lock:
+            valor = self._tomar(1)
+        if valor is not None:
+            return valor
+        # hay que pedir bloque nuevo: fuera del event loop
+        return await asyncio.to_thread(self.siguiente)
+
+    def reservar(self, cantidad: int) -> List[int]:
+        """
+        `cantidad` ids consecutivos de una vez (altas masivas): salen del bloque
+        en memoria si alcanza, si no de un rango nuevo con un solo $inc
+        """
+        with self._lock:
+            inicio = self._tomar(cantidad)
+        if inicio is None:
+            inicio = self._reservar_bloque(cantidad)
+        return list(range(inicio, inicio + cantidad))
+
+    async def reservar_async(self, cantidad: int) -> List[int]:
+        with self._lock:
+            inicio = self._tomar(cantidad)
+        if inicio is not None:
+            return list(range(inicio, inicio + cantidad))
+        return await asyncio.to_thread(self.reservar, cantidad)
+
+    def sembrar(self, minimo: int) -> None:
+        """garantiza que la secuencia no entregue ids <= minimo (datos previos)"""
+        self.coleccion.update_one({"_id": self.nombre}, {"$max": {"valor": minimo}}, upsert=True)
@@ -8,6 +8,22 @@ from domain.urgencias import UrgenciaCritica, UrgenciaImportante, UrgenciaMenor
 from domain.enums import TipoSolicitud
 
 
+def mostrar_requerimientos(sistema: SistemaAyuda, usuario) -> None:
+    """recorre el listado por paginas (despues_de = ultimo id de la pagina anterior)"""
+    total = 0
+    despues_de = None
+    print(f"✓ {usuario.nombre} ve:")
+    while True:
+        pagina = sistema.listar_requerimientos(usuario, despues_de=despues_de)
+        if not pagina:
+            break
+        for req in pagina:
+            print(f"  - Req #{req.id}: {req.estado.value} (Prioridad: {req.calcular_prioridad()})")
+        total += len(pagina)
+        despues_de = pagina[-1].id
+    print(f"  ({total} requerimientos)")
+
+
 def main():
     """Función principal de demostración."""
     
@@ -17,6 +33,8 @@ def main():
     print("=" * 60)
     
     sistema = SistemaAyuda()
+    # con una base previa: las secuencias arrancan despues del mayor id guardado
+    sistema.sincronizar_secuencias()
     
     # ==================== REGISTRO DE USUARIOS ====================
     print("\n[1] REGISTRANDO USUARIOS...")
@@ -186,22 +204,13 @@ def main():
     print("\n[13] LISTADO DE REQUERIMIENTOS...")
     
     # Solicitante ve solo los suyos
-    req_solicitante = sistema.listar_requerimientos(solicitante1)
-    print(f"✓ {solicitante1.nombre} ve {len(req_solicitante)} requerimientos:")
-    for req in req_solicitante:
-        print(f"  - Req #{req.id}: {req.estado.value} (Prioridad: {req.calcular_prioridad()})")
+    mostrar_requerimientos(sistema, solicitante1)
     
     # Operador ve todos
-    req_operador = sistema.listar_requerimientos(operador1)
-    print(f"✓ {operador1.nombre} ve {len(req_operador)} requerimientos:")
-    for req in req_operador:
-        print(f"  - Req #{req.id}: {req.estado.value} (Prioridad: {req.calcular_prioridad()})")
+    mostrar_requerimientos(sistema, operador1)
     
     # Técnico ve solo los asignados
-    req_tecnico = sistema.listar_requerimientos(tecnico1)
-    print(f"✓ {tecnico1.nombre} ve {len(req_tecnico)} requerimientos:")
-    for req in req_tecnico:
-        print(f"  - Req #{req.id}: {req.estado.value} (Prioridad: {req.calcular_prioridad()})")
+    mostrar_requerimientos(sistema, tecnico1)
     
     # ==================== CAMBIO DE URGENCIA EN RUNTIME (Strategy) ====================
     print("\n[14] CAMBIO DE URGENCIA EN RUNTIME (Strategy Pattern)...")
@@ -252,6 +261,9 @@ def main():
     print("✓ Composición: Requerimiento HAS-A Comentarios/Eventos")
     print("=" * 60)
 
+    # entrega lo que quede en el outbox de notificaciones antes de salir
+    sistema.despachador_notificaciones.detener()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
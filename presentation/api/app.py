@@ -1,4 +1,14 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from pymongo.errors import PyMongoError
+
+from infrastructure.conexion_mongo import ConexionMongo
+from infrastructure.indices_mongo import asegurar_indices
+from presentation.api.dependencias import get_sistema
 
 from presentation.api.routers.incidentes import router as incidentes_router
 from presentation.api.routers.usuarios import router as usuarios_router
@@ -12,7 +22,45 @@ from presentation.api.routers import notificaciones
 
 
 
-app = FastAPI(title="Mesa de Ayuda - Cooperativa Comunicarlos")
+logger = logging.getLogger(__name__)
+
+# cada cuanto se traen las relaciones de supervision creadas por otros workers
+REFRESCO_SUPERVISIONES_SEGUNDOS = float(os.getenv("SUPERVISIONES_REFRESCO_SEGUNDOS", "10"))
+
+
+async def _refrescar_supervisiones(intervalo: float) -> None:
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await get_sistema().refrescar_supervisiones_async()
+        except PyMongoError:
+            logger.exception("no se pudo refrescar el grafo de supervision")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # arranque: pool de Mongo abierto antes de recibir trafico
+    ConexionMongo.calentar()
+    await ConexionMongo.calentar_async()
+    for deriva in asegurar_indices(ConexionMongo().obtener_base_datos()):
+        logger.warning("indices: %s", deriva)
+    get_sistema().sincronizar_secuencias()
+    get_sistema().cargar_supervisiones()
+    # entrega tambien lo que haya quedado en el outbox de una corrida anterior
+    get_sistema().despachador_notificaciones.iniciar()
+    refresco = asyncio.create_task(_refrescar_supervisiones(REFRESCO_SUPERVISIONES_SEGUNDOS))
+    yield
+    # apagado
+    refresco.cancel()
+    with suppress(asyncio.CancelledError):
+        await refresco
+    get_sistema().despachador_notificaciones.detener()
+    get_sistema().pool_verificacion.cerrar()
+    await ConexionMongo.cerrar_async()
+    ConexionMongo.cerrar()
+
+
+app = FastAPI(title="Mesa de Ayuda - Cooperativa Comunicarlos", lifespan=lifespan)
 
 # routers
 app.include_router(usuarios_router)
@@ -25,7 +73,12 @@ app.include_router(notificaciones.router)
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+@app.get("/metricas")
+async def metricas():
+    return get_sistema().metricas()
+
+
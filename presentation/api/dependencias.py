@@ -1,4 +1,8 @@
 from application.sistema import SistemaAyuda
+from infrastructure.conexion_mongo import ConexionMongo
+
+# la API usa el cliente sync y el async: se reparten el pool (antes de crearlos)
+ConexionMongo.usar_cliente_async()
 
 # Instancia ÚNICA del sistema (estado compartido entre requests)
 _sistema = SistemaAyuda()
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class LoginDTO(BaseModel):
+    email: str
+    password: str
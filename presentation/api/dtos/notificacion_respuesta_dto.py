@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -10,7 +11,7 @@ class NotificacionRespuestaDTO(BaseModel):
     autor_nombre: str
     fecha: datetime
     tipo_evento: str
-    requerimiento_id: int
+    requerimiento_id: Optional[int] = None
     leida: bool
     
     
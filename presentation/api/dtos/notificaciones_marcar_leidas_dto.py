@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class NotificacionesMarcarLeidasDTO(BaseModel):
+    supervisor_email: str
+    # uno de los dos: ids puntuales, o todas hasta una fecha
+    ids: Optional[List[str]] = None
+    hasta: Optional[datetime] = None
@@ -0,0 +1,62 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+# se junta hasta este tamaño antes de escribir al socket
+_TAMANO_CHUNK = 64 * 1024
+
+
+def _json_default(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return str(valor)
+
+
+async def _lineas_ndjson(cursor, comprimir: bool) -> AsyncIterator[bytes]:
+    compresor = zlib.compressobj(wbits=31) if comprimir else None  # wbits=31 -> formato gzip
+    buffer = bytearray()
+    primero = True
+    try:
+        async for doc in cursor:
+            buffer += json.dumps(doc, default=_json_default, ensure_ascii=False).encode("utf-8")
+            buffer += b"\n"
+            # el primer documento sale enseguida; despues se agrupa en chunks
+            if primero or len(buffer) >= _TAMANO_CHUNK:
+                primero = False
+                datos = bytes(buffer)
+                buffer.clear()
+                if compresor:
+                    # Z_SYNC_FLUSH: el cliente puede descomprimir lo recibido sin esperar al final
+                    datos = compresor.compress(datos) + compresor.flush(zlib.Z_SYNC_FLUSH)
+                yield datos
+        if compresor:
+            yield compresor.compress(bytes(buffer)) + compresor.flush()
+        elif buffer:
+            yield bytes(buffer)
+    finally:
+        await cursor.close()
+
+
+def acepta_gzip(accept_encoding: Optional[str]) -> bool:
+    """el cliente anuncia gzip en Accept-Encoding (y no con q=0)"""
+    for parte in (accept_encoding or "").split(","):
+        codificacion, _, parametros = parte.partition(";")
+        if codificacion.strip().lower() != "gzip":
+            continue
+        calidad = parametros.strip().lower()
+        try:
+            return not (calidad.startswith("q=") and float(calidad[2:]) == 0)
+        except ValueError:
+            return False
+    return False
+
+
+def respuesta_ndjson(cursor, comprimir: bool = False) -> StreamingResponse:
+    """stream NDJSON directo desde un cursor async de Mongo (memoria constante)"""
+    headers = {"Vary": "Accept-Encoding"}
+    if comprimir:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(_lineas_ndjson(cursor, comprimir), media_type="application/x-ndjson", headers=headers)
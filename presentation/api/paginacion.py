@@ -0,0 +1,34 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import Query, Response
+
+# parametros comunes de los listados paginados
+LIMITE_DEFAULT = 50
+LIMITE_MAXIMO = 500
+
+# tamaño maximo de las altas masivas (POST .../bulk)
+LOTE_MAXIMO = 1000
+
+
+def parametro_limit():
+    return Query(LIMITE_DEFAULT, ge=1, le=LIMITE_MAXIMO, description="Cantidad máxima de resultados")
+
+
+Vista = Literal["full", "summary"]
+
+
+def parametro_view():
+    return Query("full", description="summary: solo estado, prioridad, asignación y contadores (sin historial)")
+
+
+def encabezados_pagina(response: Response, docs: List[Dict[str, Any]], limite: int, total: Optional[int],
+                       campo: str) -> None:
+    """
+    X-Total-Count: total estimado de la coleccion (si se calculo)
+    X-Next-Cursor: valor para pasar como `after` (solo si puede haber mas; la union
+    de requerimientos puede traer uno de mas, ver listar_union)
+    """
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if len(docs) >= limite:
+        response.headers["X-Next-Cursor"] = str(docs[-1][campo])
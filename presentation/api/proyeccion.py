@@ -0,0 +1,35 @@
+from typing import FrozenSet, List, Optional
+
+from fastapi import HTTPException, Query
+
+from presentation.api.paginacion import LIMITE_MAXIMO
+
+
+# parametros del detalle: que campos y cuanto historial devolver
+
+def parametro_fields():
+    return Query(None, description="Campos a devolver, separados por coma (ej: estado,tecnico_asignado_email)")
+
+
+def parametro_limite_historial(que: str):
+    return Query(None, ge=0, le=LIMITE_MAXIMO, description=f"Solo los últimos N {que}")
+
+
+# campos de primer nivel que se pueden pedir en fields (nada anidado: una ruta
+# como comentarios.texto choca con comentarios en la proyeccion de Mongo)
+_CAMPOS_REQUERIMIENTO = frozenset({
+    "id", "fecha_creacion", "descripcion", "servicio", "solicitante_email", "prioridad", "estado",
+    "tecnico_asignado_email", "fecha_resolucion", "comentarios", "comentarios_total", "eventos", "eventos_total",
+})
+CAMPOS_INCIDENTE = _CAMPOS_REQUERIMIENTO | {"urgencia"}
+CAMPOS_SOLICITUD = _CAMPOS_REQUERIMIENTO | {"tipo_solicitud"}
+
+
+def campos_pedidos(fields: Optional[str], permitidos: FrozenSet[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    campos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    invalidos = [campo for campo in campos if campo not in permitidos]
+    if invalidos:
+        raise HTTPException(status_code=422, detail=f"Campos inválidos en fields: {', '.join(invalidos)}")
+    return campos or None
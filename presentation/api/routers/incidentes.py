@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
 from presentation.api.dtos.comentario_create_dto import ComentarioCreateDTO
 
 from application.sistema import SistemaAyuda
 from presentation.api.dependencias import get_sistema
+from presentation.api.paginacion import LOTE_MAXIMO, Vista, encabezados_pagina, parametro_limit, parametro_view
+from presentation.api.exportacion import acepta_gzip, respuesta_ndjson
+from presentation.api.proyeccion import CAMPOS_INCIDENTE, campos_pedidos, parametro_fields, parametro_limite_historial
 from presentation.api.dtos.incident_create_dto import IncidenteCreateDTO
 
 from domain.usuarios import Solicitante
-from domain.urgencias import UrgenciaCritica, UrgenciaImportante, UrgenciaMenor
+from domain.urgencias import URGENCIAS
+from domain.enums import TipoEvento
+from infrastructure.codec_mongo import comentario_nuevo, evento_nuevo
 from presentation.api.dtos.asignar_tecnico_dto import AsignarTecnicoDTO
 from presentation.api.dtos.derivar_tecnico_dto import DerivarTecnicoDTO
 from presentation.api.dtos.resolver_incidente_dto import ResolverIncidenteDTO
@@ -17,32 +26,26 @@ router = APIRouter(prefix="/incidentes", tags=["Incidentes"])
 
 
 @router.post("/")
-def crear_incidente(
+async def crear_incidente(
     dto: IncidenteCreateDTO,
     sistema: SistemaAyuda = Depends(get_sistema)
 ):
-    solicitante = sistema._buscar_usuario_por_email(dto.solicitante_email)
+    solicitante = await sistema._buscar_usuario_por_email_async(dto.solicitante_email)
     if not solicitante:
         raise HTTPException(status_code=404, detail="Solicitante no encontrado")
 
     if not isinstance(solicitante, Solicitante):
         raise HTTPException(status_code=400, detail="El usuario no es solicitante")
 
-    mapa_urgencias = {
-        "critica": UrgenciaCritica(),
-        "importante": UrgenciaImportante(),
-        "menor": UrgenciaMenor(),
-    }
-
-    urgencia = mapa_urgencias.get(dto.urgencia.lower())
+    urgencia = URGENCIAS.get(dto.urgencia.lower())
     if not urgencia:
         raise HTTPException(status_code=400, detail="Urgencia inválida (critica/importante/menor)")
 
-    servicio = next((s for s in sistema.servicios if s.nombre == dto.servicio), None)
+    servicio = sistema.buscar_servicio(dto.servicio)
     if not servicio:
         raise HTTPException(status_code=404, detail="Servicio no encontrado")
 
-    incidente = sistema.crear_incidente(
+    incidente = await sistema.crear_incidente_async(
         solicitante=solicitante,
         descripcion=dto.descripcion,
         urgencia=urgencia,
@@ -56,95 +59,210 @@ def crear_incidente(
     }
 
 
+@router.post("/bulk")
+async def crear_incidentes_bulk(
+    dtos: List[IncidenteCreateDTO] = Body(..., max_length=LOTE_MAXIMO),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # todos los solicitantes con una sola consulta
+    usuarios = await sistema._buscar_usuarios_por_email_async(dto.solicitante_email for dto in dtos)
+
+    resultados: List[Dict[str, Any]] = [{} for _ in dtos]
+    pedidos, indices = [], []
+    for indice, dto in enumerate(dtos):
+        solicitante = usuarios.get(dto.solicitante_email)
+        urgencia = URGENCIAS.get(dto.urgencia.lower())
+        servicio = sistema.buscar_servicio(dto.servicio)
+        if not solicitante:
+            error = "Solicitante no encontrado"
+        elif not isinstance(solicitante, Solicitante):
+            error = "El usuario no es solicitante"
+        elif not urgencia:
+            error = "Urgencia inválida (critica/importante/menor)"
+        elif not servicio:
+            error = "Servicio no encontrado"
+        else:
+            pedidos.append((solicitante, dto.descripcion, urgencia, servicio))
+            indices.append(indice)
+            continue
+        resultados[indice] = {"indice": indice, "ok": False, "error": error}
+
+    # ids en bloque + un solo bulk_write desordenado
+    creados = await sistema.crear_incidentes_lote_async(pedidos)
+    for indice, (incidente, error) in zip(indices, creados):
+        if error:
+            resultados[indice] = {"indice": indice, "ok": False, "error": error}
+        else:
+            resultados[indice] = {
+                "indice": indice,
+                "ok": True,
+                "id": incidente.id,
+                "estado": incidente.estado.value,
+                "prioridad": incidente.calcular_prioridad(),
+            }
+
+    return {"creados": sum(1 for r in resultados if r["ok"]), "resultados": resultados}
+
+
 @router.post("/{incidente_id}/comentarios")
-def agregar_comentario(
+async def agregar_comentario(
     incidente_id: int,
     dto: ComentarioCreateDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    autor = sistema._buscar_usuario_por_email(dto.autor_email)
+    autor = await sistema._buscar_usuario_por_email_async(dto.autor_email)
     if not autor:
         raise HTTPException(status_code=404, detail=f"No existe usuario con email {dto.autor_email}")
 
-    comentario_doc = {
-        "texto": dto.texto,
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__("datetime").datetime.now().isoformat(),
-    }
+    comentario_doc = comentario_nuevo(dto.texto, autor)
 
-    doc_existente = sistema.repositorio_incidentes.buscar_por_id(incidente_id)
+    doc_existente = await sistema.repositorio_incidentes_async.buscar_por_id(incidente_id)
     if not doc_existente:
         raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
 
-    sistema.repositorio_incidentes.agregar_comentario_por_id(incidente_id, comentario_doc)
+    await sistema.repositorio_incidentes_async.agregar_comentario_por_id(incidente_id, comentario_doc)
+    sistema.olvidar_requerimiento(incidente_id)
 
     return {"ok": True, "incidente_id": incidente_id, "comentario": comentario_doc}
 
 
 @router.get("/")
-def listar_incidentes(sistema: SistemaAyuda = Depends(get_sistema)):
-    return sistema.repositorio_incidentes.listar()
+async def listar_incidentes(
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[int] = Query(None, description="Último id recibido (cursor)"),
+    view: Vista = parametro_view(),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    docs, total = await asyncio.gather(
+        sistema.repositorio_incidentes_async.listar_pagina(limit, after, resumen=view == "summary"),
+        sistema.repositorio_incidentes_async.contar_estimado(),
+    )
+    encabezados_pagina(response, docs, limit, total, "id")
+    return docs
+
+
+@router.get("/export")
+async def exportar_incidentes(
+    since: Optional[datetime] = Query(None, description="Solo requerimientos creados desde esta fecha"),
+    gzip: bool = Query(False, description="Comprimir aunque el cliente no mande Accept-Encoding: gzip"),
+    accept_encoding: Optional[str] = Header(None),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # NDJSON en streaming: una linea por documento, sin cargar todo en memoria
+    comprimir = gzip or acepta_gzip(accept_encoding)
+    return respuesta_ndjson(sistema.repositorio_incidentes_async.exportar(since), comprimir=comprimir)
 
 
 @router.get("/{incidente_id}")
-def ver_incidente(incidente_id: int, sistema: SistemaAyuda = Depends(get_sistema)):
-    doc = sistema.repositorio_incidentes.buscar_por_id(incidente_id)
+async def ver_incidente(
+    incidente_id: int,
+    fields: Optional[str] = parametro_fields(),
+    eventos_limit: Optional[int] = parametro_limite_historial("eventos"),
+    comentarios_limit: Optional[int] = parametro_limite_historial("comentarios"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # proyeccion + $slice en Mongo: solo viaja lo que el cliente muestra
+    doc = await sistema.repositorio_incidentes_async.buscar_por_id(
+        incidente_id,
+        campos=campos_pedidos(fields, CAMPOS_INCIDENTE),
+        eventos_limite=eventos_limit,
+        comentarios_limite=comentarios_limit,
+    )
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
     return doc
 
+
+@router.get("/{incidente_id}/eventos")
+async def listar_eventos_incidente(
+    incidente_id: int,
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[str] = Query(None, description="Cursor del último evento recibido"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # historial completo (log de eventos), del mas nuevo al mas viejo
+    if not await sistema.repositorio_incidentes_async.existe(incidente_id):
+        raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
+    try:
+        repositorio = sistema.repositorio_incidentes_async
+        docs = await repositorio.log_eventos.listar_pagina(incidente_id, repositorio.nombre_coleccion, limit, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    encabezados_pagina(response, docs, limit, None, "cursor")
+    return docs
+
+
+@router.get("/{incidente_id}/comentarios")
+async def listar_comentarios_incidente(
+    incidente_id: int,
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[int] = Query(None, ge=0, description="Posición del último comentario recibido"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    pagina = await sistema.repositorio_incidentes_async.listar_comentarios(incidente_id, limit, after)
+    if pagina is None:
+        raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
+    total, docs = pagina
+    encabezados_pagina(response, docs, limit, total, "posicion")
+    return docs
+
 from domain.usuarios import Operador, Tecnico
 from domain.eventos import EventoFactory
 
 
 @router.post("/{incidente_id}/asignar-tecnico")
-def asignar_tecnico_incidente(
+async def asignar_tecnico_incidente(
     incidente_id: int,
     dto: AsignarTecnicoDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
     # Validar existencia del incidente en Mongo
-    doc = sistema.repositorio_incidentes.buscar_por_id(incidente_id)
+    doc = await sistema.repositorio_incidentes_async.buscar_por_id(incidente_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
 
     # Traer operador y técnico desde Mongo (reconstruye objetos del dominio)
-    operador = sistema._buscar_usuario_por_email(dto.operador_email)
+    operador = await sistema._buscar_usuario_por_email_async(dto.operador_email)
     if not operador:
         raise HTTPException(status_code=404, detail="Operador no encontrado")
     if not isinstance(operador, Operador):
         raise HTTPException(status_code=400, detail="El usuario no es operador")
 
-    tecnico = sistema._buscar_usuario_por_email(dto.tecnico_email)
+    tecnico = await sistema._buscar_usuario_por_email_async(dto.tecnico_email)
     if not tecnico:
         raise HTTPException(status_code=404, detail="Técnico no encontrado")
     if not isinstance(tecnico, Tecnico):
         raise HTTPException(status_code=400, detail="El usuario no es técnico")
 
     # Construir evento y persistir directo en Mongo
-    evento_doc = {
-        "texto": f"Requerimiento #{incidente_id} asignado a {tecnico.nombre}",
-        "autor_email": operador.email,
-        "autor_nombre": operador.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.ASIGNACION",
-    }
+    evento_doc = evento_nuevo(
+        f"Requerimiento #{incidente_id} asignado a {tecnico.nombre}",
+        operador, TipoEvento.ASIGNACION,
+    )
 
-    sistema.repositorio_incidentes.coleccion.update_one(
-        {"id": incidente_id},
-        {"$set": {"tecnico_asignado_email": tecnico.email, "estado": "en_proceso"},
-         "$push": {"eventos": evento_doc}}
+    await sistema.repositorio_incidentes_async.registrar_cambios(
+        incidente_id,
+        campos={"tecnico_asignado_email": tecnico.email, "estado": "en_proceso"},
+        eventos=[evento_doc],
+    )
+    sistema.olvidar_requerimiento(incidente_id)
+    await sistema.notificar_supervisores_async(
+        operador,
+        f"Operador {operador.nombre} asignó req #{incidente_id} a {tecnico.nombre}",
+        incidente_id,
     )
 
     return {"ok": True, "incidente_id": incidente_id, "tecnico_email": tecnico.email, "evento": evento_doc}
 @router.post("/{incidente_id}/derivar")
-def derivar_incidente(
+async def derivar_incidente(
     incidente_id: int,
     dto: DerivarTecnicoDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    doc = sistema.repositorio_incidentes.buscar_por_id(incidente_id)
+    doc = await sistema.repositorio_incidentes_async.buscar_por_id(incidente_id)
     if doc is None:
         raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
 
@@ -155,47 +273,50 @@ def derivar_incidente(
     if tecnico_asignado != dto.tecnico_origen_email:
         raise HTTPException(status_code=400, detail="El incidente no está asignado al técnico origen")
 
-    tecnico_origen = sistema._buscar_usuario_por_email(dto.tecnico_origen_email)
+    tecnico_origen = await sistema._buscar_usuario_por_email_async(dto.tecnico_origen_email)
     if tecnico_origen is None:
         raise HTTPException(status_code=404, detail="Técnico origen no encontrado")
 
-    tecnico_destino = sistema._buscar_usuario_por_email(dto.tecnico_destino_email)
+    tecnico_destino = await sistema._buscar_usuario_por_email_async(dto.tecnico_destino_email)
     if tecnico_destino is None:
         raise HTTPException(status_code=404, detail="Técnico destino no encontrado")
 
-    autor = sistema._buscar_usuario_por_email(dto.autor_email)
+    autor = await sistema._buscar_usuario_por_email_async(dto.autor_email)
     if autor is None:
         raise HTTPException(status_code=404, detail="Autor no encontrado")
 
-    evento_doc = {
-        "texto": f"Requerimiento #{incidente_id} derivado de {tecnico_origen.nombre} a {tecnico_destino.nombre}",
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.DERIVACION",
-    }
+    evento_doc = evento_nuevo(
+        f"Requerimiento #{incidente_id} derivado de {tecnico_origen.nombre} a {tecnico_destino.nombre}",
+        autor, TipoEvento.DERIVACION,
+    )
 
-    sistema.repositorio_incidentes.coleccion.update_one(
-        {"id": incidente_id},
-        {"$set": {"tecnico_asignado_email": tecnico_destino.email},
-         "$push": {"eventos": evento_doc}}
+    await sistema.repositorio_incidentes_async.registrar_cambios(
+        incidente_id,
+        campos={"tecnico_asignado_email": tecnico_destino.email},
+        eventos=[evento_doc],
+    )
+    sistema.olvidar_requerimiento(incidente_id)
+    await sistema.notificar_supervisores_async(
+        tecnico_origen,
+        f"Técnico {tecnico_origen.nombre} derivó req #{incidente_id} a {tecnico_destino.nombre}",
+        incidente_id,
     )
 
     return {"ok": True, "incidente_id": incidente_id, "tecnico_destino_email": tecnico_destino.email}
 
 
 @router.post("/{incidente_id}/resolver")
-def resolver_incidente(
+async def resolver_incidente(
     incidente_id: int,
     dto: ResolverIncidenteDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    doc = sistema.repositorio_incidentes.buscar_por_id(incidente_id)
+    doc = await sistema.repositorio_incidentes_async.buscar_por_id(incidente_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
 
     # validar técnico
-    tecnico = sistema._buscar_usuario_por_email(dto.tecnico_email)
+    tecnico = await sistema._buscar_usuario_por_email_async(dto.tecnico_email)
     if not tecnico:
         raise HTTPException(status_code=404, detail="Técnico no encontrado")
 
@@ -204,36 +325,32 @@ def resolver_incidente(
         raise HTTPException(status_code=400, detail="El incidente no está asignado a ese técnico")
 
     # evento + comentario solución
-    evento_doc = {
-        "texto": f"Requerimiento #{incidente_id} resuelto: {dto.solucion}",
-        "autor_email": tecnico.email,
-        "autor_nombre": tecnico.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.RESOLUCION",
-    }
-    comentario_doc = {
-        "texto": f"Solución: {dto.solucion}",
-        "autor_email": tecnico.email,
-        "autor_nombre": tecnico.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-    }
-
-    sistema.repositorio_incidentes.coleccion.update_one(
-        {"id": incidente_id},
-        {"$set": {"estado": "resuelto"},
-         "$push": {"eventos": evento_doc, "comentarios": comentario_doc}}
+    evento_doc = evento_nuevo(f"Requerimiento #{incidente_id} resuelto: {dto.solucion}", tecnico, TipoEvento.RESOLUCION)
+    comentario_doc = comentario_nuevo(f"Solución: {dto.solucion}", tecnico)
+
+    await sistema.repositorio_incidentes_async.registrar_cambios(
+        incidente_id,
+        campos={"estado": "resuelto"},
+        eventos=[evento_doc],
+        comentarios=[comentario_doc],
+    )
+    sistema.olvidar_requerimiento(incidente_id)
+    await sistema.notificar_supervisores_async(
+        tecnico,
+        f"Técnico {tecnico.nombre} resolvió req #{incidente_id}",
+        incidente_id,
     )
 
     return {"ok": True, "incidente_id": incidente_id}
 
 
 @router.post("/{incidente_id}/reabrir")
-def reabrir_incidente(
+async def reabrir_incidente(
     incidente_id: int,
     dto: ReabrirIncidenteDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    doc = sistema.repositorio_incidentes.buscar_por_id(incidente_id)
+    doc = await sistema.repositorio_incidentes_async.buscar_por_id(incidente_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe incidente con id {incidente_id}")
 
@@ -241,28 +358,24 @@ def reabrir_incidente(
     if doc.get("estado") != "resuelto":
         raise HTTPException(status_code=400, detail="El incidente no está resuelto, no se puede reabrir")
 
-    autor = sistema._buscar_usuario_por_email(dto.autor_email)
+    autor = await sistema._buscar_usuario_por_email_async(dto.autor_email)
     if not autor:
         raise HTTPException(status_code=404, detail="Autor no encontrado")
 
-    evento_doc = {
-        "texto": f"Requerimiento #{incidente_id} reabierto: {dto.motivo}",
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.REAPERTURA",
-    }
-    comentario_doc = {
-        "texto": f"Reabierto: {dto.motivo}",
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-    }
+    evento_doc = evento_nuevo(f"Requerimiento #{incidente_id} reabierto: {dto.motivo}", autor, TipoEvento.REAPERTURA)
+    comentario_doc = comentario_nuevo(f"Reabierto: {dto.motivo}", autor)
 
-    sistema.repositorio_incidentes.coleccion.update_one(
-        {"id": incidente_id},
-        {"$set": {"estado": "reabierto"},
-         "$push": {"eventos": evento_doc, "comentarios": comentario_doc}}
+    await sistema.repositorio_incidentes_async.registrar_cambios(
+        incidente_id,
+        campos={"estado": "reabierto"},
+        eventos=[evento_doc],
+        comentarios=[comentario_doc],
+    )
+    sistema.olvidar_requerimiento(incidente_id)
+    await sistema.notificar_supervisores_async(
+        autor,
+        f"{autor.__class__.__name__} {autor.nombre} reabrió req #{incidente_id}",
+        incidente_id,
     )
 
     return {"ok": True, "incidente_id": incidente_id}
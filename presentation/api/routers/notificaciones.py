@@ -1,24 +1,184 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 from presentation.api.dtos.notificacion_respuesta_dto import NotificacionRespuestaDTO
 from presentation.api.dtos.notificacion_marcar_leida_dto import NotificacionMarcarLeidaDTO
+from presentation.api.dtos.notificaciones_marcar_leidas_dto import NotificacionesMarcarLeidasDTO
 from presentation.api.dependencias import get_sistema
+from presentation.api.paginacion import LIMITE_DEFAULT, LIMITE_MAXIMO, LOTE_MAXIMO
 
 router = APIRouter(prefix="/notificaciones", tags=["Notificaciones"])
 
+# sin novedades, cada cuanto se manda un comentario (mantiene viva la conexion)
+# y se consulta Mongo por lo que entregaron los despachadores de otros workers
+KEEPALIVE_SEGUNDOS = float(os.getenv("NOTIFICACIONES_KEEPALIVE_SEGUNDOS", "15"))
+# los _id los genera cada proceso: al releer se mira este margen hacia atras
+MARGEN_RELECTURA = timedelta(seconds=30)
+LOTE_RELECTURA = 500
+# sincronizacion por cursor: no se entregan las de los ultimos segundos (ver listar_notificaciones)
+# SUPUESTO: el cursor es un ObjectId y cada _id lo genera (con su reloj) el worker que
+# inserta. una notificacion que aterriza despues con un _id anterior al cursor ya
+# entregado no se vuelve a ver por esta via: el desfasaje de relojes entre workers
+# mas la demora del insert tiene que quedar por debajo de este margen (NTP en los
+# hosts). el stream SSE tolera mas (MARGEN_RELECTURA); si se sospecha desfasaje,
+# subirlo con NOTIFICACIONES_MARGEN_ASENTAMIENTO_SEGUNDOS (demora la entrega lo mismo)
+MARGEN_ASENTAMIENTO = timedelta(seconds=float(os.getenv("NOTIFICACIONES_MARGEN_ASENTAMIENTO_SEGUNDOS", "2")))
+# reconexion sugerida al navegador (EventSource)
+REINTENTO_MS = 3000
+
+
+def _evento_sse(notificacion: Dict[str, Any]) -> str:
+    datos = {k: v for k, v in notificacion.items() if k != "_id"}
+    return f"id: {notificacion['_id']}\nevent: notificacion\ndata: {json.dumps(jsonable_encoder(datos))}\n\n"
+
+
+def _cursor(valor: str, nombre: str = "desde") -> ObjectId:
+    try:
+        return ObjectId(valor)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=f"{nombre} inválido")
+
+
+async def _flujo(sistema, supervisor_email: str, ultimo: Optional[ObjectId]) -> AsyncIterator[str]:
+    # suscribir antes de leer Mongo: lo que se entregue en el medio llega por la cola
+    suscripcion = sistema.bus_notificaciones.suscribir(supervisor_email)
+    # ids ya enviados (cola y relectura pueden traer la misma notificacion)
+    enviados: deque = deque(maxlen=LOTE_RELECTURA * 2)
+    # sin Last-Event-ID: desde la conexion, el historial se pide una vez con GET /notificaciones/
+    piso = ultimo or ObjectId.from_datetime(datetime.now(timezone.utc))
+
+    def pendientes(notificaciones: List[Dict[str, Any]]) -> List[str]:
+        nonlocal ultimo
+        eventos = []
+        for n in notificaciones:
+            if n["_id"] in enviados:
+                continue
+            enviados.append(n["_id"])
+            if ultimo is None or n["_id"] > ultimo:
+                ultimo = n["_id"]
+            eventos.append(_evento_sse(n))
+        return eventos
+
+    async def releer(desde: ObjectId) -> List[str]:
+        eventos: List[str] = []
+        while True:
+            lote = await sistema.notificaciones_desde_async(supervisor_email, desde, LOTE_RELECTURA)
+            eventos.extend(pendientes(lote))
+            if len(lote) < LOTE_RELECTURA:
+                return eventos
+            desde = lote[-1]["_id"]
+
+    try:
+        yield f"retry: {REINTENTO_MS}\n\n"
+        if ultimo is not None:
+            # reanudacion: lo que se perdio mientras estuvo desconectado
+            for evento in await releer(ultimo):
+                yield evento
+
+        while True:
+            try:
+                notificacion = await asyncio.wait_for(suscripcion.cola.get(), KEEPALIVE_SEGUNDOS)
+            except asyncio.TimeoutError:
+                desde = piso
+                if ultimo is not None:
+                    desde = max(piso, ObjectId.from_datetime(ultimo.generation_time - MARGEN_RELECTURA))
+                eventos = await releer(desde)
+                for evento in eventos:
+                    yield evento
+                if not eventos:
+                    yield ": keepalive\n\n"
+                continue
+
+            for evento in pendientes([notificacion]):
+                yield evento
+            if suscripcion.desbordada:
+                # el cliente no dio abasto y se perdieron publicaciones: ponerse al dia
+                suscripcion.desbordada = False
+                for evento in await releer(ultimo):
+                    yield evento
+    finally:
+        sistema.bus_notificaciones.desuscribir(suscripcion)
+
 
 @router.get("/", response_model=List[NotificacionRespuestaDTO])
-def listar_notificaciones(
+async def listar_notificaciones(
+    response: Response,
     supervisor_email: str = Query(...),
     solo_no_leidas: bool = Query(False),
+    desde: Optional[str] = Query(None, description="X-Next-Cursor de la respuesta anterior: solo las más nuevas"),
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Cantidad máxima de resultados"),
     sistema=Depends(get_sistema)
 ):
-    return sistema.listar_notificaciones(supervisor_email, solo_no_leidas)
+    """
+    sin `desde`: historial, las mas nuevas primero. con `desde`: solo las
+    posteriores al cursor, en orden de llegada (sincronizacion incremental).
+    X-Next-Cursor trae el cursor para la proxima consulta
+    """
+    # lo mas reciente queda para la proxima: da tiempo a que aterricen las de otros workers
+    hasta = ObjectId.from_datetime(datetime.now(timezone.utc) - MARGEN_ASENTAMIENTO)
+    if desde is None:
+        notificaciones = await sistema.listar_notificaciones_async(supervisor_email, solo_no_leidas, limit)
+        # el primer cursor tampoco pasa del margen: las del historial mas nuevas que
+        # `hasta` pueden volver en la proxima consulta (mejor repetida que perdida)
+        ultima = max((n["_id"] for n in notificaciones), default=hasta)
+        response.headers["X-Next-Cursor"] = str(min(ultima, hasta))
+        return notificaciones
+
+    cursor = _cursor(desde)
+    notificaciones = await sistema.notificaciones_desde_async(
+        supervisor_email, cursor, limit or LIMITE_DEFAULT, solo_no_leidas, hasta
+    )
+    response.headers["X-Next-Cursor"] = str(notificaciones[-1]["_id"] if notificaciones else cursor)
+    return notificaciones
+
+
+@router.get("/no-leidas")
+async def contar_no_leidas(supervisor_email: str = Query(...), sistema=Depends(get_sistema)):
+    """contador para el badge: una lectura por clave, sin recorrer las notificaciones"""
+    cantidad = await sistema.contar_notificaciones_no_leidas_async(supervisor_email)
+    return {"supervisor_email": supervisor_email, "no_leidas": cantidad}
+
+
+@router.get("/stream")
+async def stream_notificaciones(
+    supervisor_email: str = Query(...),
+    last_event_id: Optional[str] = Header(None),
+    sistema=Depends(get_sistema)
+):
+    """
+    Server-Sent Events: empuja las notificaciones nuevas del supervisor.
+    al reconectar, el navegador manda Last-Event-ID y se reenvia lo que falto
+    """
+    ultimo = _cursor(last_event_id, "Last-Event-ID") if last_event_id else None
+    return StreamingResponse(
+        _flujo(sistema, supervisor_email, ultimo),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/marcar-leida")
-def marcar_leida(dto: NotificacionMarcarLeidaDTO, sistema=Depends(get_sistema)):
-    ok = sistema.marcar_notificacion_leida(dto.supervisor_email, dto.id)
+async def marcar_leida(dto: NotificacionMarcarLeidaDTO, sistema=Depends(get_sistema)):
+    ok = await sistema.marcar_notificacion_leida_async(dto.supervisor_email, dto.id)
     return {"ok": ok}
 
+
+@router.post("/marcar-leidas")
+async def marcar_leidas(dto: NotificacionesMarcarLeidasDTO, sistema=Depends(get_sistema)):
+    """marca varias en un solo update: las de `ids`, o todas hasta `hasta`"""
+    if (dto.ids is None) == (dto.hasta is None):
+        raise HTTPException(status_code=400, detail="Indicar ids o hasta (uno de los dos)")
+    if dto.ids is not None and len(dto.ids) > LOTE_MAXIMO:
+        raise HTTPException(status_code=400, detail=f"Como máximo {LOTE_MAXIMO} ids por llamada")
+    marcadas = await sistema.marcar_notificaciones_leidas_async(dto.supervisor_email, dto.ids, dto.hasta)
+    return {"ok": True, "marcadas": marcadas}
@@ -1,32 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
 from presentation.api.dtos.comentario_create_dto import ComentarioCreateDTO
 from presentation.api.dtos.asignar_tecnico_dto import AsignarTecnicoDTO
 
 from application.sistema import SistemaAyuda
 from presentation.api.dependencias import get_sistema
+from presentation.api.paginacion import LOTE_MAXIMO, Vista, encabezados_pagina, parametro_limit, parametro_view
+from presentation.api.exportacion import acepta_gzip, respuesta_ndjson
+from presentation.api.proyeccion import CAMPOS_SOLICITUD, campos_pedidos, parametro_fields, parametro_limite_historial
 from presentation.api.dtos.solicitud_create_dto import SolicitudCreateDTO
 from presentation.api.dtos.resolver_solicitud_dto import ResolverSolicitudDTO
 from presentation.api.dtos.reabrir_solicitud_dto import ReabrirSolicitudDTO
 
 from domain.usuarios import Solicitante, Operador, Tecnico
-from domain.enums import TipoSolicitud
+from domain.enums import TipoEvento, TipoSolicitud
+from infrastructure.codec_mongo import comentario_nuevo, evento_nuevo
 
 router = APIRouter(prefix="/solicitudes", tags=["Solicitudes"])
 
 
 @router.post("/")
-def crear_solicitud(
+async def crear_solicitud(
     dto: SolicitudCreateDTO,
     sistema: SistemaAyuda = Depends(get_sistema)
 ):
-    solicitante = sistema._buscar_usuario_por_email(dto.solicitante_email)
+    solicitante = await sistema._buscar_usuario_por_email_async(dto.solicitante_email)
     if not solicitante:
         raise HTTPException(status_code=404, detail="Solicitante no encontrado")
 
     if not isinstance(solicitante, Solicitante):
         raise HTTPException(status_code=400, detail="El usuario no es solicitante")
 
-    servicio = next((s for s in sistema.servicios if s.nombre == dto.servicio), None)
+    servicio = sistema.buscar_servicio(dto.servicio)
     if not servicio:
         raise HTTPException(status_code=404, detail="Servicio no encontrado")
 
@@ -35,7 +43,7 @@ def crear_solicitud(
     except KeyError:
         raise HTTPException(status_code=400, detail="Tipo de solicitud inválido")
 
-    solicitud = sistema.crear_solicitud(
+    solicitud = await sistema.crear_solicitud_async(
         solicitante=solicitante,
         descripcion=dto.descripcion,
         tipo_solicitud=tipo,
@@ -49,163 +57,270 @@ def crear_solicitud(
     }
 
 
+@router.post("/bulk")
+async def crear_solicitudes_bulk(
+    dtos: List[SolicitudCreateDTO] = Body(..., max_length=LOTE_MAXIMO),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # todos los solicitantes con una sola consulta
+    usuarios = await sistema._buscar_usuarios_por_email_async(dto.solicitante_email for dto in dtos)
+
+    resultados: List[Dict[str, Any]] = [{} for _ in dtos]
+    pedidos, indices = [], []
+    for indice, dto in enumerate(dtos):
+        solicitante = usuarios.get(dto.solicitante_email)
+        servicio = sistema.buscar_servicio(dto.servicio)
+        tipo = TipoSolicitud.__members__.get(dto.tipo_solicitud.upper())
+        if not solicitante:
+            error = "Solicitante no encontrado"
+        elif not isinstance(solicitante, Solicitante):
+            error = "El usuario no es solicitante"
+        elif not servicio:
+            error = "Servicio no encontrado"
+        elif not tipo:
+            error = "Tipo de solicitud inválido"
+        else:
+            pedidos.append((solicitante, dto.descripcion, tipo, servicio))
+            indices.append(indice)
+            continue
+        resultados[indice] = {"indice": indice, "ok": False, "error": error}
+
+    # ids en bloque + un solo bulk_write desordenado
+    creadas = await sistema.crear_solicitudes_lote_async(pedidos)
+    for indice, (solicitud, error) in zip(indices, creadas):
+        if error:
+            resultados[indice] = {"indice": indice, "ok": False, "error": error}
+        else:
+            resultados[indice] = {
+                "indice": indice,
+                "ok": True,
+                "id": solicitud.id,
+                "estado": solicitud.estado.value,
+                "tipo": solicitud.tipo_solicitud.value,
+            }
+
+    return {"creados": sum(1 for r in resultados if r["ok"]), "resultados": resultados}
+
+
 @router.post("/{solicitud_id}/comentarios")
-def agregar_comentario_solicitud(
+async def agregar_comentario_solicitud(
     solicitud_id: int,
     dto: ComentarioCreateDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    autor = sistema._buscar_usuario_por_email(dto.autor_email)
+    autor = await sistema._buscar_usuario_por_email_async(dto.autor_email)
     if not autor:
         raise HTTPException(status_code=404, detail=f"No existe usuario con email {dto.autor_email}")
 
-    doc_existente = sistema.repositorio_solicitudes.buscar_por_id(solicitud_id)
+    doc_existente = await sistema.repositorio_solicitudes_async.buscar_por_id(solicitud_id)
     if not doc_existente:
         raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
 
-    comentario_doc = {
-        "texto": dto.texto,
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__("datetime").datetime.now().isoformat(),
-    }
+    comentario_doc = comentario_nuevo(dto.texto, autor)
 
-    sistema.repositorio_solicitudes.collection.update_one(
-        {"id": solicitud_id},
-        {"$push": {"comentarios": comentario_doc}}
+    await sistema.repositorio_solicitudes_async.registrar_cambios(
+        solicitud_id,
+        comentarios=[comentario_doc],
     )
+    sistema.olvidar_requerimiento(solicitud_id)
 
     return {"ok": True, "solicitud_id": solicitud_id, "comentario": comentario_doc}
 
 
 @router.post("/{solicitud_id}/asignar-tecnico")
-def asignar_tecnico_solicitud(
+async def asignar_tecnico_solicitud(
     solicitud_id: int,
     dto: AsignarTecnicoDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    doc = sistema.repositorio_solicitudes.buscar_por_id(solicitud_id)
+    doc = await sistema.repositorio_solicitudes_async.buscar_por_id(solicitud_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
 
-    operador = sistema._buscar_usuario_por_email(dto.operador_email)
+    operador = await sistema._buscar_usuario_por_email_async(dto.operador_email)
     if not operador:
         raise HTTPException(status_code=404, detail="Operador no encontrado")
     if not isinstance(operador, Operador):
         raise HTTPException(status_code=400, detail="El usuario no es operador")
 
-    tecnico = sistema._buscar_usuario_por_email(dto.tecnico_email)
+    tecnico = await sistema._buscar_usuario_por_email_async(dto.tecnico_email)
     if not tecnico:
         raise HTTPException(status_code=404, detail="Técnico no encontrado")
     if not isinstance(tecnico, Tecnico):
         raise HTTPException(status_code=400, detail="El usuario no es técnico")
 
-    evento_doc = {
-        "texto": f"Requerimiento #{solicitud_id} asignado a {tecnico.nombre}",
-        "autor_email": operador.email,
-        "autor_nombre": operador.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.ASIGNACION",
-    }
+    evento_doc = evento_nuevo(
+        f"Requerimiento #{solicitud_id} asignado a {tecnico.nombre}",
+        operador, TipoEvento.ASIGNACION,
+    )
 
-    sistema.repositorio_solicitudes.collection.update_one(
-        {"id": solicitud_id},
-        {"$set": {"tecnico_asignado_email": tecnico.email, "estado": "en_proceso"},
-         "$push": {"eventos": evento_doc}}
+    await sistema.repositorio_solicitudes_async.registrar_cambios(
+        solicitud_id,
+        campos={"tecnico_asignado_email": tecnico.email, "estado": "en_proceso"},
+        eventos=[evento_doc],
+    )
+    sistema.olvidar_requerimiento(solicitud_id)
+    await sistema.notificar_supervisores_async(
+        operador,
+        f"Operador {operador.nombre} asignó req #{solicitud_id} a {tecnico.nombre}",
+        solicitud_id,
     )
 
     return {"ok": True, "solicitud_id": solicitud_id, "tecnico_email": tecnico.email}
 
 
 @router.get("/")
-def listar_solicitudes(sistema: SistemaAyuda = Depends(get_sistema)):
-    return sistema.repositorio_solicitudes.listar()
+async def listar_solicitudes(
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[int] = Query(None, description="Último id recibido (cursor)"),
+    view: Vista = parametro_view(),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    docs, total = await asyncio.gather(
+        sistema.repositorio_solicitudes_async.listar_pagina(limit, after, resumen=view == "summary"),
+        sistema.repositorio_solicitudes_async.contar_estimado(),
+    )
+    encabezados_pagina(response, docs, limit, total, "id")
+    return docs
+
+
+@router.get("/export")
+async def exportar_solicitudes(
+    since: Optional[datetime] = Query(None, description="Solo requerimientos creados desde esta fecha"),
+    gzip: bool = Query(False, description="Comprimir aunque el cliente no mande Accept-Encoding: gzip"),
+    accept_encoding: Optional[str] = Header(None),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # NDJSON en streaming: una linea por documento, sin cargar todo en memoria
+    comprimir = gzip or acepta_gzip(accept_encoding)
+    return respuesta_ndjson(sistema.repositorio_solicitudes_async.exportar(since), comprimir=comprimir)
 
 
 @router.get("/{solicitud_id}")
-def ver_solicitud(solicitud_id: int, sistema: SistemaAyuda = Depends(get_sistema)):
-    doc = sistema.repositorio_solicitudes.buscar_por_id(solicitud_id)
+async def ver_solicitud(
+    solicitud_id: int,
+    fields: Optional[str] = parametro_fields(),
+    eventos_limit: Optional[int] = parametro_limite_historial("eventos"),
+    comentarios_limit: Optional[int] = parametro_limite_historial("comentarios"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # proyeccion + $slice en Mongo: solo viaja lo que el cliente muestra
+    doc = await sistema.repositorio_solicitudes_async.buscar_por_id(
+        solicitud_id,
+        campos=campos_pedidos(fields, CAMPOS_SOLICITUD),
+        eventos_limite=eventos_limit,
+        comentarios_limite=comentarios_limit,
+    )
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
     return doc
 
 
+@router.get("/{solicitud_id}/eventos")
+async def listar_eventos_solicitud(
+    solicitud_id: int,
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[str] = Query(None, description="Cursor del último evento recibido"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    # historial completo (log de eventos), del mas nuevo al mas viejo
+    if not await sistema.repositorio_solicitudes_async.existe(solicitud_id):
+        raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
+    try:
+        repositorio = sistema.repositorio_solicitudes_async
+        docs = await repositorio.log_eventos.listar_pagina(solicitud_id, repositorio.nombre_coleccion, limit, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    encabezados_pagina(response, docs, limit, None, "cursor")
+    return docs
+
+
+@router.get("/{solicitud_id}/comentarios")
+async def listar_comentarios_solicitud(
+    solicitud_id: int,
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[int] = Query(None, ge=0, description="Posición del último comentario recibido"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    pagina = await sistema.repositorio_solicitudes_async.listar_comentarios(solicitud_id, limit, after)
+    if pagina is None:
+        raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
+    total, docs = pagina
+    encabezados_pagina(response, docs, limit, total, "posicion")
+    return docs
+
+
 
 @router.post("/{solicitud_id}/resolver")
-def resolver_solicitud(
+async def resolver_solicitud(
     solicitud_id: int,
     dto: ResolverSolicitudDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    doc = sistema.repositorio_solicitudes.buscar_por_id(solicitud_id)
+    doc = await sistema.repositorio_solicitudes_async.buscar_por_id(solicitud_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
 
-    tecnico = sistema._buscar_usuario_por_email(dto.tecnico_email)
+    tecnico = await sistema._buscar_usuario_por_email_async(dto.tecnico_email)
     if not tecnico:
         raise HTTPException(status_code=404, detail="Técnico no encontrado")
 
     if doc.get("tecnico_asignado_email") != dto.tecnico_email:
         raise HTTPException(status_code=400, detail="La solicitud no está asignada a ese técnico")
 
-    evento_doc = {
-        "texto": f"Requerimiento #{solicitud_id} resuelto: {dto.solucion}",
-        "autor_email": tecnico.email,
-        "autor_nombre": tecnico.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.RESOLUCION",
-    }
-    comentario_doc = {
-        "texto": f"Solución: {dto.solucion}",
-        "autor_email": tecnico.email,
-        "autor_nombre": tecnico.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-    }
+    evento_doc = evento_nuevo(f"Requerimiento #{solicitud_id} resuelto: {dto.solucion}", tecnico, TipoEvento.RESOLUCION)
+    comentario_doc = comentario_nuevo(f"Solución: {dto.solucion}", tecnico)
 
-    sistema.repositorio_solicitudes.collection.update_one(
-        {"id": solicitud_id},
-        {"$set": {"estado": "resuelto"},
-         "$push": {"eventos": evento_doc, "comentarios": comentario_doc}}
+    await sistema.repositorio_solicitudes_async.registrar_cambios(
+        solicitud_id,
+        campos={"estado": "resuelto"},
+        eventos=[evento_doc],
+        comentarios=[comentario_doc],
+    )
+    sistema.olvidar_requerimiento(solicitud_id)
+    await sistema.notificar_supervisores_async(
+        tecnico,
+        f"Técnico {tecnico.nombre} resolvió req #{solicitud_id}",
+        solicitud_id,
     )
 
     return {"ok": True, "solicitud_id": solicitud_id}
 
 
 @router.post("/{solicitud_id}/reabrir")
-def reabrir_solicitud(
+async def reabrir_solicitud(
     solicitud_id: int,
     dto: ReabrirSolicitudDTO,
     sistema: SistemaAyuda = Depends(get_sistema),
 ):
-    doc = sistema.repositorio_solicitudes.buscar_por_id(solicitud_id)
+    doc = await sistema.repositorio_solicitudes_async.buscar_por_id(solicitud_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe solicitud con id {solicitud_id}")
 
     if doc.get("estado") != "resuelto":
         raise HTTPException(status_code=400, detail="La solicitud no está resuelta, no se puede reabrir")
 
-    autor = sistema._buscar_usuario_por_email(dto.autor_email)
+    autor = await sistema._buscar_usuario_por_email_async(dto.autor_email)
     if not autor:
         raise HTTPException(status_code=404, detail="Autor no encontrado")
 
-    evento_doc = {
-        "texto": f"Requerimiento #{solicitud_id} reabierto: {dto.motivo}",
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-        "tipo": "TipoEvento.REAPERTURA",
-    }
-    comentario_doc = {
-        "texto": f"Reabierto: {dto.motivo}",
-        "autor_email": autor.email,
-        "autor_nombre": autor.nombre,
-        "fecha": __import__('datetime').datetime.now().isoformat(),
-    }
+    evento_doc = evento_nuevo(f"Requerimiento #{solicitud_id} reabierto: {dto.motivo}", autor, TipoEvento.REAPERTURA)
+    comentario_doc = comentario_nuevo(f"Reabierto: {dto.motivo}", autor)
 
-    sistema.repositorio_solicitudes.collection.update_one(
-        {"id": solicitud_id},
-        {"$set": {"estado": "reabierto"},
-         "$push": {"eventos": evento_doc, "comentarios": comentario_doc}}
+    await sistema.repositorio_solicitudes_async.registrar_cambios(
+        solicitud_id,
+        campos={"estado": "reabierto"},
+        eventos=[evento_doc],
+        comentarios=[comentario_doc],
+    )
+    sistema.olvidar_requerimiento(solicitud_id)
+    await sistema.notificar_supervisores_async(
+        autor,
+        f"{autor.__class__.__name__} {autor.nombre} reabrió req #{solicitud_id}",
+        solicitud_id,
     )
 
     return {"ok": True, "solicitud_id": solicitud_id}
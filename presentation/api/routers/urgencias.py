@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 from typing import List
 
+from domain.urgencias import URGENCIAS
+
 router = APIRouter(prefix="/urgencias", tags=["Urgencias"])
 
 @router.get("/", response_model=List[str])
-def listar_urgencias():
-    return ["critica", "importante", "menor"]
\ No newline at end of file
+async def listar_urgencias():
+    return list(URGENCIAS)
\ No newline at end of file
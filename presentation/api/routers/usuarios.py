@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 
 from application.sistema import SistemaAyuda
 from presentation.api.dependencias import get_sistema
+from presentation.api.paginacion import encabezados_pagina, parametro_limit
 from presentation.api.dtos.solicitante_create_dto import SolicitanteCreateDTO
+from presentation.api.dtos.login_dto import LoginDTO
+from application.verificacion_passwords import PoolSaturadoError
 
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 
 
 @router.post("/solicitantes")
-def crear_solicitante(
+async def crear_solicitante(
     dto: SolicitanteCreateDTO,
     sistema: SistemaAyuda = Depends(get_sistema)
 ):
     try:
-        usuario = sistema.registrar_usuario(
+        usuario = await sistema.registrar_usuario_async(
             "solicitante",
             dto.nombre,
             dto.email,
@@ -31,12 +37,12 @@ def crear_solicitante(
 
 
 @router.post("/supervisores")
-def crear_supervisor(
+async def crear_supervisor(
     dto: SolicitanteCreateDTO,
     sistema: SistemaAyuda = Depends(get_sistema)
 ):
     try:
-        usuario = sistema.registrar_usuario(
+        usuario = await sistema.registrar_usuario_async(
             "supervisor",
             dto.nombre,
             dto.email,
@@ -52,34 +58,69 @@ def crear_supervisor(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/login")
+async def login(
+    dto: LoginDTO,
+    sistema: SistemaAyuda = Depends(get_sistema)
+):
+    try:
+        usuario = await sistema.autenticar_async(dto.email, dto.password)
+    except PoolSaturadoError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    if not usuario:
+        raise HTTPException(status_code=401, detail="Email o contraseña incorrectos")
+
+    return {
+        "id": usuario.id,
+        "nombre": usuario.nombre,
+        "email": usuario.email,
+        "tipo": usuario.__class__.__name__.lower(),
+        "ultimo_acceso": usuario.ultimo_acceso,
+    }
+
+
 class AsignarSupervisorDTO(BaseModel):
     supervisor_email: str
     empleado_email: str
 
 
 @router.post("/supervisores/asignar")
-def asignar_supervisor(
+async def asignar_supervisor(
     dto: AsignarSupervisorDTO,
     sistema: SistemaAyuda = Depends(get_sistema)
 ):
-    sup = sistema._buscar_usuario_por_email(dto.supervisor_email)
-    emp = sistema._buscar_usuario_por_email(dto.empleado_email)
+    sup = await sistema._buscar_usuario_por_email_async(dto.supervisor_email)
+    emp = await sistema._buscar_usuario_por_email_async(dto.empleado_email)
 
     if not sup or not emp:
         raise HTTPException(status_code=404, detail="Supervisor o empleado no existe")
 
-    sistema.asignar_supervisor(sup, emp)
+    try:
+        await sistema.asignar_supervisor_async(sup, emp)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"ok": True}
 
 
 @router.get("/")
-def listar_usuarios(sistema: SistemaAyuda = Depends(get_sistema)):
-    return sistema.repositorio_usuarios.listar()
+async def listar_usuarios(
+    response: Response,
+    limit: int = parametro_limit(),
+    after: Optional[str] = Query(None, description="Último email recibido (cursor)"),
+    sistema: SistemaAyuda = Depends(get_sistema),
+):
+    docs, total = await asyncio.gather(
+        sistema.repositorio_usuarios_async.listar_pagina(limit, after),
+        sistema.repositorio_usuarios_async.contar_estimado(),
+    )
+    encabezados_pagina(response, docs, limit, total, "email")
+    return docs
 
 
 @router.get("/{email}")
-def ver_usuario_por_email(email: str, sistema: SistemaAyuda = Depends(get_sistema)):
-    doc = sistema.repositorio_usuarios.buscar_por_email(email)
+async def ver_usuario_por_email(email: str, sistema: SistemaAyuda = Depends(get_sistema)):
+    doc = await sistema.repositorio_usuarios_async.buscar_por_email(email)
     if not doc:
         raise HTTPException(status_code=404, detail=f"No existe usuario con email {email}")
     return doc
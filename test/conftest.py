@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import pytest
+from pymongo import UpdateOne
+
+
+class _ColeccionMock:
+    """
+    coleccion de mongomock; bulk_write de UpdateOne se aplica de a una
+    (mongomock no acepta el `sort` que le pasa pymongo 4.9+)
+    """
+
+    def __init__(self, coleccion) -> None:
+        self._col = coleccion
+
+    def __getattr__(self, nombre):
+        return getattr(self._col, nombre)
+
+    def bulk_write(self, operaciones, ordered=True):
+        if not all(isinstance(op, UpdateOne) for op in operaciones):
+            return self._col.bulk_write(operaciones, ordered=ordered)
+        modificados = insertados = 0
+        for op in operaciones:
+            res = self._col.update_one(op._filter, op._doc, upsert=op._upsert)
+            modificados += res.modified_count
+            insertados += res.upserted_id is not None
+        return SimpleNamespace(modified_count=modificados, upserted_count=insertados)
+
+
+class _BaseMock:
+    def __init__(self, db) -> None:
+        self._db = db
+
+    def __getitem__(self, nombre: str) -> _ColeccionMock:
+        return _ColeccionMock(self._db[nombre])
+
+
+class _CursorAsync:
+    """cursor de mongomock con la interfaz del de PyMongo Async"""
+
+    def __init__(self, cursor) -> None:
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, cantidad):
+        self._cursor = self._cursor.limit(cantidad)
+        return self
+
+    def batch_size(self, cantidad):
+        return self
+
+    async def to_list(self, largo=None):
+        return list(self._cursor)
+
+    def __aiter__(self):
+        self._iterador = iter(self._cursor)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterador)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        pass
+
+
+class _ColeccionAsync:
+    """las operaciones de la coleccion sincronica como corrutinas"""
+
+    def __init__(self, coleccion: _ColeccionMock) -> None:
+        self._col = coleccion
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self._col, nombre)
+
+        async def operacion(*args, **kwargs):
+            return metodo(*args, **kwargs)
+
+        return operacion
+
+    def find(self, *args, **kwargs):
+        return _CursorAsync(self._col.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline, **kwargs):
+        return _CursorAsync(self._col.aggregate(pipeline, **kwargs))
+
+
+class _BaseAsync:
+    def __init__(self, db: _BaseMock) -> None:
+        self._db = db
+
+    def __getitem__(self, nombre: str) -> _ColeccionAsync:
+        return _ColeccionAsync(self._db[nombre])
+
+
+def _union_with(documentos, database, opciones):
+    """$unionWith (mongomock no lo trae): agrega lo que devuelve el pipeline de la otra coleccion"""
+    return list(documentos) + list(database[opciones["coll"]].aggregate(opciones.get("pipeline", [])))
+
+
+@pytest.fixture
+def db():
+    """base en memoria (mongomock) para probar repositorios y scripts"""
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.aggregate import _PIPELINE_HANDLERS
+    _PIPELINE_HANDLERS.setdefault("$unionWith", _union_with)
+    return _BaseMock(mongomock.MongoClient().db)
+
+
+@pytest.fixture
+def db_async(db):
+    """la misma base, con la interfaz async que usan los repositorios de la API"""
+    return _BaseAsync(db)
+
+
+@pytest.fixture
+def sistema(db, db_async):
+    from application.sistema import SistemaAyuda
+
+    sistema = SistemaAyuda(db=db, db_async=db_async)
+    yield sistema
+    sistema.pool_verificacion.cerrar()
+
+
+@pytest.fixture
+def api(sistema):
+    """cliente HTTP de la app, con el sistema sobre la base en memoria (sin lifespan: no conecta a Mongo)"""
+    from fastapi.testclient import TestClient
+
+    from presentation.api.app import app
+    from presentation.api.dependencias import get_sistema
+
+    app.dependency_overrides[get_sistema] = lambda: sistema
+    yield TestClient(app)
+    app.dependency_overrides.clear()
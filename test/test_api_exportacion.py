@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from presentation.api.exportacion import _lineas_ndjson, acepta_gzip
+
+SIN_GZIP = {"Accept-Encoding": "identity"}
+
+
+def _incidentes(db, *fechas):
+    db["incidentes"].insert_many([
+        {"id": i, "descripcion": f"inc {i}", "fecha_creacion": fecha, "comentarios": []}
+        for i, fecha in enumerate(fechas, start=1)
+    ])
+
+
+def _lineas(respuesta):
+    return [json.loads(linea) for linea in respuesta.text.splitlines()]
+
+
+def test_export_ndjson_por_id(api, db):
+    _incidentes(db, datetime(2024, 5, 2, 9, 30), datetime(2024, 5, 1, 8, 0))
+
+    respuesta = api.get("/incidentes/export", headers=SIN_GZIP)
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in respuesta.headers
+    assert _lineas(respuesta) == [
+        {"id": 1, "descripcion": "inc 1", "fecha_creacion": "2024-05-02T09:30:00", "comentarios": []},
+        {"id": 2, "descripcion": "inc 2", "fecha_creacion": "2024-05-01T08:00:00", "comentarios": []},
+    ]
+
+
+def test_export_vacio(api):
+    respuesta = api.get("/solicitudes/export", headers=SIN_GZIP)
+    assert respuesta.status_code == 200 and respuesta.content == b""
+
+
+def test_export_gzip_por_accept_encoding_o_forzado(api, db):
+    _incidentes(db, datetime(2024, 5, 1))
+
+    negociado = api.get("/incidentes/export", headers={"Accept-Encoding": "br, gzip;q=0.8"})
+    forzado = api.get("/incidentes/export", params={"gzip": True}, headers=SIN_GZIP)
+    rechazado = api.get("/incidentes/export", headers={"Accept-Encoding": "gzip;q=0"})
+
+    for respuesta in (negociado, forzado):
+        assert respuesta.headers["content-encoding"] == "gzip"
+        assert [d["id"] for d in _lineas(respuesta)] == [1]  # el cliente lo descomprime
+    assert "content-encoding" not in rechazado.headers
+    assert negociado.headers["vary"] == "Accept-Encoding"
+
+
+def test_acepta_gzip():
+    assert acepta_gzip("gzip")
+    assert acepta_gzip("deflate, GZIP;q=0.5")
+    assert not acepta_gzip(None)
+    assert not acepta_gzip("identity")
+    assert not acepta_gzip("gzip;q=0")
+    assert not acepta_gzip("gzip;q=0.0")
+
+
+def test_export_since_naive_y_con_zona(api, db):
+    corte = datetime(2024, 5, 1, 12, 0)  # hora local, como fecha_creacion
+    _incidentes(db, corte - timedelta(minutes=1), corte, corte + timedelta(hours=1))
+
+    naive = api.get("/incidentes/export", params={"since": corte.isoformat()}, headers=SIN_GZIP)
+    # el mismo instante expresado en otra zona
+    con_zona = corte.astimezone().astimezone(timezone(timedelta(hours=-3)))
+    zona = api.get("/incidentes/export", params={"since": con_zona.isoformat()}, headers=SIN_GZIP)
+
+    assert [d["id"] for d in _lineas(naive)] == [2, 3]
+    assert [d["id"] for d in _lineas(zona)] == [2, 3]
+
+
+def test_export_since_invalido(api):
+    assert api.get("/incidentes/export", params={"since": "ayer"}).status_code == 422
+
+
+class _Cursor:
+    def __init__(self, documentos):
+        self.documentos = iter(documentos)
+        self.cerrado = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.documentos)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.cerrado = True
+
+
+def _chunks(cursor, comprimir=False):
+    async def juntar():
+        return [chunk async for chunk in _lineas_ndjson(cursor, comprimir)]
+
+    return asyncio.run(juntar())
+
+
+def test_lineas_ndjson_primero_sale_solo_y_el_resto_se_agrupa():
+    cursor = _Cursor([{"id": i} for i in range(5)])
+
+    chunks = _chunks(cursor)
+
+    assert chunks == [b'{"id": 0}\n', b'{"id": 1}\n{"id": 2}\n{"id": 3}\n{"id": 4}\n']
+    assert cursor.cerrado
+
+
+def test_lineas_ndjson_gzip_es_un_solo_stream_valido():
+    chunks = _chunks(_Cursor([{"id": i, "texto": "ñ"} for i in range(3)]), comprimir=True)
+
+    lineas = gzip.decompress(b"".join(chunks)).decode("utf-8").splitlines()
+    assert [json.loads(linea) for linea in lineas] == [{"id": i, "texto": "ñ"} for i in range(3)]
+    # el primer chunk se puede descomprimir sin esperar al resto (Z_SYNC_FLUSH)
+    assert zlib.decompressobj(wbits=31).decompress(chunks[0]) == b'{"id": 0, "texto": "\xc3\xb1"}\n'
@@ -0,0 +1,179 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from presentation.api.routers import notificaciones
+from presentation.api.routers.notificaciones import _flujo
+
+ANA = "ana@comunicarlos.com.ar"
+
+
+def _notificacion(db, hace_segundos, id, email=ANA):
+    """hace_segundos=None: con un _id nuevo, como la inserta un worker ahora"""
+    momento = datetime.now(timezone.utc) - timedelta(seconds=hace_segundos or 0)
+    documento = {
+        "_id": ObjectId() if hace_segundos is None else ObjectId.from_datetime(momento), "id": id, "supervisor_email": email, "texto": id,
+        "autor_email": "op@comunicarlos.com.ar", "autor_nombre": "Op", "fecha": momento.astimezone().replace(tzinfo=None),
+        "tipo_evento": "evento", "requerimiento_id": 1, "leida": False,
+    }
+    db["NOTIFICACIONES"].insert_one(documento)
+    return documento["_id"]
+
+
+def _ids(respuesta):
+    return [n["id"] for n in respuesta.json()]
+
+
+def test_primer_cursor_no_pasa_del_margen_de_asentamiento(api, db, monkeypatch):
+    monkeypatch.setattr(notificaciones, "MARGEN_ASENTAMIENTO", timedelta(seconds=60))
+    vieja = _notificacion(db, 300, "vieja")
+    reciente = _notificacion(db, 10, "reciente")
+
+    respuesta = api.get("/notificaciones/", params={"supervisor_email": ANA})
+
+    assert _ids(respuesta) == ["reciente", "vieja"]
+    cursor = ObjectId(respuesta.headers["X-Next-Cursor"])
+    assert vieja < cursor < reciente
+
+    # otro worker inserta despues una con _id anterior a la mas nueva ya vista
+    _notificacion(db, 30, "tardia")
+    monkeypatch.setattr(notificaciones, "MARGEN_ASENTAMIENTO", timedelta(0))  # ya se asentaron
+    siguiente = api.get("/notificaciones/", params={"supervisor_email": ANA, "desde": str(cursor)})
+
+    # la tardia no se pierde; la reciente se repite (mejor repetida que perdida)
+    assert _ids(siguiente) == ["tardia", "reciente"]
+    assert siguiente.headers["X-Next-Cursor"] == str(reciente)
+
+
+def test_primer_cursor_sin_notificaciones(api, monkeypatch):
+    monkeypatch.setattr(notificaciones, "MARGEN_ASENTAMIENTO", timedelta(seconds=60))
+
+    respuesta = api.get("/notificaciones/", params={"supervisor_email": ANA})
+
+    assert respuesta.json() == []
+    corte = ObjectId(respuesta.headers["X-Next-Cursor"]).generation_time
+    assert timedelta(seconds=58) < datetime.now(timezone.utc) - corte < timedelta(seconds=62)
+
+
+def test_incremental_corta_en_el_margen_y_avanza_el_cursor(api, db, monkeypatch):
+    monkeypatch.setattr(notificaciones, "MARGEN_ASENTAMIENTO", timedelta(seconds=60))
+    desde = _notificacion(db, 600, "ya vista")
+    asentada = _notificacion(db, 120, "asentada")
+    _notificacion(db, 10, "en el margen")
+    _notificacion(db, 100, "de otra", email="bea@comunicarlos.com.ar")
+
+    respuesta = api.get("/notificaciones/", params={"supervisor_email": ANA, "desde": str(desde)})
+
+    assert _ids(respuesta) == ["asentada"]
+    assert respuesta.headers["X-Next-Cursor"] == str(asentada)
+
+    # sin novedades asentadas el cursor no se mueve
+    otra = api.get("/notificaciones/", params={"supervisor_email": ANA, "desde": str(asentada)})
+    assert otra.json() == [] and otra.headers["X-Next-Cursor"] == str(asentada)
+
+
+def test_cursor_invalido(api):
+    respuesta = api.get("/notificaciones/", params={"supervisor_email": ANA, "desde": "no-es-un-cursor"})
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == "desde inválido"
+
+    stream = api.get("/notificaciones/stream", params={"supervisor_email": ANA}, headers={"Last-Event-ID": "x"})
+    assert stream.status_code == 400
+    assert stream.json()["detail"] == "Last-Event-ID inválido"
+
+
+def _ids_sse(eventos):
+    return [json.loads(e.split("data: ", 1)[1])["id"] for e in eventos]
+
+
+async def _siguientes(flujo, cantidad):
+    return [await asyncio.wait_for(flujo.__anext__(), 1) for _ in range(cantidad)]
+
+
+def test_stream_reanuda_desde_last_event_id(sistema, db):
+    _notificacion(db, 300, "anterior")
+    ultimo = _notificacion(db, 200, "ya enviada")
+    _notificacion(db, 100, "perdida 1")
+    _notificacion(db, 50, "perdida 2")
+
+    async def escenario():
+        flujo = _flujo(sistema, ANA, ultimo)
+        try:
+            assert await flujo.__anext__() == f"retry: {notificaciones.REINTENTO_MS}\n\n"
+            return await _siguientes(flujo, 2)
+        finally:
+            await flujo.aclose()
+
+    eventos = asyncio.run(escenario())
+    assert _ids_sse(eventos) == ["perdida 1", "perdida 2"]
+    assert eventos[0].startswith(f"id: {db['NOTIFICACIONES'].find_one({'id': 'perdida 1'})['_id']}\n")
+
+
+def test_stream_con_cola_desbordada_se_pone_al_dia_desde_mongo(sistema, db):
+    sistema.bus_notificaciones.max_pendientes = 1
+
+    async def escenario():
+        flujo = _flujo(sistema, ANA, None)
+        try:
+            await flujo.__anext__()  # retry (ya suscripto)
+            publicadas = []
+            for id in ("a", "b", "c"):
+                _notificacion(db, None, id)
+                publicadas.append(db["NOTIFICACIONES"].find_one({"id": id}))
+            sistema.bus_notificaciones.publicar(publicadas)  # entra "a"; "b" y "c" desbordan
+            await asyncio.sleep(0)
+            return await _siguientes(flujo, 3)
+        finally:
+            await flujo.aclose()
+
+    assert _ids_sse(asyncio.run(escenario())) == ["a", "b", "c"]
+
+
+def test_stream_keepalive_y_relectura_de_otros_workers(sistema, db, monkeypatch):
+    monkeypatch.setattr(notificaciones, "KEEPALIVE_SEGUNDOS", 0.01)
+
+    async def escenario():
+        flujo = _flujo(sistema, ANA, None)
+        try:
+            await flujo.__anext__()
+            sin_novedades = await flujo.__anext__()
+            # la entrego el despachador de otro worker: no pasa por este bus
+            _notificacion(db, None, "de otro worker")
+            return sin_novedades, await flujo.__anext__()
+        finally:
+            await flujo.aclose()
+
+    keepalive, evento = asyncio.run(escenario())
+    assert keepalive == ": keepalive\n\n"
+    assert _ids_sse([evento]) == ["de otro worker"]
+
+
+def test_stream_no_repite_lo_que_llega_por_bus_y_por_mongo(sistema, db, monkeypatch):
+    monkeypatch.setattr(notificaciones, "KEEPALIVE_SEGUNDOS", 0.01)
+
+    async def escenario():
+        flujo = _flujo(sistema, ANA, None)
+        try:
+            await flujo.__anext__()
+            _notificacion(db, None, "una")
+            sistema.bus_notificaciones.publicar([db["NOTIFICACIONES"].find_one({"id": "una"})])
+            return await _siguientes(flujo, 2)
+        finally:
+            await flujo.aclose()
+
+    evento, siguiente = asyncio.run(escenario())
+    assert _ids_sse([evento]) == ["una"]
+    assert siguiente == ": keepalive\n\n"  # la relectura la encuentra, pero ya se envio
+
+
+def test_stream_se_desuscribe_al_desconectar(sistema):
+    async def escenario():
+        flujo = _flujo(sistema, ANA, None)
+        await flujo.__anext__()
+        assert sistema.bus_notificaciones.estadisticas()["conexiones"] == 1
+        await flujo.aclose()  # el cliente corto
+        return sistema.bus_notificaciones.estadisticas()["conexiones"]
+
+    assert asyncio.run(escenario()) == 0
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+OPERADOR = "op@comunicarlos.com.ar"
+SOLICITANTE = "ana@coop.com"
+
+
+def _usuarios(db):
+    db["usuarios"].insert_many([
+        {"id": 1, "nombre": "Op", "email": OPERADOR, "tipo_usuario": "operador", "password_hash": "x"},
+        {"id": 2, "nombre": "Ana", "email": SOLICITANTE, "tipo_usuario": "solicitante", "password_hash": "x"},
+    ])
+
+
+def _tickets(db, coleccion, ids, solicitante=SOLICITANTE):
+    db[coleccion].insert_many([
+        {"id": i, "descripcion": f"{coleccion} {i}", "solicitante_email": solicitante,
+         "fecha_creacion": datetime(2024, 5, 1), "comentarios": []}
+        for i in ids
+    ])
+
+
+def _ids(respuesta):
+    return [d["id"] for d in respuesta.json()]
+
+
+def test_listado_encabezados_y_ultima_pagina_corta(api, db):
+    _tickets(db, "incidentes", [1, 2, 3, 4, 5])
+
+    primera = api.get("/incidentes/", params={"limit": 2})
+    segunda = api.get("/incidentes/", params={"limit": 2, "after": primera.headers["x-next-cursor"]})
+    ultima = api.get("/incidentes/", params={"limit": 2, "after": segunda.headers["x-next-cursor"]})
+
+    assert _ids(primera) == [1, 2] and primera.headers["x-next-cursor"] == "2"
+    assert primera.headers["x-total-count"] == "5"
+    assert _ids(segunda) == [3, 4]
+    # pagina mas corta que el limite: no hay mas, no se manda cursor
+    assert _ids(ultima) == [5] and "x-next-cursor" not in ultima.headers
+    assert ultima.headers["x-total-count"] == "5"
+
+
+def test_listado_vacio_sin_cursor(api):
+    respuesta = api.get("/solicitudes/", params={"limit": 10})
+    assert respuesta.json() == []
+    assert respuesta.headers["x-total-count"] == "0"
+    assert "x-next-cursor" not in respuesta.headers
+
+
+def test_union_intercala_colecciones_en_el_borde_del_cursor(api, db):
+    _usuarios(db)
+    _tickets(db, "incidentes", [1, 4, 5])
+    _tickets(db, "solicitudes", [2, 3, 6])
+
+    paginas, after = [], None
+    while True:
+        params = {"email": OPERADOR, "limit": 2}
+        if after is not None:
+            params["after"] = after
+        respuesta = api.get("/requerimientos/", params=params)
+        paginas.append(_ids(respuesta))
+        after = respuesta.headers.get("x-next-cursor")
+        if after is None:
+            break
+
+    # la ultima pagina llena manda cursor y la siguiente viene vacia
+    assert paginas == [[1, 2], [3, 4], [5, 6], []]
+
+
+def test_union_ultima_pagina_corta(api, db):
+    _usuarios(db)
+    _tickets(db, "incidentes", [1, 3])
+    _tickets(db, "solicitudes", [2])
+
+    respuesta = api.get("/requerimientos/", params={"email": OPERADOR, "limit": 2, "after": 2})
+
+    assert _ids(respuesta) == [3]
+    assert "x-next-cursor" not in respuesta.headers
+    assert "x-total-count" not in respuesta.headers
+
+
+def test_union_no_pierde_el_id_repetido_en_el_borde(api, db):
+    # datos previos a la secuencia compartida: el mismo id en las dos colecciones
+    _usuarios(db)
+    _tickets(db, "incidentes", [1, 2, 4])
+    _tickets(db, "solicitudes", [2, 3])
+
+    primera = api.get("/requerimientos/", params={"email": OPERADOR, "limit": 2})
+    segunda = api.get("/requerimientos/", params={"email": OPERADOR, "limit": 2,
+                                                  "after": primera.headers["x-next-cursor"]})
+
+    vistos = [(d["id"], d["descripcion"].split()[0]) for d in primera.json() + segunda.json()]
+    assert sorted(vistos) == [(1, "incidentes"), (2, "incidentes"), (2, "solicitudes"),
+                              (3, "solicitudes"), (4, "incidentes")]
+
+
+def test_union_filtra_por_rol(api, db):
+    _usuarios(db)
+    _tickets(db, "incidentes", [1, 3], solicitante=SOLICITANTE)
+    _tickets(db, "solicitudes", [2], solicitante="otro@coop.com")
+
+    respuesta = api.get("/requerimientos/", params={"email": SOLICITANTE, "limit": 5})
+
+    assert _ids(respuesta) == [1, 3]
+
+
+def test_union_usuario_inexistente(api):
+    respuesta = api.get("/requerimientos/", params={"email": "nadie@coop.com"})
+    assert respuesta.status_code == 404
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+
+def _incidente(db):
+    db["incidentes"].insert_one({
+        "id": 1, "descripcion": "sin señal", "urgencia": "alta", "estado": "abierto",
+        "fecha_creacion": datetime(2024, 5, 1),
+        "comentarios": [{"texto": f"c{i}", "autor_email": "ana@coop.com"} for i in range(3)],
+        "comentarios_total": 3,
+    })
+
+
+def test_fields_devuelve_solo_lo_pedido(api, db):
+    _incidente(db)
+
+    respuesta = api.get("/incidentes/1", params={"fields": "estado, urgencia", "comentarios_limit": 1})
+
+    assert respuesta.status_code == 200
+    assert respuesta.json() == {"id": 1, "estado": "abierto", "urgencia": "alta"}
+
+
+def test_fields_con_historial_recortado(api, db):
+    _incidente(db)
+
+    respuesta = api.get("/incidentes/1", params={"fields": "comentarios", "comentarios_limit": 2})
+
+    assert [c["texto"] for c in respuesta.json()["comentarios"]] == ["c1", "c2"]
+
+
+def test_fields_rechaza_rutas_anidadas_y_desconocidos(api, db):
+    _incidente(db)
+
+    for fields in ("comentarios,comentarios.texto", "_id", "$where", "password_hash", "tipo_solicitud"):
+        respuesta = api.get("/incidentes/1", params={"fields": fields})
+        assert respuesta.status_code == 422, fields
+
+
+def test_fields_por_tipo_de_requerimiento(api, db):
+    db["solicitudes"].insert_one({"id": 2, "tipo_solicitud": "alta", "estado": "abierto", "comentarios": []})
+
+    assert api.get("/solicitudes/2", params={"fields": "tipo_solicitud"}).json() == {"id": 2, "tipo_solicitud": "alta"}
+    assert api.get("/solicitudes/2", params={"fields": "urgencia"}).status_code == 422
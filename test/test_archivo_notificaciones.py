@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from infrastructure.archivar_notificaciones import COLECCION_ARCHIVO, _corte, archivar_notificaciones
+from infrastructure.repositorio_notificaciones_mongo import COLECCION_CONTADORES, _filtro_marcar
+
+ANA = "ana@comunicarlos.com.ar"
+BEA = "bea@comunicarlos.com.ar"
+
+
+def test_filtro_marcar_por_ids_o_hasta():
+    assert _filtro_marcar(ANA, ["a", "b"], None) == {"supervisor_email": ANA, "leida": False, "id": {"$in": ["a", "b"]}}
+
+    hasta = datetime(2024, 5, 1, 12, 0)
+    assert _filtro_marcar(ANA, None, hasta) == {"supervisor_email": ANA, "leida": False, "fecha": {"$lte": hasta}}
+
+
+def test_filtro_marcar_hasta_con_zona_se_compara_en_hora_local():
+    # `fecha` se guarda naive en hora local
+    local = datetime(2024, 5, 1, 12, 0)
+    con_zona = local.astimezone().astimezone(timezone(timedelta(hours=5)))
+
+    filtro = _filtro_marcar(ANA, None, con_zona)
+
+    assert filtro["fecha"]["$lte"] == local
+    assert filtro["fecha"]["$lte"].tzinfo is None
+
+
+def test_corte_naive_es_hora_local_igual_que_fecha():
+    local = datetime(2024, 5, 1, 12, 0)
+    assert _corte(local) == _corte(local.astimezone())
+    assert _corte(local) == _corte(local.astimezone(timezone.utc))
+
+
+def _notificacion(hace_dias, email=ANA, leida=False):
+    momento = datetime.now(timezone.utc) - timedelta(days=hace_dias)
+    return {"_id": ObjectId.from_datetime(momento), "id": f"{email}-{hace_dias}", "supervisor_email": email,
+            "leida": leida}
+
+
+def test_archivar_mueve_solo_las_viejas_y_descuenta_las_no_leidas(db):
+    db["NOTIFICACIONES"].insert_many([
+        _notificacion(200), _notificacion(190, leida=True), _notificacion(185, BEA),
+        _notificacion(10), _notificacion(5, BEA),
+    ])
+    db[COLECCION_CONTADORES].insert_many([{"_id": ANA, "no_leidas": 2}, {"_id": BEA, "no_leidas": 2}])
+
+    movidas = archivar_notificaciones(db, datetime.now() - timedelta(days=180), tamano_lote=2)
+
+    assert movidas == 3
+    assert db[COLECCION_ARCHIVO].count_documents({}) == 3
+    assert sorted(d["id"] for d in db["NOTIFICACIONES"].find()) == [f"{ANA}-10", f"{BEA}-5"]
+    contadores = {c["_id"]: c["no_leidas"] for c in db[COLECCION_CONTADORES].find()}
+    assert contadores == {ANA: 1, BEA: 1}
+
+
+def test_archivar_rehace_un_lote_cortado_sin_duplicar(db):
+    vieja = _notificacion(200)
+    db["NOTIFICACIONES"].insert_one(vieja)
+    db[COLECCION_ARCHIVO].insert_one(dict(vieja))  # corrida anterior cortada despues del insert
+    db[COLECCION_CONTADORES].insert_one({"_id": ANA, "no_leidas": 1})
+
+    assert archivar_notificaciones(db, datetime.now() - timedelta(days=180)) == 1
+    assert db[COLECCION_ARCHIVO].count_documents({}) == 1
+    assert db["NOTIFICACIONES"].count_documents({}) == 0
+    assert db[COLECCION_CONTADORES].find_one({"_id": ANA})["no_leidas"] == 0
@@ -0,0 +1,35 @@
+import asyncio
+
+from application.bus_notificaciones import BusNotificaciones
+
+
+def _notificacion(email, texto):
+    return {"supervisor_email": email, "texto": texto}
+
+
+def test_publicar_llega_solo_al_supervisor_suscripto():
+    async def escenario():
+        bus = BusNotificaciones()
+        ana = bus.suscribir("ana@comunicarlos.com.ar")
+        bea = bus.suscribir("bea@comunicarlos.com.ar")
+        bus.publicar([_notificacion("ana@comunicarlos.com.ar", "hola")])
+        await asyncio.sleep(0)
+        assert (await ana.cola.get())["texto"] == "hola"
+        assert bea.cola.empty()
+        bus.desuscribir(ana)
+        bus.desuscribir(bea)
+        assert bus.estadisticas()["conexiones"] == 0
+
+    asyncio.run(escenario())
+
+
+def test_cola_llena_marca_desborde():
+    async def escenario():
+        bus = BusNotificaciones(max_pendientes=1)
+        ana = bus.suscribir("ana@comunicarlos.com.ar")
+        bus.publicar([_notificacion("ana@comunicarlos.com.ar", t) for t in ("a", "b")])
+        await asyncio.sleep(0)
+        assert ana.cola.qsize() == 1
+        assert ana.desbordada
+
+    asyncio.run(escenario())
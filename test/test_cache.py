@@ -0,0 +1,48 @@
+from application.cache import CacheLRU
+
+
+class RelojFalso:
+    def __init__(self) -> None:
+        self.ahora = 0.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+def test_desaloja_el_menos_usado():
+    cache = CacheLRU(max_items=2, ttl_segundos=None)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.obtener("a")
+    cache.guardar("c", 3)
+
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") == 1
+    assert cache.obtener("c") == 3
+    assert cache.estadisticas()["desalojos"] == 1
+
+
+def test_vence_por_ttl():
+    reloj = RelojFalso()
+    cache = CacheLRU(max_items=10, ttl_segundos=60, reloj=reloj)
+    cache.guardar("a", 1)
+
+    reloj.ahora = 30
+    assert cache.obtener("a") == 1
+
+    reloj.ahora = 61
+    assert cache.obtener("a") is None
+    assert "a" not in cache
+
+
+def test_invalidar_y_contadores():
+    cache = CacheLRU(max_items=10)
+    cache.guardar("a", 1)
+    cache.obtener("a")
+    cache.invalidar("a")
+    cache.obtener("a")
+
+    stats = cache.estadisticas()
+    assert stats["aciertos"] == 1
+    assert stats["fallos"] == 1
+    assert len(cache) == 0
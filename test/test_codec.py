@@ -0,0 +1,102 @@
+from domain.usuarios import Solicitante, Supervisor, Tecnico
+from domain.requerimientos import Incidente, Solicitud
+from domain.urgencias import UrgenciaCritica
+from domain.enums import EstadoRequerimiento, TipoEvento, TipoSolicitud
+from domain.eventos import EventoFactory
+from domain.registros import Notificacion
+from domain.servicios import Servicio
+from infrastructure.codec_mongo import (
+    codificar_notificacion,
+    codificar_requerimiento,
+    codificar_usuario,
+    decodificar_evento,
+    decodificar_notificacion,
+    decodificar_requerimiento,
+    decodificar_usuario,
+    evento_nuevo,
+)
+
+_HASH = "$2b$12$" + "x" * 53
+
+
+def _usuarios():
+    sol = Solicitante("Joa", "joa@test.com", None, 1, _HASH)
+    tec = Tecnico("Tec 1", "tec1@comunicarlos.com.ar", None, 2, _HASH)
+    return sol, tec, {sol.email: sol, tec.email: tec}
+
+
+def test_incidente_ida_y_vuelta():
+    sol, tec, usuarios = _usuarios()
+    serv = Servicio("Internet Banda Ancha", "desc")
+    inc = Incidente("Se cortó internet", sol, UrgenciaCritica(), serv, 7)
+    inc.agregar_evento(EventoFactory.crear_evento_creacion(inc, sol))
+    inc.asignar_tecnico(tec)
+    inc.agregar_comentario("Reviso el router", tec)
+
+    doc = codificar_requerimiento(inc, cola_eventos=20)
+    copia = decodificar_requerimiento(doc, usuarios, {serv.nombre: serv})
+
+    assert doc["urgencia"] == UrgenciaCritica().get_nombre()
+    assert isinstance(copia, Incidente)
+    assert (copia.id, copia.descripcion, copia.estado) == (7, inc.descripcion, EstadoRequerimiento.EN_PROCESO)
+    assert copia.urgencia is inc.urgencia
+    assert copia.tecnico_asignado is tec
+    assert [(e.tipo, e.fecha) for e in copia.eventos] == [(e.tipo, e.fecha) for e in inc.eventos]
+    assert [c.texto for c in copia.comentarios] == ["Reviso el router"]
+    assert copia.calcular_prioridad() == inc.calcular_prioridad()
+    assert copia.cambios_pendientes() == (set(), [], [])
+
+
+def test_solicitud_ida_y_vuelta_y_cola_de_eventos():
+    sol, tec, usuarios = _usuarios()
+    serv = Servicio("Internet Banda Ancha", "desc")
+    req = Solicitud("Alta servicio", sol, TipoSolicitud.ALTA_SERVICIO, serv, 3)
+    for _ in range(5):
+        req.agregar_evento(EventoFactory.crear_evento_creacion(req, sol))
+
+    doc = codificar_requerimiento(req, cola_eventos=2)
+    copia = decodificar_requerimiento(doc, usuarios, {serv.nombre: serv})
+
+    assert doc["eventos_total"] == 5 and len(doc["eventos"]) == 2
+    assert isinstance(copia, Solicitud)
+    assert copia.tipo_solicitud == TipoSolicitud.ALTA_SERVICIO
+    assert copia.servicio is serv
+    # sin el solicitante no se puede hidratar
+    assert decodificar_requerimiento(doc, {tec.email: tec}, {serv.nombre: serv}) is None
+
+
+def test_evento_acepta_tipo_guardado_y_formas_viejas():
+    sol, _, usuarios = _usuarios()
+    doc = evento_nuevo("Asignado", sol, TipoEvento.ASIGNACION)
+
+    assert doc["tipo"] == "TipoEvento.ASIGNACION"
+    for tipo in ("TipoEvento.ASIGNACION", "ASIGNACION", "asignacion"):
+        assert decodificar_evento({**doc, "tipo": tipo}, usuarios).tipo == TipoEvento.ASIGNACION
+    assert decodificar_evento({**doc, "autor_email": "otro@test.com"}, usuarios) is None
+
+
+def test_notificacion_y_usuario_ida_y_vuelta():
+    sol, _, usuarios = _usuarios()
+    notif = Notificacion("Nuevo ticket", sol)
+    doc = codificar_notificacion(notif, "n-1", "sup@comunicarlos.com.ar", "evento", 7)
+    copia = decodificar_notificacion(doc, usuarios)
+
+    assert (doc["id"], doc["requerimiento_id"], doc["leida"]) == ("n-1", 7, False)
+    assert (copia.texto, copia.autor, copia.fecha) == (notif.texto, sol, notif.fecha)
+
+    sup = Supervisor("Sup", "sup@comunicarlos.com.ar", None, 9, _HASH)
+    doc_usuario = codificar_usuario(sup)
+    assert doc_usuario["tipo_usuario"] == "supervisor" and "password" not in doc_usuario
+    copia_sup = decodificar_usuario(doc_usuario)
+    assert isinstance(copia_sup, Supervisor)
+    assert (copia_sup.id, copia_sup.email, copia_sup.password_hash) == (9, sup.email, _HASH)
+
+
+def test_documento_sin_estado_se_hidrata():
+    sol, tec, usuarios = _usuarios()
+    doc = {"id": 4, "descripcion": "Sin señal", "urgencia": UrgenciaCritica().get_nombre(),
+           "servicio": None, "solicitante_email": sol.email, "comentarios": [], "eventos": []}
+
+    assert decodificar_requerimiento(doc, usuarios, {}).estado == EstadoRequerimiento.ABIERTO
+    doc["tecnico_asignado_email"] = tec.email
+    assert decodificar_requerimiento(doc, usuarios, {}).estado == EstadoRequerimiento.EN_PROCESO
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from infrastructure.conexion_mongo import ConexionMongo, ConfiguracionMongo
+
+
+def test_opciones_cliente_reparte_el_presupuesto_del_pool():
+    configuracion = ConfiguracionMongo(min_pool=10, max_pool=100)
+
+    assert configuracion.opciones_cliente()["maxPoolSize"] == 100
+    assert configuracion.opciones_cliente(2)["minPoolSize"] == 5
+    assert configuracion.opciones_cliente(2)["maxPoolSize"] == 50
+    assert ConfiguracionMongo(max_pool=1).opciones_cliente(2)["maxPoolSize"] == 1
+
+
+@pytest.fixture
+def conexion(monkeypatch):
+    # estado propio: no se conecta (pymongo conecta recien en la primera operacion)
+    monkeypatch.setattr(ConexionMongo, "_configuracion", ConfiguracionMongo(max_pool=40))
+    monkeypatch.setattr(ConexionMongo, "_cliente", None)
+    monkeypatch.setattr(ConexionMongo, "_cliente_async", None)
+    monkeypatch.setattr(ConexionMongo, "_clientes", 1)
+    yield ConexionMongo
+    ConexionMongo.cerrar()
+    asyncio.run(ConexionMongo.cerrar_async())
+
+
+def test_solo_sync_usa_todo_el_presupuesto(conexion):
+    assert conexion.obtener_cliente().options.pool_options.max_pool_size == 40
+
+
+def test_los_dos_clientes_suman_el_maximo_configurado(conexion):
+    conexion.usar_cliente_async()
+
+    sync, async_ = conexion.obtener_cliente(), conexion.obtener_cliente_async()
+
+    assert sync.options.pool_options.max_pool_size + async_.options.pool_options.max_pool_size == 40
+
+
+def test_repartir_despues_de_crear_el_cliente_falla(conexion):
+    conexion.obtener_cliente()
+
+    with pytest.raises(RuntimeError):
+        conexion.usar_cliente_async()
@@ -0,0 +1,88 @@
+from infrastructure.reconciliar_contadores import reconciliar_contadores
+from infrastructure.repositorio_notificaciones_mongo import (
+    COLECCION_CONTADORES,
+    RepositorioNotificacionesMongo,
+    _incrementos_no_leidas,
+    _no_leidas,
+)
+
+ANA = "ana@comunicarlos.com.ar"
+BEA = "bea@comunicarlos.com.ar"
+
+
+def _notificacion(id, email=ANA, leida=False):
+    return {"id": id, "supervisor_email": email, "texto": id, "leida": leida}
+
+
+def test_incrementos_solo_cuentan_las_no_leidas_por_supervisor():
+    operaciones = _incrementos_no_leidas([_notificacion("a"), _notificacion("b"), _notificacion("c", BEA),
+                                          _notificacion("d", leida=True)])
+
+    assert {op._filter["_id"]: op._doc["$inc"]["no_leidas"] for op in operaciones} == {ANA: 2, BEA: 1}
+    assert all(op._upsert for op in operaciones)
+    assert _incrementos_no_leidas([_notificacion("x", leida=True)]) == []
+
+
+def test_no_leidas_sin_contador_o_desviado_bajo_cero():
+    assert _no_leidas(None) == 0
+    assert _no_leidas({"no_leidas": -2}) == 0
+    assert _no_leidas({"no_leidas": 4}) == 4
+
+
+def test_marcar_leida_descuenta_una_sola_vez(db):
+    repo = RepositorioNotificacionesMongo(db)
+    for id in ("a", "b"):
+        repo.crear(_notificacion(id))
+    assert repo.contar_no_leidas(ANA) == 2
+
+    assert repo.marcar_leida(ANA, "a")
+    assert repo.marcar_leida(ANA, "a")  # ya leida: ok, pero no vuelve a descontar
+    assert repo.contar_no_leidas(ANA) == 1
+    assert not repo.marcar_leida(ANA, "inexistente")
+    assert not repo.marcar_leida(BEA, "b")  # de otro supervisor
+    assert repo.contar_no_leidas(ANA) == 1
+
+
+def test_marcar_leidas_descuenta_las_modificadas(db):
+    repo = RepositorioNotificacionesMongo(db)
+    for id in ("a", "b", "c"):
+        repo.crear(_notificacion(id))
+    repo.marcar_leida(ANA, "a")
+
+    assert repo.marcar_leidas(ANA, ids=["a", "b"]) == 1
+    assert repo.contar_no_leidas(ANA) == 1
+
+
+def test_reconciliar_corrige_desvios_y_crea_faltantes(db):
+    db["NOTIFICACIONES"].insert_many([_notificacion("a"), _notificacion("b"), _notificacion("c", BEA),
+                                      _notificacion("d", leida=True)])
+    db[COLECCION_CONTADORES].insert_many([{"_id": ANA, "no_leidas": 7}, {"_id": "zoe@comunicarlos.com.ar", "no_leidas": 1}])
+
+    assert reconciliar_contadores(db) == 3
+
+    contadores = {c["_id"]: c["no_leidas"] for c in db[COLECCION_CONTADORES].find()}
+    assert contadores == {ANA: 2, BEA: 1, "zoe@comunicarlos.com.ar": 0}
+    assert reconciliar_contadores(db) == 0
+
+
+def test_reconciliar_no_pisa_un_contador_que_cambio_en_el_medio(db):
+    db["NOTIFICACIONES"].insert_one(_notificacion("a"))
+    db[COLECCION_CONTADORES].insert_one({"_id": ANA, "no_leidas": 5})
+
+    class _BaseConcurrente:
+        """entre la foto de los contadores y el conteo llega una notificacion"""
+
+        def __getitem__(self, nombre):
+            coleccion = db[nombre]
+            if nombre == "NOTIFICACIONES":
+                agregar = coleccion.aggregate
+
+                def aggregate(pipeline):
+                    db[COLECCION_CONTADORES].update_one({"_id": ANA}, {"$inc": {"no_leidas": 1}})
+                    return agregar(pipeline)
+
+                coleccion.aggregate = aggregate
+            return coleccion
+
+    assert reconciliar_contadores(_BaseConcurrente()) == 0
+    assert db[COLECCION_CONTADORES].find_one({"_id": ANA})["no_leidas"] == 6
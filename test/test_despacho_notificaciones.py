@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+from pymongo.errors import AutoReconnect
+
+from application.despacho_notificaciones import DespachadorNotificaciones
+from domain.usuarios import Operador
+from infrastructure.repositorio_notificaciones_mongo import RepositorioNotificacionesMongo
+from infrastructure.repositorio_outbox_mongo import (
+    FALLIDA,
+    NOMBRE_COLECCION,
+    PENDIENTE,
+    PROCESANDO,
+    RepositorioOutboxMongo,
+    documento_intento,
+)
+
+_HASH = "$2b$12$" + "x" * 53
+
+
+def _notificaciones(db):
+    db["NOTIFICACIONES"].create_index("id", unique=True)
+    return RepositorioNotificacionesMongo(db)
+
+
+def _intento(emails=("ana@comunicarlos.com.ar",)):
+    operador = Operador("Op", "op@comunicarlos.com.ar", None, 1, _HASH)
+    return documento_intento(list(emails), "Operador Op asignó req #1", operador, "evento", 1)
+
+
+def test_tomar_lote_reserva_con_token_y_lo_libera_al_vencer(db):
+    outbox = RepositorioOutboxMongo(db)
+    outbox.encolar(_intento())
+
+    lote = outbox.tomar_lote(10, plazo_segundos=60)
+    assert len(lote) == 1 and lote[0]["estado"] == PROCESANDO and lote[0]["token"]
+    # otro worker no la ve mientras dura el plazo
+    assert outbox.tomar_lote(10, plazo_segundos=60) == []
+
+    # el worker se cayo: vencido el plazo vuelve a estar disponible con otro token
+    db[NOMBRE_COLECCION].update_one({"_id": lote[0]["_id"]}, {"$set": {"vence": datetime.now() - timedelta(seconds=1)}})
+    retomado = outbox.tomar_lote(10, plazo_segundos=60)
+    assert [d["_id"] for d in retomado] == [lote[0]["_id"]]
+    assert retomado[0]["token"] != lote[0]["token"]
+
+
+def test_tomar_lote_respeta_proximo_intento(db):
+    outbox = RepositorioOutboxMongo(db)
+    intento = _intento()
+    intento["proximo_intento"] = datetime.now() + timedelta(minutes=5)
+    outbox.encolar(intento)
+
+    assert outbox.tomar_lote(10, plazo_segundos=60) == []
+
+
+def test_reprogramar_backoff_exponencial_y_fallida(db):
+    outbox = RepositorioOutboxMongo(db)
+    for intentos in (0, 3, 8, 9):
+        outbox.encolar({**_intento(), "intentos": intentos})
+    lote = outbox.tomar_lote(10, plazo_segundos=60)
+
+    antes = datetime.now()
+    fallidas = outbox.reprogramar(lote, "sin conexion", max_intentos=10, espera_maxima=300)
+
+    assert fallidas == 1
+    por_intentos = {d["intentos"]: d for d in db[NOMBRE_COLECCION].find()}
+    for numero, espera in ((1, 2), (4, 16), (9, 300)):  # 2**9 = 512 se recorta a espera_maxima
+        doc = por_intentos[numero]
+        assert doc["estado"] == PENDIENTE and "token" not in doc and "vence" not in doc
+        assert timedelta(seconds=espera - 1) < doc["proximo_intento"] - antes <= timedelta(seconds=espera + 1)
+    assert por_intentos[10]["estado"] == FALLIDA
+    assert por_intentos[10]["ultimo_error"] == "sin conexion"
+
+
+def test_insertar_idempotente_no_duplica_ni_infla_el_contador(db):
+    repo = _notificaciones(db)
+    documentos = [
+        {"id": "a", "supervisor_email": "ana@comunicarlos.com.ar", "texto": "x", "leida": False},
+        {"id": "b", "supervisor_email": "ana@comunicarlos.com.ar", "texto": "y", "leida": False},
+    ]
+
+    assert len(repo.insertar_idempotente([dict(d) for d in documentos])) == 2
+    # reentrega del mismo lote (el worker se cayo antes de completar) + una nueva
+    nuevas = repo.insertar_idempotente([dict(d) for d in documentos] + [{**documentos[0], "id": "c"}])
+
+    assert [d["id"] for d in nuevas] == ["c"]
+    assert db["NOTIFICACIONES"].count_documents({}) == 3
+    assert repo.contar_no_leidas("ana@comunicarlos.com.ar") == 3
+
+
+def test_procesar_lote_entrega_completa_y_publica(db):
+    outbox = RepositorioOutboxMongo(db)
+    outbox.encolar(_intento(["ana@comunicarlos.com.ar", "bea@comunicarlos.com.ar"]))
+    publicadas = []
+    despachador = DespachadorNotificaciones(outbox, _notificaciones(db), publicar=publicadas.extend)
+
+    assert despachador.procesar_lote() == 1
+
+    assert db[NOMBRE_COLECCION].count_documents({}) == 0
+    assert sorted(n["supervisor_email"] for n in publicadas) == ["ana@comunicarlos.com.ar", "bea@comunicarlos.com.ar"]
+    assert despachador.estadisticas()["entregadas"] == 2
+
+
+def test_procesar_lote_con_mongo_caido_reprograma(db):
+    class _NotificacionesCaidas:
+        def insertar_idempotente(self, documentos):
+            raise AutoReconnect("sin conexion")
+
+    outbox = RepositorioOutboxMongo(db)
+    outbox.encolar(_intento())
+    despachador = DespachadorNotificaciones(outbox, _NotificacionesCaidas(), max_intentos=1)
+
+    assert despachador.procesar_lote() == 1
+
+    doc = db[NOMBRE_COLECCION].find_one()
+    assert doc["estado"] == FALLIDA and doc["intentos"] == 1
+    assert despachador.estadisticas()["fallidas"] == 1
+
+
+def test_pendientes_y_umbral_en_las_metricas(db, caplog):
+    outbox = RepositorioOutboxMongo(db)
+    for _ in range(3):
+        outbox.encolar(_intento())
+    despachador = DespachadorNotificaciones(outbox, _notificaciones(db), umbral_pendientes=3)
+
+    estadisticas = despachador.estadisticas()
+    assert estadisticas["pendientes"] == 3 and estadisticas["saturado"]
+
+    despachador._vigilar_pendientes()
+    despachador._vigilar_pendientes()
+    assert len([r for r in caplog.records if "no da abasto" in r.getMessage()]) == 1  # se avisa al cruzar
+
+    despachador.procesar_lote()
+    assert despachador.estadisticas()["pendientes"] == 0
+    assert not despachador.estadisticas()["saturado"]
+
+
+def test_metricas_del_sistema_incluyen_el_outbox(sistema):
+    assert sistema.metricas()["despacho_notificaciones"]["pendientes"] == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from infrastructure.migracion_eventos import migrar_eventos
+from infrastructure.repositorio_eventos_mongo import NOMBRE_COLECCION
+
+mongomock = pytest.importorskip("mongomock")
+
+
+def _evento(texto):
+    return {"texto": texto, "autor_email": "op@comunicarlos.com.ar", "autor_nombre": "Op",
+            "fecha": "2024-01-01T10:00:00", "tipo": "TipoEvento.CREACION"}
+
+
+def test_mismo_id_en_incidentes_y_solicitudes_no_se_mezcla():
+    db = mongomock.MongoClient().db
+    db["incidentes"].insert_one({"id": 1, "eventos": [_evento("inc a"), _evento("inc b")]})
+    db["solicitudes"].insert_one({"id": 1, "eventos": [_evento("sol a")]})
+
+    assert migrar_eventos(db) == 2
+
+    log = db[NOMBRE_COLECCION]
+    assert log.count_documents({"coleccion": "incidentes", "requerimiento_id": 1}) == 2
+    assert log.count_documents({"coleccion": "solicitudes", "requerimiento_id": 1}) == 1
+    assert db["incidentes"].find_one({"id": 1})["eventos_total"] == 2
+    assert db["solicitudes"].find_one({"id": 1})["eventos_total"] == 1
+
+
+def test_reintento_rehace_solo_las_copias_de_su_coleccion():
+    db = mongomock.MongoClient().db
+    db["incidentes"].insert_one({"id": 1, "eventos": [_evento("inc")]})
+    migrar_eventos(db)
+    # corte a mitad de camino en la solicitud: copia marcada pero documento sin eventos_en_log
+    db["solicitudes"].insert_one({"id": 1, "eventos": [_evento("sol")]})
+    db[NOMBRE_COLECCION].insert_one({"coleccion": "solicitudes", "requerimiento_id": 1, "migrado": True})
+
+    migrar_eventos(db)
+
+    log = db[NOMBRE_COLECCION]
+    assert log.count_documents({"coleccion": "incidentes", "requerimiento_id": 1}) == 1
+    assert log.count_documents({"coleccion": "solicitudes", "requerimiento_id": 1}) == 1
@@ -0,0 +1,25 @@
+from domain.requerimientos import PRIORIDAD_SOLICITUD
+from domain.urgencias import URGENCIAS
+from infrastructure.migracion_resumen import migrar_resumen
+
+
+def test_prioridad_sale_del_dominio(db):
+    db["incidentes"].insert_many([
+        {"id": 1, "urgencia": "Crítica", "comentarios": [], "eventos": []},
+        {"id": 2, "urgencia": "Menor", "comentarios": [{"texto": "c"}], "eventos": []},
+        {"id": 3, "urgencia": "desconocida", "comentarios": [], "eventos": []},
+    ])
+    db["solicitudes"].insert_one({"id": 4, "comentarios": [], "eventos": []})
+
+    assert migrar_resumen(db) == 4
+    assert migrar_resumen(db) == 0  # idempotente
+
+    prioridades = {d["id"]: d["prioridad"] for d in db["incidentes"].find()}
+    assert prioridades == {
+        1: URGENCIAS["critica"].calcular_prioridad(),
+        2: URGENCIAS["menor"].calcular_prioridad(),
+        3: None,
+    }
+    solicitud = db["solicitudes"].find_one({"id": 4})
+    assert solicitud["prioridad"] == PRIORIDAD_SOLICITUD
+    assert solicitud["comentarios_total"] == 0 and solicitud["eventos_total"] == 0
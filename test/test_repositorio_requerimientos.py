@@ -0,0 +1,192 @@
+import asyncio
+
+from domain.usuarios import Solicitante
+from domain.requerimientos import Incidente
+from domain.urgencias import UrgenciaMenor
+from domain.eventos import EventoFactory
+from infrastructure.indices_mongo import INDICES
+from infrastructure.repositorio_eventos_mongo import NOMBRE_COLECCION as NOMBRE_COLECCION_EVENTOS
+from infrastructure.repositorio_incidentes_mongo import RepositorioIncidentesMongoAsync
+from infrastructure.repositorio_requerimientos_mongo import (
+    COLA_EVENTOS,
+    PROYECCION_RESUMEN,
+    _pipeline_pagina,
+    _posicionar_comentarios,
+    _proyeccion_detalle,
+    _rebanada_comentarios,
+    _update_cambios,
+)
+from infrastructure.repositorio_solicitudes_mongo import RepositorioSolicitudesMongoAsync
+
+
+def _incidentes(cantidad):
+    sol = Solicitante("Joa", "joa@test.com", "1234")
+    incidentes = []
+    for i in range(cantidad):
+        inc = Incidente(f"Incidente {i}", sol, UrgenciaMenor(), None, i + 1)
+        inc.agregar_evento(EventoFactory.crear_evento_creacion(inc, sol))
+        incidentes.append(inc)
+    return incidentes
+
+
+def _eventos_registrados(db):
+    return sorted(d["requerimiento_id"] for d in db[NOMBRE_COLECCION_EVENTOS].find({"coleccion": "incidentes"}))
+
+
+def test_guardar_lote_no_deja_eventos_de_los_que_fallan(db, db_async):
+    db["incidentes"].create_index("id", unique=True)
+    db["incidentes"].insert_one({"id": 2})  # el 2 ya existe: su insert falla
+    repo = RepositorioIncidentesMongoAsync(db_async)
+    incidentes = _incidentes(3)
+
+    errores = asyncio.run(repo.guardar_lote(incidentes))
+
+    assert list(errores) == [1]
+    assert _eventos_registrados(db) == [1, 3]
+    assert incidentes[1].cambios_pendientes() != (set(), [], [])
+    assert incidentes[0].cambios_pendientes() == (set(), [], [])
+
+
+def test_guardar_lote_sin_errores_registra_todos(db, db_async):
+    repo = RepositorioIncidentesMongoAsync(db_async)
+
+    assert asyncio.run(repo.guardar_lote(_incidentes(2))) == {}
+    assert db["incidentes"].count_documents({}) == 2
+    assert _eventos_registrados(db) == [1, 2]
+
+
+def _eventos(cantidad, desde=0):
+    return [{"tipo": "comentario", "n": desde + i} for i in range(cantidad)]
+
+
+def test_update_cambios_sin_nada_pendiente_no_escribe():
+    assert _update_cambios(None, [], []) == {}
+    assert _update_cambios({}, iter(()), iter(())) == {}
+
+
+def test_update_cambios_solo_escalares():
+    assert _update_cambios({"estado": "RESUELTO"}, [], []) == {"$set": {"estado": "RESUELTO"}}
+
+
+def test_update_cambios_cola_de_eventos_exacta():
+    eventos = _eventos(COLA_EVENTOS)
+
+    update = _update_cambios(None, iter(eventos), [])
+
+    assert update == {
+        "$push": {"eventos": {"$each": eventos, "$slice": -COLA_EVENTOS}},
+        "$inc": {"eventos_total": COLA_EVENTOS},
+    }
+
+
+def test_update_cambios_eventos_y_comentarios_suman_por_separado():
+    update = _update_cambios({"estado": "EN_PROCESO"}, _eventos(2), [{"texto": "a"}])
+
+    assert update["$inc"] == {"eventos_total": 2, "comentarios_total": 1}
+    assert update["$push"]["comentarios"] == {"$each": [{"texto": "a"}]}  # los comentarios no se recortan
+    assert update["$set"] == {"estado": "EN_PROCESO"}
+
+
+def test_update_cambios_la_cola_guarda_los_ultimos(db):
+    coleccion = db["incidentes"]
+    coleccion.insert_one({"id": 1, "eventos": _eventos(COLA_EVENTOS - 1), "eventos_total": COLA_EVENTOS - 1})
+
+    coleccion.update_one({"id": 1}, _update_cambios(None, _eventos(1, desde=COLA_EVENTOS - 1), []))
+    doc = coleccion.find_one({"id": 1})
+    assert [e["n"] for e in doc["eventos"]] == list(range(COLA_EVENTOS))
+
+    coleccion.update_one({"id": 1}, _update_cambios(None, _eventos(3, desde=COLA_EVENTOS), []))
+    doc = coleccion.find_one({"id": 1})
+    assert [e["n"] for e in doc["eventos"]] == list(range(3, COLA_EVENTOS + 3))
+    assert doc["eventos_total"] == COLA_EVENTOS + 3
+
+
+def test_proyeccion_detalle_sin_campos_ni_limites_trae_todo():
+    assert _proyeccion_detalle(None, None, None) == {"_id": 0}
+
+
+def test_proyeccion_detalle_recorta_los_arreglos():
+    assert _proyeccion_detalle(None, 5, 0) == {"_id": 0, "eventos": {"$slice": -5}, "comentarios": {"$slice": 0}}
+
+
+def test_proyeccion_detalle_con_campos_solo_recorta_los_pedidos():
+    proyeccion = _proyeccion_detalle(["estado", "comentarios"], 5, 3)
+
+    assert proyeccion == {"_id": 0, "id": 1, "estado": 1, "comentarios": {"$slice": -3}}
+
+
+def _comentarios(total):
+    return [{"texto": str(i)} for i in range(total)]
+
+
+def _pagina(total, limite, antes_de=None):
+    """lo que devolveria el $slice de mongo sobre `total` comentarios"""
+    inicio, rebanada = _rebanada_comentarios(limite, antes_de)
+    todos = _comentarios(total)
+    if len(rebanada) == 1:
+        traidos = todos[rebanada[0]:] if rebanada[0] else []
+    else:
+        traidos = todos[rebanada[0]:rebanada[0] + rebanada[1]]
+    return [c["posicion"] for c in _posicionar_comentarios(traidos, total, inicio, antes_de)]
+
+
+def test_comentarios_sin_cursor_trae_los_ultimos():
+    assert _rebanada_comentarios(3, None) == (None, [-3])
+    assert _pagina(10, 3) == [9, 8, 7]
+    assert _pagina(2, 3) == [1, 0]
+    assert _pagina(0, 3) == []
+
+
+def test_comentarios_con_cursor_trae_los_anteriores():
+    assert _rebanada_comentarios(3, 7) == (4, [4, 3])
+    assert _pagina(10, 3, antes_de=7) == [6, 5, 4]
+    assert _pagina(10, 3, antes_de=2) == [1, 0]
+
+
+def test_comentarios_cursor_en_el_principio_no_trae_nada():
+    # $slice exige n > 0: se pide 1 y se descarta
+    assert _rebanada_comentarios(3, 0) == (0, [0, 1])
+    assert _pagina(10, 3, antes_de=0) == []
+
+
+def test_comentarios_cursor_mas_alla_del_final_toma_desde_el_ultimo(db, db_async):
+    db["incidentes"].insert_one({"id": 1, "comentarios": _comentarios(10)})
+
+    total, comentarios = asyncio.run(RepositorioIncidentesMongoAsync(db_async).listar_comentarios(1, 3, 25))
+
+    assert total == 10
+    assert [c["posicion"] for c in comentarios] == [9, 8, 7]
+    assert [c["texto"] for c in comentarios] == ["9", "8", "7"]
+
+
+def test_comentarios_de_un_requerimiento_inexistente(db_async):
+    assert asyncio.run(RepositorioIncidentesMongoAsync(db_async).listar_comentarios(1, 3)) is None
+
+
+def test_proyeccion_resumen_suma_los_campos_de_cada_tipo(db_async):
+    incidentes = RepositorioIncidentesMongoAsync(db_async)
+    solicitudes = RepositorioSolicitudesMongoAsync(db_async)
+
+    assert incidentes._proyeccion(False) == {"_id": 0}
+    assert incidentes._proyeccion(True) == {**PROYECCION_RESUMEN, "urgencia": 1}
+    assert solicitudes._proyeccion(True) == {**PROYECCION_RESUMEN, "tipo_solicitud": 1}
+    assert "eventos" not in incidentes._proyeccion(True) and "comentarios" not in incidentes._proyeccion(True)
+
+
+def test_proyeccion_resumen_queda_cubierta_por_el_indice(db_async):
+    for repositorio in (RepositorioIncidentesMongoAsync(db_async), RepositorioSolicitudesMongoAsync(db_async)):
+        indice = next(i.document for i in INDICES[repositorio.nombre_coleccion] if i.document["name"] == "resumen")
+        proyectados = {campo for campo in repositorio._proyeccion(True) if campo != "_id"}
+
+        assert proyectados <= set(indice["key"])
+
+
+def test_pipeline_pagina_con_y_sin_cursor():
+    filtro = {"solicitante_email": "joa@test.com"}
+
+    primera = _pipeline_pagina(filtro, 50, None, PROYECCION_RESUMEN)
+    siguiente = _pipeline_pagina(filtro, 50, 120, PROYECCION_RESUMEN)
+
+    assert primera == [{"$match": filtro}, {"$sort": {"id": 1}}, {"$limit": 50}, {"$project": PROYECCION_RESUMEN}]
+    assert siguiente[0] == {"$match": {"solicitante_email": "joa@test.com", "id": {"$gt": 120}}}
+    assert filtro == {"solicitante_email": "joa@test.com"}  # no se modifica el filtro recibido
@@ -1,6 +1,6 @@
 from domain.usuarios import Solicitante, Tecnico
 from domain.requerimientos import Incidente, Solicitud
-from domain.urgencias import UrgenciaCritica, UrgenciaImportante
+from domain.urgencias import URGENCIAS, UrgenciaCritica, UrgenciaImportante
 from domain.enums import EstadoRequerimiento, TipoSolicitud
 from domain.servicios import Servicio
 
@@ -79,5 +79,47 @@ def test_agregar_comentario_suma_uno():
     assert len(inc.comentarios) == 1
     assert inc.comentarios[0].texto == "Comentario"
     assert inc.comentarios[0].autor.email == "joa@test.com"
-    
-    
\ No newline at end of file
+
+
+def test_id_explicito_no_consume_contador_local():
+    sol = Solicitante("Joa", "joa@test.com", "1234")
+    antes = Incidente("Incidente", sol, UrgenciaImportante(), None).id
+
+    inc = Incidente("Incidente", sol, UrgenciaImportante(), None, id=1000)
+    despues = Incidente("Incidente", sol, UrgenciaImportante(), None).id
+
+    assert inc.id == 1000
+    assert despues == antes + 1
+
+
+def test_cambios_pendientes_solo_lo_nuevo():
+    sol = Solicitante("Joa", "joa@test.com", "1234")
+    inc = Incidente("Incidente", sol, UrgenciaImportante(), None)
+    tec = Tecnico("Tec 1", "tec1@comunicarlos.com.ar", "1234")
+    inc.agregar_comentario("viejo", sol)
+    inc.marcar_persistido()
+
+    assert not inc.tiene_cambios()
+
+    inc.asignar_tecnico(tec)
+    inc.agregar_comentario("nuevo", tec)
+    campos, comentarios, eventos = inc.cambios_pendientes()
+
+    assert campos == {"tecnico_asignado", "estado"}
+    assert [c.texto for c in comentarios] == ["nuevo"]
+    assert eventos == []
+
+    inc.marcar_persistido()
+    assert not inc.tiene_cambios()
+
+
+def test_urgencias_compartidas_y_registros_sin_dict():
+    sol = Solicitante("Juan", "juan@gmail.com", "1234")
+    inc = Incidente("Incidente", sol, UrgenciaCritica(), None)
+    comentario = inc.agregar_comentario("hola", sol)
+
+    assert UrgenciaCritica() is inc.urgencia
+    assert URGENCIAS["critica"] is inc.urgencia
+    assert not hasattr(inc, "__dict__")
+    assert not hasattr(comentario, "__dict__")
+    assert not hasattr(sol, "__dict__")
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+from infrastructure.secuencias_mongo import SecuenciaMongo
+
+
+def test_sembrar_sigue_despues_de_los_ids_guardados(db):
+    secuencia = SecuenciaMongo("requerimientos", db=db)
+
+    secuencia.sembrar(120)
+
+    assert secuencia.siguiente() == 121
+    assert secuencia.reservar(3) == [122, 123, 124]
+
+
+def test_sembrar_no_retrocede_una_secuencia_adelantada(db):
+    SecuenciaMongo("requerimientos", db=db).siguiente()  # otro worker ya reservo 1..50
+    secuencia = SecuenciaMongo("requerimientos", db=db)
+
+    secuencia.sembrar(10)
+
+    assert secuencia.siguiente() == 51
+
+
+def test_workers_reciben_bloques_sin_superponerse(db):
+    uno = SecuenciaMongo("requerimientos", tamano_bloque=2, db=db)
+    otro = SecuenciaMongo("requerimientos", tamano_bloque=2, db=db)
+
+    ids = [uno.siguiente(), otro.siguiente(), uno.siguiente(), otro.siguiente(), uno.siguiente()]
+
+    assert ids == [1, 3, 2, 4, 5]
+
+
+class _ColeccionLenta:
+    """find_one_and_update que, frenada, espera hasta que el test la libere (Mongo lento)"""
+
+    def __init__(self, coleccion):
+        self.coleccion = coleccion
+        self.entro = threading.Event()
+        self.liberar = threading.Event()
+        self.liberar.set()
+
+    def __getattr__(self, nombre):
+        return getattr(self.coleccion, nombre)
+
+    def find_one_and_update(self, *args, **kwargs):
+        self.entro.set()
+        assert self.liberar.wait(5)
+        return self.coleccion.find_one_and_update(*args, **kwargs)
+
+
+def test_async_no_espera_el_bloque_que_pide_otro(db):
+    lenta = _ColeccionLenta(db["contadores"])
+    secuencia = SecuenciaMongo("requerimientos", tamano_bloque=5, db={"contadores": lenta})
+    secuencia.siguiente()  # bloque 1..5 en memoria
+    lenta.entro.clear()
+    lenta.liberar.clear()
+
+    # un caller sync (o un to_thread) pide un rango que no entra en el bloque
+    resultados = []
+    hilo = threading.Thread(target=lambda: resultados.append(secuencia.reservar(10)))
+    hilo.start()
+    assert lenta.entro.wait(5)
+
+    async def pedir():
+        return await asyncio.wait_for(secuencia.siguiente_async(), timeout=1)
+
+    try:
+        # mientras tanto el event loop sigue sacando del bloque en memoria
+        assert asyncio.run(pedir()) == 2
+    finally:
+        lenta.liberar.set()
+        hilo.join(5)
+    assert resultados == [list(range(6, 16))]
+
+
+def test_rellenos_simultaneos_no_repiten_ids(db):
+    secuencia = SecuenciaMongo("requerimientos", tamano_bloque=3, db=db)
+    ids = []
+    lock = threading.Lock()
+
+    def pedir():
+        for _ in range(20):
+            valor = secuencia.siguiente()
+            with lock:
+                ids.append(valor)
+
+    hilos = [threading.Thread(target=pedir) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(5)
+
+    assert len(ids) == 80 and len(set(ids)) == 80
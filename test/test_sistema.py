@@ -0,0 +1,32 @@
+from application.sistema import SistemaAyuda
+from domain.enums import EstadoRequerimiento
+from domain.urgencias import UrgenciaCritica
+
+
+def test_supervisores_en_memoria_acotados(db, db_async):
+    sistema = SistemaAyuda(cache_usuarios_max=2, db=db, db_async=db_async)
+    try:
+        for nombre in ("ana", "bea", "cata"):
+            sistema.registrar_usuario("supervisor", nombre, f"{nombre}@comunicarlos.com.ar", "x")
+
+        assert sistema.metricas()["cache_supervisores"]["items"] == 2
+        assert sistema.metricas()["cache_supervisores"]["desalojos"] == 1
+    finally:
+        sistema.pool_verificacion.cerrar()
+
+
+def test_escritura_por_la_api_invalida_el_requerimiento_en_memoria(sistema, api):
+    solicitante = sistema.registrar_usuario("solicitante", "Juan", "juan@gmail.com", "x")
+    sistema.registrar_usuario("operador", "Op", "op@comunicarlos.com.ar", "x")
+    sistema.registrar_usuario("tecnico", "Tec", "tec@comunicarlos.com.ar", "x")
+    incidente = sistema.crear_incidente(solicitante, "sin internet", UrgenciaCritica(), sistema.servicios[1])
+    assert sistema.listar_requerimientos(solicitante)[0].estado == EstadoRequerimiento.ABIERTO  # queda en memoria
+
+    respuesta = api.post(f"/incidentes/{incidente.id}/asignar-tecnico",
+                         json={"operador_email": "op@comunicarlos.com.ar", "tecnico_email": "tec@comunicarlos.com.ar"})
+    assert respuesta.status_code == 200
+
+    assert incidente.id not in sistema.requerimientos
+    [actual] = sistema.listar_requerimientos(solicitante)
+    assert actual.estado == EstadoRequerimiento.EN_PROCESO
+    assert actual.tecnico_asignado.email == "tec@comunicarlos.com.ar"
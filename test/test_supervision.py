@@ -0,0 +1,22 @@
+from application.supervision import GrafoSupervision
+
+
+def test_indice_inverso_supervisores_de_un_empleado():
+    grafo = GrafoSupervision()
+    grafo.agregar("ana@comunicarlos.com.ar", "op@comunicarlos.com.ar")
+    grafo.agregar("bea@comunicarlos.com.ar", "op@comunicarlos.com.ar")
+    grafo.agregar("ana@comunicarlos.com.ar", "tec@comunicarlos.com.ar")
+
+    assert grafo.supervisores_de("op@comunicarlos.com.ar") == ["ana@comunicarlos.com.ar", "bea@comunicarlos.com.ar"]
+    assert grafo.supervisores_de("tec@comunicarlos.com.ar") == ["ana@comunicarlos.com.ar"]
+    assert grafo.supervisores_de("nadie@comunicarlos.com.ar") == []
+    assert len(grafo) == 3
+
+
+def test_relacion_repetida_cuenta_una_vez():
+    grafo = GrafoSupervision()
+    grafo.agregar("ana@comunicarlos.com.ar", "op@comunicarlos.com.ar")
+    grafo.agregar("ana@comunicarlos.com.ar", "op@comunicarlos.com.ar")
+
+    assert grafo.supervisores_de("op@comunicarlos.com.ar") == ["ana@comunicarlos.com.ar"]
+    assert len(grafo) == 1
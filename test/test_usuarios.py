@@ -33,5 +33,31 @@ def test_supervisor_email_debe_ser_comunicarlos():
     ok = Supervisor("Sup 1", "sup1@comunicarlos.com.ar", "1234")
     assert ok.puede_asignar_tecnico() is False
     assert ok.puede_crear_requerimiento() is False
-    
-    
\ No newline at end of file
+
+
+def test_usuario_con_id_explicito():
+    u = Tecnico("Tec 1", "tec1@comunicarlos.com.ar", "1234", id=42)
+    assert u.id == 42
+
+
+def test_usuarios_iguales_por_email():
+    a = Tecnico("Tec 1", "tec1@comunicarlos.com.ar", "1234")
+    b = Tecnico("Tec 1", "tec1@comunicarlos.com.ar", "1234")
+    assert a == b
+    assert len({a, b}) == 1
+
+
+def test_con_hash_no_vuelve_a_hashear():
+    original = Tecnico("Tec 1", "tec1@comunicarlos.com.ar", "1234", id=7)
+
+    copia = Tecnico(original.nombre, original.email, None, id=original.id, password_hash=original.password_hash)
+
+    assert isinstance(copia, Tecnico)
+    assert copia.password_hash == original.password_hash
+    assert copia.verificar_password("1234") is True
+    assert copia.id == 7
+
+
+def test_con_hash_valida_email():
+    with pytest.raises(ValueError):
+        Supervisor("Sup", "sup@gmail.com", None, password_hash="$2b$12$hash")
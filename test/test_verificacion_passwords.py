@@ -0,0 +1,27 @@
+import asyncio
+
+from application.verificacion_passwords import PoolSaturadoError, PoolVerificacion
+from domain.usuarios import Solicitante
+
+
+def test_pool_verifica_passwords():
+    usuario = Solicitante("Ana", "ana@test.com", "clave")
+    pool = PoolVerificacion(max_workers=1)
+
+    assert asyncio.run(pool.verificar(usuario, "clave"))
+    assert not asyncio.run(pool.verificar(usuario, "otra"))
+    assert pool.metricas()["verificaciones"] == 2
+    pool.cerrar()
+
+
+def test_pool_rechaza_si_esta_saturado():
+    usuario = Solicitante("Ana", "ana@test.com", "clave")
+    pool = PoolVerificacion(max_workers=1, max_pendientes=2)
+
+    async def varios():
+        return await asyncio.gather(*[pool.verificar(usuario, "clave") for _ in range(4)], return_exceptions=True)
+
+    resultados = asyncio.run(varios())
+    assert sum(isinstance(r, PoolSaturadoError) for r in resultados) == 2
+    assert pool.metricas()["rechazadas"] == 2
+    pool.cerrar()